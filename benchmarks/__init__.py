@@ -0,0 +1,26 @@
+'''
+benchmarks
+==========
+Timing scripts for mayakit. Run them from the root of the repository:
+
+    python -m benchmarks.bench_nurbs
+
+Benchmarks that need Maya must be run with mayapy.
+'''
+from __future__ import print_function, division
+import timeit
+
+
+def best_of(fn, repeat=5, number=1):
+    '''Best time in seconds of a single call to fn'''
+
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+
+
+def report(label, seconds, count=None, unit='sample'):
+    '''Print a timing and optionally the cost per unit'''
+
+    line = '{:<40} {:>10.3f} ms'.format(label, seconds * 1000)
+    if count:
+        line += '  {:>10.1f} ns/{}'.format(seconds / count * 1e9, unit)
+    print(line)
@@ -0,0 +1,82 @@
+'''
+Compare the point counts of adaptive resampling with the smallest uniform
+resampling that reaches the same chord deviation on synthetic guide curves.
+'''
+from __future__ import print_function, division
+
+import numpy as np
+
+from mayakit import knotvectors, nurbs, sampling
+from . import best_of, report
+
+
+def guide_curves(num_curves, num_cvs=24, seed=0):
+    '''Mostly straight strands with a few bends and a curled tip'''
+
+    random = np.random.RandomState(seed)
+    curves = []
+    for _ in range(num_curves):
+        steps = np.tile([0.0, 1.0, 0.0], (num_cvs, 1))
+        steps += random.randn(num_cvs, 3) * 0.02
+        bends = random.choice(num_cvs, 2, replace=False)
+        steps[bends] += random.randn(2, 3) * 0.6
+        tip = np.linspace(0, 4 * np.pi, num_cvs // 4)
+        steps[-len(tip):, 0] += np.cos(tip) * 0.5
+        steps[-len(tip):, 2] += np.sin(tip) * 0.5
+        cvs = np.cumsum(steps, axis=0)
+        curves.append((cvs, knotvectors.uniform(num_cvs, 3), 3))
+    return curves
+
+
+def uniform_count(cvs, knots, degree, tolerance, max_points=4096):
+    '''Smallest number of evenly spaced parameters within tolerance'''
+
+    umin, umax = nurbs.domain(knots, degree)
+    lo, hi = 2, max_points
+    while lo < hi:
+        mid = (lo + hi) // 2
+        params = np.linspace(umin, umax, mid)
+        if sampling.chord_deviation(cvs, knots, degree, params).max() <= tolerance:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def main():
+    curves = guide_curves(100)
+    for tolerance in (0.05, 0.01, 0.001):
+        adaptive = 0
+        uniform = 0
+        worst = 0
+        for cvs, knots, degree in curves:
+            params = sampling.adaptive_params(
+                cvs, knots, degree, tolerance, max_points=100000
+            )
+            adaptive += len(params)
+            uniform += uniform_count(cvs, knots, degree, tolerance)
+            worst = max(
+                worst,
+                sampling.chord_deviation(cvs, knots, degree, params).max()
+            )
+        print(
+            'tolerance {}: adaptive {} points, uniform {} points, '
+            '{:.0%} fewer, max deviation {:.5f}'.format(
+                tolerance,
+                adaptive,
+                uniform,
+                1 - adaptive / uniform,
+                worst
+            )
+        )
+
+    cvs, knots, degree = curves[0]
+    seconds = best_of(
+        lambda: sampling.adaptive_params(cvs, knots, degree, 0.01),
+        repeat=10
+    )
+    report('adaptive_params one curve', seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+'''
+Align transforms to a curve with mayakit.curves.align_to_curve, compared
+with querying and setting each transform individually. Must be run with
+mayapy.
+'''
+from __future__ import print_function, division
+
+from maya import standalone
+standalone.initialize()
+
+import maya.api.OpenMaya as om
+import numpy as np
+from maya import cmds
+
+from mayakit import curves
+from . import best_of, report
+
+
+def align_one_by_one(xforms, curve):
+    '''The per transform approach align_to_curve used to take'''
+
+    curve_fn = curves.to_curve_fn(curve)
+    param_step = curve_fn.numSpans / float(len(xforms) - 1)
+    for i, xform in enumerate(xforms):
+        param = i * param_step
+        normal = curve_fn.normal(param, om.MSpace.kWorld)
+        tangent = curve_fn.tangent(param, om.MSpace.kWorld)
+        position = curve_fn.getPointAtParam(param, om.MSpace.kWorld)
+        bitangent = (tangent ^ normal).normalize()
+        matrix = [
+            tangent[0], tangent[1], tangent[2], 0,
+            bitangent[0], bitangent[1], bitangent[2], 0,
+            -normal[0], -normal[1], -normal[2], 0,
+            position[0], position[1], position[2], 1
+        ]
+        cmds.xform(xform, ws=True, matrix=matrix)
+
+
+def main():
+    random = np.random.RandomState(0)
+    curve = cmds.curve(point=np.cumsum(random.randn(100, 3), axis=0).tolist())
+
+    for count in (100, 1000, 5000):
+        xforms = [cmds.createNode('transform') for _ in range(count)]
+        paths = curves.dag_paths(xforms)
+
+        for mode in ('frenet', 'fixed', 'rmf'):
+            seconds = best_of(
+                lambda: curves.align_to_curve(paths, curve, mode),
+                repeat=3
+            )
+            report('align_to_curve {} {}'.format(mode, count), seconds, count, 'xform')
+
+        seconds = best_of(lambda: align_one_by_one(xforms, curve), repeat=1)
+        report('one by one {}'.format(count), seconds, count, 'xform')
+        cmds.delete(xforms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+'''
+Average 1000 curves with 500 cvs each using mayakit.stitches.average_curves.
+Must be run with mayapy.
+'''
+from __future__ import print_function, division
+
+from maya import standalone
+standalone.initialize()
+
+import numpy as np
+from maya import cmds
+
+from mayakit import stitches
+from . import best_of, report
+
+
+def main():
+    random = np.random.RandomState(0)
+    num_curves, num_cvs = 1000, 500
+    base = np.cumsum(random.randn(num_cvs, 3), axis=0)
+    curves = [
+        cmds.curve(point=(base + random.randn(num_cvs, 3) * 0.1).tolist())
+        for _ in range(num_curves)
+    ]
+    weights = random.rand(num_curves)
+
+    seconds = best_of(lambda: stitches.average_curves(*curves), repeat=3)
+    report('average {} x {} cvs'.format(num_curves, num_cvs), seconds, num_curves, 'curve')
+
+    seconds = best_of(
+        lambda: stitches.average_curves(*curves, weights=weights),
+        repeat=3
+    )
+    report('weighted average', seconds, num_curves, 'curve')
+
+    target = stitches.average_curves_into(curves)
+    seconds = best_of(
+        lambda: stitches.average_curves_into(curves, target=target),
+        repeat=3
+    )
+    report('average into existing curve', seconds, num_curves, 'curve')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+'''
+Closest points on a dense curve for every cv of another curve, the work done
+by mayakit.stitches.conform_curve.
+
+The node based conform_curve queried a nearestPointOnCurve node once per cv.
+It is stood in for here by querying mayakit.closest one point at a time,
+which leaves out the cost of the setAttr and getAttr round trips.
+'''
+from __future__ import print_function, division
+
+import numpy as np
+
+from mayakit import closest, knotvectors
+from . import best_of, report
+
+
+def main():
+    random = np.random.RandomState(0)
+    num_cvs = 2000
+    cvs = np.cumsum(random.randn(num_cvs, 3), axis=0)
+    knots = knotvectors.uniform(num_cvs, 3)
+
+    seconds = best_of(lambda: closest.CurveBVH(cvs, knots, 3), repeat=5)
+    report('build CurveBVH {} cvs'.format(num_cvs), seconds)
+
+    bvh = closest.CurveBVH(cvs, knots, 3)
+    for count in (100, 10000):
+        points = cvs[random.randint(0, num_cvs, count)] + random.randn(count, 3)
+        seconds = best_of(lambda: bvh.closest(points), repeat=5)
+        report('batched {} points'.format(count), seconds, count, 'point')
+
+    points = points[:500]
+
+    def one_by_one():
+        for point in points:
+            bvh.closest(point[None])
+
+    seconds = best_of(one_by_one, repeat=3)
+    report('one at a time {} points'.format(len(points)), seconds, len(points), 'point')
+
+
+if __name__ == '__main__':
+    main()
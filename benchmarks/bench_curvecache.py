@@ -0,0 +1,89 @@
+'''
+Write and read a cache of 100k guide curves with mayakit.curvecache, in
+one go, streamed in chunks and one curve at a time.
+'''
+from __future__ import print_function, division
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from mayakit import curvecache, knotvectors, nurbs
+from . import best_of, report
+
+
+def main():
+    random = np.random.RandomState(0)
+    num_curves = 100000
+    num_cvs = 16
+    knots = knotvectors.uniform(num_cvs, 3)
+    packed = nurbs.PackedCurves(
+        cvs=np.cumsum(random.randn(num_curves, num_cvs, 3), axis=1).reshape(-1, 3),
+        cv_offsets=nurbs.offsets(np.full(num_curves, num_cvs)),
+        knots=np.tile(knots, num_curves),
+        knot_offsets=nurbs.offsets(np.full(num_curves, len(knots))),
+        degrees=np.full(num_curves, 3, dtype=np.int64),
+        forms=np.ones(num_curves, dtype=np.int64),
+    )
+    ids = np.arange(num_curves)
+
+    root = tempfile.mkdtemp()
+    path = os.path.join(root, 'guides.curves')
+    try:
+        def write():
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            with curvecache.CurveCacheWriter(path, fields={'id': ('<i8', ())}) as w:
+                w.append_packed(packed, id=ids)
+
+        seconds = best_of(write, repeat=3)
+        report('write {} curves'.format(num_curves), seconds, num_curves, 'curve')
+
+        def write_streaming():
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            with curvecache.CurveCacheWriter(path, fields={'id': ('<i8', ())}) as w:
+                for start in range(0, num_curves, 1000):
+                    stop = start + 1000
+                    w.append_packed(
+                        nurbs.PackedCurves(
+                            cvs=packed.cvs[start * num_cvs:stop * num_cvs],
+                            cv_offsets=packed.cv_offsets[start:stop + 1] - start * num_cvs,
+                            knots=packed.knots[start * len(knots):stop * len(knots)],
+                            knot_offsets=packed.knot_offsets[start:stop + 1] - start * len(knots),
+                            degrees=packed.degrees[start:stop],
+                            forms=packed.forms[start:stop],
+                        ),
+                        id=ids[start:stop]
+                    )
+
+        seconds = best_of(write_streaming, repeat=3)
+        report('append {} curves 1000 at a time'.format(num_curves), seconds, num_curves, 'curve')
+
+        seconds = best_of(lambda: curvecache.CurveCache(path), repeat=5)
+        report('open cache', seconds)
+
+        cache = curvecache.CurveCache(path)
+        indices = random.randint(0, num_curves, 10000)
+
+        def random_access():
+            for index in indices:
+                cache[index]
+
+        seconds = best_of(random_access, repeat=3)
+        report('random access {} curves'.format(len(indices)), seconds, len(indices), 'curve')
+
+        def read_all():
+            loaded = curvecache.CurveCache(path).packed()
+            np.array(loaded.cvs)
+            np.array(loaded.knots)
+
+        seconds = best_of(read_all, repeat=3)
+        report('read all {} curves'.format(num_curves), seconds, num_curves, 'curve')
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+'''
+Bake and play back 1000 hairs with 24 cvs each with mayakit.framecache.
+Reading a frame costs the same in a short and a long cache, and the same
+scrubbing forwards or backwards.
+'''
+from __future__ import print_function, division
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from mayakit import framecache, knotvectors, nurbs
+from . import best_of, report
+
+
+def main():
+    random = np.random.RandomState(0)
+    num_hairs = 1000
+    num_cvs = 24
+    topology = nurbs.pack([
+        (random.randn(num_cvs, 3), knotvectors.uniform(num_cvs, 3), 3, 1)
+        for _ in range(num_hairs)
+    ])
+    frame = topology.cvs
+
+    root = tempfile.mkdtemp()
+    try:
+        for num_frames in (100, 1000):
+            path = os.path.join(root, '{}.frames'.format(num_frames))
+
+            def bake():
+                if os.path.exists(path):
+                    shutil.rmtree(path)
+                with framecache.FrameCacheWriter(path, topology, dtype='<f4') as w:
+                    for i in range(num_frames):
+                        w.append(i, frame)
+
+            seconds = best_of(bake, repeat=3)
+            report('bake {} frames'.format(num_frames), seconds, num_frames, 'frame')
+
+            cache = framecache.FrameCache(path)
+            forwards = np.arange(num_frames)
+            backwards = forwards[::-1]
+            scattered = random.randint(0, num_frames, num_frames)
+            for label, frames in (
+                ('forwards', forwards),
+                ('backwards', backwards),
+                ('random', scattered),
+            ):
+                def play():
+                    for i in frames:
+                        np.array(cache.cvs(i))
+
+                seconds = best_of(play, repeat=3)
+                report(
+                    'play {} of {} frames {}'.format(len(frames), num_frames, label),
+                    seconds,
+                    len(frames),
+                    'frame'
+                )
+            del cache
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+'''
+Interpolate 100k children from 1k guides with mayakit.guides. Binding runs
+once, sampling the guides and interpolating the children runs every frame.
+'''
+from __future__ import print_function, division
+
+import numpy as np
+
+from mayakit import guides, knotvectors, nurbs, tubes
+from . import best_of, report
+
+
+def main():
+    random = np.random.RandomState(0)
+    num_guides = 1000
+    num_children = 100000
+    num_cvs = 24
+    samples = 16
+
+    # Guides grow up from a 10 x 10 patch
+    roots = np.zeros((num_guides, 3))
+    roots[:, [0, 2]] = random.uniform(-5, 5, (num_guides, 2))
+    cvs = roots[:, None] + np.cumsum(random.randn(num_guides, num_cvs, 3) * 0.1 + [0, 0.5, 0], axis=1)
+    knots = knotvectors.uniform(num_cvs, 3)
+    packed = nurbs.PackedCurves(
+        cvs=cvs.reshape(-1, 3),
+        cv_offsets=nurbs.offsets(np.full(num_guides, num_cvs)),
+        knots=np.tile(knots, num_guides),
+        knot_offsets=nurbs.offsets(np.full(num_guides, len(knots))),
+        degrees=np.full(num_guides, 3, dtype=np.int64),
+        forms=np.ones(num_guides, dtype=np.int64),
+    )
+    child_roots = np.zeros((num_children, 3))
+    child_roots[:, [0, 2]] = random.uniform(-5, 5, (num_children, 2))
+
+    guide_points = tubes.sample_curves(packed, samples)[0]
+    seconds = best_of(lambda: guides.bind(guide_points[:, 0], child_roots, k=4), repeat=3)
+    report('bind {} children to {} guides'.format(num_children, num_guides), seconds, num_children, 'child')
+
+    binding = guides.bind(guide_points[:, 0], child_roots, k=4)
+    seconds = best_of(lambda: tubes.sample_curves(packed, samples), repeat=5)
+    report('sample {} guides'.format(num_guides), seconds, num_guides, 'guide')
+
+    seconds = best_of(lambda: guides.interpolate(binding, guide_points), repeat=5)
+    report('interpolate {} children'.format(num_children), seconds, num_children, 'child')
+
+    children = guides.interpolate(binding, guide_points)
+    seconds = best_of(lambda: guides.pack_children(children), repeat=5)
+    report('pack {} children'.format(num_children), seconds, num_children, 'child')
+
+
+if __name__ == '__main__':
+    main()
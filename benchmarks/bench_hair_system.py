@@ -0,0 +1,60 @@
+'''
+Attach 100, 1k and 10k guide curves to a hairSystem with the batched
+mayakit.strands.add_curves_to_system, and the first two counts with the per
+curve cmds path it replaces. Must be run with mayapy.
+'''
+from __future__ import print_function, division
+
+from maya import standalone
+standalone.initialize()
+
+import timeit
+
+import numpy as np
+from maya import cmds
+
+from mayakit import curveio, strands
+from . import report
+
+
+def create_guides(random, count, num_cvs=8):
+    points = np.cumsum(random.randn(count, num_cvs, 3), axis=1).reshape(-1, 3)
+    offsets = np.arange(count + 1) * num_cvs
+    curveio.create_uniform_curves(points, offsets)
+    return cmds.ls(type='nurbsCurve', long=True)
+
+
+def per_curve(curves, hair_system):
+    basename = hair_system.replace('Shape', '')
+    for curve in curves:
+        follicle_nodes, out_curve_nodes = strands.curve_to_hair(curve, hair_system)
+        if not cmds.objExists(basename + 'Follicles'):
+            cmds.group(empty=True, name=basename + 'Follicles')
+        cmds.parent(follicle_nodes[0], basename + 'Follicles')
+        if not cmds.objExists(basename + 'OutputCurves'):
+            cmds.group(empty=True, name=basename + 'OutputCurves')
+        cmds.parent(out_curve_nodes[0], basename + 'OutputCurves')
+
+
+def time_once(fn, count):
+    '''Time fn in a fresh scene with count guides and a hairSystem'''
+
+    cmds.file(new=True, force=True)
+    curves = create_guides(np.random.RandomState(0), count)
+    hair_system = strands.create_hair_system('bench')
+    start = timeit.default_timer()
+    fn(curves, hair_system)
+    return timeit.default_timer() - start
+
+
+def main():
+    for count in (100, 1000, 10000):
+        seconds = time_once(strands.add_curves_to_system, count)
+        report('batched {} curves'.format(count), seconds, count, 'curve')
+        if count <= 1000:
+            seconds = time_once(per_curve, count)
+            report('per curve {} curves'.format(count), seconds, count, 'curve')
+
+
+if __name__ == '__main__':
+    main()
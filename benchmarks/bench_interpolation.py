@@ -0,0 +1,58 @@
+'''
+Micro benchmarks of the mayakit.interpolation kernels against the scalar
+helpers they replace, called once per value in a Python loop.
+'''
+from __future__ import print_function, division
+from math import pi, sin
+
+import numpy as np
+
+from mayakit import interpolation
+from . import best_of, report
+
+
+def scalar_hermite(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def scalar_lerp(a, b, t):
+    return a * (1.0 - t) + b * t
+
+
+def scalar_cool(t):
+    return sin(t * pi * 0.5)
+
+
+def main():
+    for count in (1000, 1000000):
+        t = np.linspace(0, 1, count)
+        values = t.tolist()
+        repeat = 5 if count < 100000 else 3
+
+        for name, scalar_fn, kernel in (
+            ('hermite', scalar_hermite, interpolation.hermite),
+            ('cool', scalar_cool, interpolation.cool),
+        ):
+            seconds = best_of(lambda: [scalar_fn(v) for v in values], repeat)
+            report('scalar {} x{}'.format(name, count), seconds, count)
+            seconds = best_of(lambda: kernel(t), repeat)
+            report('array {} x{}'.format(name, count), seconds, count)
+
+        a = np.zeros((count, 3))
+        b = np.ones((count, 3))
+        rows = list(zip(a.tolist(), b.tolist(), values))
+        seconds = best_of(
+            lambda: [[scalar_lerp(x, y, v) for x, y in zip(p, q)] for p, q, v in rows],
+            repeat
+        )
+        report('scalar lerp 3d x{}'.format(count), seconds, count)
+        seconds = best_of(lambda: interpolation.lerp(a, b, t[:, None]), repeat)
+        report('array lerp 3d x{}'.format(count), seconds, count)
+
+    # Overhead of the shims for callers still passing single values
+    seconds = best_of(lambda: [interpolation.hermite(v) for v in values[:10000]], 3)
+    report('shimmed scalar hermite x10000', seconds, 10000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+'''
+Per sample cost of mayakit.nurbs.evaluate on a cubic curve with 64 cvs and
+of mayakit.nurbs.evaluate_packed on many curves at once.
+'''
+from __future__ import print_function, division
+
+import numpy as np
+
+from mayakit import nurbs
+from . import best_of, report
+
+
+def main():
+    num_cvs = 64
+    degree = 3
+    cvs = np.random.RandomState(0).rand(num_cvs, 3)
+    spans = num_cvs - degree
+    knots = np.concatenate((
+        np.zeros(degree - 1),
+        np.arange(spans + 1),
+        np.full(degree - 1, spans)
+    ))
+
+    for count in (100, 10000, 1000000):
+        params = np.linspace(0, spans, count)
+        repeat = 3 if count > 100000 else 10
+        seconds = best_of(
+            lambda: nurbs.evaluate(cvs, knots, degree, params),
+            repeat=repeat
+        )
+        report('evaluate {} params'.format(count), seconds, count)
+
+    random = np.random.RandomState(1)
+    for num_curves in (1000, 10000):
+        curves = [
+            (random.rand(num_cvs, 3), knots, degree)
+            for _ in range(num_curves)
+        ]
+        packed = nurbs.pack(curves)
+        params = np.tile(np.linspace(0, spans, 20), num_curves)
+        curve_ids = np.repeat(np.arange(num_curves), 20)
+
+        seconds = best_of(
+            lambda: nurbs.evaluate_packed(packed, params, curve_ids),
+            repeat=3
+        )
+        report('evaluate_packed {} curves'.format(num_curves), seconds, len(params))
+
+        def one_by_one():
+            for curve_cvs, curve_knots, curve_degree in curves:
+                nurbs.evaluate(curve_cvs, curve_knots, curve_degree, params[:20])
+        seconds = best_of(one_by_one, repeat=3)
+        report('evaluate {} curves'.format(num_curves), seconds, len(params))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+'''
+Compare reading pointsOnCurve's outMatrix array plug with reading the
+outMatrixArray data block. Must be run with mayapy.
+'''
+from __future__ import print_function, division
+import os
+
+from maya import standalone
+standalone.initialize()
+
+import maya.api.OpenMaya as om
+from maya import cmds
+
+import mayakit
+from . import best_of, report
+
+
+def get_plug(attr):
+    sel = om.MSelectionList()
+    sel.add(attr)
+    return sel.getPlug(0)
+
+
+def read_outmatrix(node):
+    '''Dirty the node and pull every element of outMatrix'''
+
+    cmds.setAttr(node + '.uShift', cmds.getAttr(node + '.uShift') + 0.01)
+    plug = get_plug(node + '.outMatrix')
+    num_elements = plug.evaluateNumElements()
+    for i in range(num_elements):
+        element = plug.elementByPhysicalIndex(i)
+        om.MFnMatrixData(element.asMObject()).matrix()
+
+
+def read_outmatrixarray(node):
+    '''Dirty the node and pull the outMatrixArray data block'''
+
+    cmds.setAttr(node + '.uShift', cmds.getAttr(node + '.uShift') + 0.01)
+    plug = get_plug(node + '.outMatrixArray')
+    om.MFnMatrixArrayData(plug.asMObject()).array()
+
+
+def main():
+    plugins_path = os.path.join(os.path.dirname(mayakit.__file__), 'plugins')
+    cmds.loadPlugin(os.path.join(plugins_path, 'pointsOnCurve.py'))
+
+    curve = cmds.curve(point=[(i, (i % 2) * 2, 0) for i in range(32)])
+    node = cmds.createNode('pointsOnCurve')
+    cmds.connectAttr(curve + '.worldSpace[0]', node + '.inCurve')
+
+    for count in (100, 1000, 10000):
+        cmds.setAttr(node + '.numPoints', count)
+        seconds = best_of(lambda: read_outmatrix(node), repeat=3)
+        report('outMatrix {} points'.format(count), seconds, count, 'point')
+        seconds = best_of(lambda: read_outmatrixarray(node), repeat=3)
+        report('outMatrixArray {} points'.format(count), seconds, count, 'point')
+
+
+if __name__ == '__main__':
+    main()
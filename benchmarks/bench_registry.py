@@ -0,0 +1,35 @@
+'''
+Active hairSystem lookups through mayakit.registry against tags.search, in
+scenes with more and more tagged nodes. Must be run with mayapy.
+'''
+from __future__ import print_function, division
+
+from maya import standalone
+standalone.initialize()
+
+from maya import cmds
+
+from mayakit import registry, strands, tags
+from . import best_of, report
+
+
+def main():
+    for count in (10, 100, 1000):
+        cmds.file(new=True, force=True)
+        registry.get_registry().clear()
+        strands.create_strands_system('bench')
+        for i in range(count):
+            tags.add(cmds.createNode('transform'), strands_hairsystem='inactive')
+
+        seconds = best_of(lambda: tags.search(strands_hairsystem='active'), repeat=3)
+        report('tags.search {} tagged nodes'.format(count), seconds)
+
+        seconds = best_of(lambda: registry.get_registry().build(), repeat=3)
+        report('build registry', seconds)
+
+        seconds = best_of(strands.get_active_hairsystem, repeat=5, number=100)
+        report('get_active_hairsystem', seconds)
+
+
+if __name__ == '__main__':
+    main()
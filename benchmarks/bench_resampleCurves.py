@@ -0,0 +1,86 @@
+'''
+Compare one resampleCurves node against one resampleCurve node per curve,
+checking that both produce the same points. Must be run with mayapy.
+'''
+from __future__ import print_function, division
+import os
+
+from maya import standalone
+standalone.initialize()
+
+import maya.api.OpenMaya as om
+import numpy as np
+from maya import cmds
+
+import mayakit
+from . import best_of, report
+
+
+def get_plug(attr):
+    sel = om.MSelectionList()
+    sel.add(attr)
+    return sel.getPlug(0)
+
+
+def curve_points(plug):
+    curve_fn = om.MFnNurbsCurve(plug.asMObject())
+    return np.array(curve_fn.cvPositions())[:, :3]
+
+
+def main():
+    plugins_path = os.path.join(os.path.dirname(mayakit.__file__), 'plugins')
+    cmds.loadPlugin(os.path.join(plugins_path, 'resampleCurve.py'))
+    cmds.loadPlugin(os.path.join(plugins_path, 'resampleCurves.py'))
+    random = np.random.RandomState(0)
+
+    for num_curves in (1000, 10000):
+        cmds.file(new=True, force=True)
+        curves = [
+            cmds.curve(point=random.rand(12, 3).tolist())
+            for _ in range(num_curves)
+        ]
+
+        batch = cmds.createNode('resampleCurves')
+        singles = []
+        for i, curve in enumerate(curves):
+            cmds.connectAttr(
+                curve + '.worldSpace[0]',
+                '{}.inputCurve[{}]'.format(batch, i)
+            )
+            single = cmds.createNode('resampleCurve')
+            cmds.connectAttr(curve + '.worldSpace[0]', single + '.inputCurve')
+            singles.append(single)
+
+        batch_plugs = [
+            get_plug('{}.outputCurve[{}]'.format(batch, i))
+            for i in range(num_curves)
+        ]
+        single_plugs = [get_plug(s + '.outputCurve') for s in singles]
+
+        def pull_batch():
+            cmds.setAttr(batch + '.numPoints', 20 + pull_batch.count % 2)
+            pull_batch.count += 1
+            batch_plugs[0].asMObject()
+        pull_batch.count = 0
+
+        def pull_singles():
+            for single, plug in zip(singles, single_plugs):
+                cmds.setAttr(single + '.numPoints', 20 + pull_singles.count % 2)
+                plug.asMObject()
+            pull_singles.count += 1
+        pull_singles.count = 0
+
+        seconds = best_of(pull_batch, repeat=3)
+        report('resampleCurves {} curves'.format(num_curves), seconds, num_curves, 'curve')
+        seconds = best_of(pull_singles, repeat=3)
+        report('resampleCurve x {}'.format(num_curves), seconds, num_curves, 'curve')
+
+        error = max(
+            np.abs(curve_points(a) - curve_points(b)).max()
+            for a, b in zip(batch_plugs, single_plugs)
+        )
+        print('max difference: {}'.format(error))
+
+
+if __name__ == '__main__':
+    main()
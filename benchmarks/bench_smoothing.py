@@ -0,0 +1,39 @@
+'''
+Smoothing a 10k curve groom with mayakit.smoothing, the work done by the
+smoothCurves plugin per compute.
+'''
+from __future__ import print_function, division
+
+import numpy as np
+
+from mayakit import nurbs, smoothing
+from . import best_of, report
+
+
+def main():
+    random = np.random.RandomState(0)
+    num_curves = 10000
+    num_cvs = 20
+    points = np.cumsum(random.randn(num_curves, num_cvs, 3), axis=1).reshape(-1, 3)
+    offsets = nurbs.offsets(np.full(num_curves, num_cvs))
+
+    for method in ('laplacian', 'taubin'):
+        for preserve_length in (False, True):
+            seconds = best_of(
+                lambda: smoothing.smooth(
+                    points,
+                    offsets,
+                    iterations=10,
+                    method=method,
+                    preserve_length=preserve_length
+                ),
+                repeat=3
+            )
+            label = '{} x10 {} curves{}'.format(
+                method, num_curves, ' preserve length' if preserve_length else ''
+            )
+            report(label, seconds, len(points), 'cv')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+'''
+Tube meshes swept along many curves with mayakit.tubes, the work done by
+the sweepCurves plugin before it hands the arrays to MFnMesh.create.
+'''
+from __future__ import print_function, division
+
+import numpy as np
+
+from mayakit import knotvectors, nurbs, tubes
+from . import best_of, report
+
+
+def main():
+    random = np.random.RandomState(0)
+    num_cvs = 10
+    knots = knotvectors.uniform(num_cvs, 3)
+
+    for num_curves, segments, sides in ((100, 16, 8), (10000, 16, 8), (1000, 64, 16)):
+        packed = nurbs.PackedCurves(
+            cvs=np.cumsum(random.randn(num_curves, num_cvs, 3), axis=1).reshape(-1, 3),
+            cv_offsets=nurbs.offsets(np.full(num_curves, num_cvs)),
+            knots=np.tile(knots, num_curves),
+            knot_offsets=nurbs.offsets(np.full(num_curves, len(knots))),
+            degrees=np.full(num_curves, 3, dtype=np.int64),
+            forms=np.ones(num_curves, dtype=np.int64),
+        )
+        profile = tubes.circle_profile(sides)
+        num_faces = num_curves * segments * sides
+
+        seconds = best_of(lambda: tubes.tube_mesh(packed, segments, profile, 0.1), repeat=3)
+        report(
+            '{} curves {}x{} ({:.1f}M faces/s)'.format(
+                num_curves, segments, sides, num_faces / seconds / 1e6
+            ),
+            seconds,
+            num_faces,
+            'face'
+        )
+
+
+if __name__ == '__main__':
+    main()
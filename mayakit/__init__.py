@@ -1,8 +1,14 @@
-from . import tags, messages, strands, stitches
-from .skin import *
-from .rig import *
-from .utils import *
-from .plugins import *
-from .curves import *
-from .rivets import *
-from .ctxmanagers import *
+try:
+    from maya import cmds
+except ImportError:
+    # Outside of Maya only the pure python modules like nurbs are available
+    pass
+else:
+    from . import tags, messages, strands, stitches
+    from .skin import *
+    from .rig import *
+    from .utils import *
+    from .plugins import *
+    from .curves import *
+    from .rivets import *
+    from .ctxmanagers import *
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+'''
+closest
+=======
+Batched closest point queries against nurbsCurves. Like mayakit.nurbs this
+module does not depend on Maya.
+
+A curve is tessellated once into line segments which are grouped into a
+bounding volume hierarchy. Consecutive segments of a curve are already
+close together in space, so the hierarchy is simply a balanced binary tree
+over runs of consecutive segments. All query points descend the tree
+together, pruning nodes that can not contain their closest segment. The
+closest point on every segment that may be nearest the exact curve is then
+refined against the curve with a few Newton steps.
+'''
+from __future__ import division
+
+import numpy as np
+
+from . import nurbs, sampling
+
+
+def segment_closest(points, starts, ends):
+    '''Closest points on line segments
+
+    :param points: (n, 3) query points
+    :param starts: (n, 3) start of each segment
+    :param ends: (n, 3) end of each segment
+    :returns: position along each segment from 0 to 1, squared distances
+    '''
+
+    segments = ends - starts
+    offsets = points - starts
+    lengths = np.einsum('ij,ij->i', segments, segments)
+    t = np.divide(
+        np.einsum('ij,ij->i', offsets, segments),
+        lengths,
+        out=np.zeros_like(lengths),
+        where=lengths != 0
+    )
+    t = np.clip(t, 0, 1)
+    deltas = offsets - segments * t[:, None]
+    return t, np.einsum('ij,ij->i', deltas, deltas)
+
+
+def _box_distances(points, lows, highs):
+    '''Squared distance from points to axis aligned boxes'''
+
+    nearest = np.maximum(np.maximum(lows - points, points - highs), 0)
+    return np.einsum('ij,ij->i', nearest, nearest)
+
+
+def _group_min(groups, values, size):
+    '''Minimum of values for each group id'''
+
+    result = np.full(size, np.inf)
+    np.minimum.at(result, groups, values)
+    return result
+
+
+def _group_first(groups, values, ties):
+    '''Index of the smallest value of each group, ties go to the smallest
+    tie value
+    '''
+
+    order = np.lexsort((ties, values, groups))
+    return order[np.r_[True, groups[order][1:] != groups[order][:-1]]]
+
+
+class SegmentBVH(object):
+    '''Bounding volume hierarchy over a chain of line segments
+
+    Nodes are stored level by level, each level holds the bounding boxes of
+    twice as many runs of segments as the level above it. Leaves hold up to
+    leaf_size consecutive segments. The distance to the start of a node's
+    first segment bounds the distance to its closest segment, nodes that are
+    entirely farther away than that bound for another node are pruned.
+
+    :param starts: (n, 3) start of each segment
+    :param ends: (n, 3) end of each segment
+    :param leaf_size: number of segments in each leaf
+    :param padding: grow every bounding box by this distance, so boxes
+        still bound a curve the segments deviate from by up to padding
+    '''
+
+    def __init__(self, starts, ends, leaf_size=4, padding=0.0):
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+        self.leaf_size = leaf_size
+
+        num_segments = len(self.starts)
+        num_leaves = max(-(-num_segments // leaf_size), 1)
+        depth = int(np.ceil(np.log2(num_leaves)))
+
+        # Pad the segments out to a full tree by repeating the last one
+        padded = np.minimum(
+            np.arange((2 ** depth) * leaf_size),
+            num_segments - 1
+        )
+        lows = np.minimum(self.starts, self.ends)[padded]
+        highs = np.maximum(self.starts, self.ends)[padded]
+        lows = lows.reshape(-1, leaf_size, 3).min(axis=1) - padding
+        highs = highs.reshape(-1, leaf_size, 3).max(axis=1) + padding
+
+        firsts = self.starts[padded[::leaf_size]]
+
+        self.levels = [(lows, highs, firsts)]
+        while len(lows) > 1:
+            lows = np.minimum(lows[0::2], lows[1::2])
+            highs = np.maximum(highs[0::2], highs[1::2])
+            firsts = firsts[0::2]
+            self.levels.insert(0, (lows, highs, firsts))
+
+    def candidates(self, points):
+        '''Measure every segment in the leaves that may hold the closest
+        segment to each point
+
+        :param points: (n, 3) query points
+        :returns: point indices, segment indices, positions along the
+            segments and squared distances of each remaining pair
+        '''
+
+        points = np.asarray(points, dtype=np.float64)
+        num_points = len(points)
+        num_segments = len(self.starts)
+
+        # Each pair is a point and a node it may still find its closest
+        # segment in, pairs are pruned at every level of the tree
+        point_ids = np.arange(num_points)
+        node_ids = np.zeros(num_points, dtype=np.intp)
+        for index, (lows, highs, firsts) in enumerate(self.levels):
+            if index:
+                point_ids = np.repeat(point_ids, 2)
+                node_ids = (np.repeat(node_ids, 2) * 2 +
+                            np.tile([0, 1], len(node_ids)))
+            pair_points = points[point_ids]
+            near = _box_distances(pair_points, lows[node_ids], highs[node_ids])
+            deltas = pair_points - firsts[node_ids]
+            far = np.einsum('ij,ij->i', deltas, deltas)
+            bound = _group_min(point_ids, far, num_points)
+            keep = near <= bound[point_ids]
+            point_ids = point_ids[keep]
+            node_ids = node_ids[keep]
+
+        # Measure every segment in the remaining leaves
+        point_ids = np.repeat(point_ids, self.leaf_size)
+        segment_ids = (np.repeat(node_ids, self.leaf_size) * self.leaf_size +
+                       np.tile(np.arange(self.leaf_size), len(node_ids)))
+        valid = segment_ids < num_segments
+        point_ids = point_ids[valid]
+        segment_ids = segment_ids[valid]
+        t, distances = segment_closest(
+            points[point_ids],
+            self.starts[segment_ids],
+            self.ends[segment_ids]
+        )
+        return point_ids, segment_ids, t, distances
+
+    def closest(self, points):
+        '''Find the closest segment to each point
+
+        :param points: (n, 3) query points
+        :returns: segment indices, positions along the segments, squared
+            distances
+        '''
+
+        point_ids, segment_ids, t, distances = self.candidates(points)
+        first = _group_first(point_ids, distances, segment_ids)
+        return segment_ids[first], t[first], distances[first]
+
+
+class CurveBVH(object):
+    '''Closest point queries against a nurbsCurve
+
+    Every segment's largest deviation from the curve is measured once, the
+    hierarchy's boxes are grown by it so they bound the curve itself. A
+    segment whose distance minus its deviation is farther than another
+    segment's distance plus its deviation can not hold the closest point.
+    Of the rest, every segment closer than its neighbors in the chain is
+    refined, so tangled curves that pass a point several times are
+    refined in each pass and the closest result is kept.
+
+    :param cvs: cvs of curve
+    :param knots: Maya knot array
+    :param degree: degree of curve
+    :param subdivisions: number of segments per knot span
+    :param leaf_size: number of segments in each leaf of the hierarchy
+    :param periodic: wrap parameters around the seam while refining
+    '''
+
+    def __init__(self, cvs, knots, degree, subdivisions=8, leaf_size=4,
+                 periodic=False):
+        self.cvs = np.asarray(cvs, dtype=np.float64)
+        self.knots = np.asarray(knots, dtype=np.float64)
+        self.degree = degree
+        self.periodic = periodic
+        self.params = nurbs.span_params(self.knots, degree, subdivisions)
+        points = nurbs.points_at(self.cvs, self.knots, degree, self.params)
+        self.deviations = sampling.chord_deviation(
+            self.cvs, self.knots, degree, self.params, probes=3
+        )
+        self.segments = SegmentBVH(
+            points[:-1],
+            points[1:],
+            leaf_size,
+            padding=self.deviations.max()
+        )
+
+    def _neighbor_distances(self, points, segment_ids, offset):
+        '''Squared distances to the segments offset along the chain,
+        infinite past the ends of open curves
+        '''
+
+        num_segments = len(self.segments.starts)
+        neighbor_ids = segment_ids + offset
+        if self.periodic:
+            neighbor_ids %= num_segments
+        valid = (neighbor_ids >= 0) & (neighbor_ids < num_segments)
+        distances = np.full(len(segment_ids), np.inf)
+        distances[valid] = segment_closest(
+            points[valid],
+            self.segments.starts[neighbor_ids[valid]],
+            self.segments.ends[neighbor_ids[valid]]
+        )[1]
+        return distances
+
+    def candidates(self, points):
+        '''Find the segments to refine for each point
+
+        :param points: (n, 3) query points
+        :returns: point indices and parameters to start refining at
+        '''
+
+        point_ids, segment_ids, t, squared = self.segments.candidates(points)
+        distances = np.sqrt(squared)
+        deviations = self.deviations[segment_ids]
+        upper = _group_min(point_ids, distances + deviations, len(points))
+        keep = distances - deviations <= upper[point_ids]
+        point_ids = point_ids[keep]
+        segment_ids = segment_ids[keep]
+        t = t[keep]
+        squared = squared[keep]
+
+        # Refine each pass of the curve by the point once, from its
+        # closest segment
+        pair_points = points[point_ids]
+        keep = (
+            (squared <= self._neighbor_distances(pair_points, segment_ids, -1)) &
+            (squared <= self._neighbor_distances(pair_points, segment_ids, 1))
+        )
+        point_ids = point_ids[keep]
+        segment_ids = segment_ids[keep]
+        lo = self.params[segment_ids]
+        hi = self.params[segment_ids + 1]
+        return point_ids, lo + (hi - lo) * t[keep]
+
+    def refine(self, points, start, iterations=3):
+        '''Refine parameters towards the closest points with Newton steps
+
+        A step that lands farther away is retried at half its length from
+        the closest parameter so far, so the result is never farther than
+        start.
+
+        :param points: (n, 3) query points
+        :param start: parameter to start at for each point
+        :param iterations: number of Newton steps
+        :returns: params, positions, squared distances
+        '''
+
+        umin, umax = nurbs.domain(self.knots, self.degree)
+        params = np.array(start, dtype=np.float64)
+        best = params.copy()
+        best_positions = np.empty((len(params), 3))
+        best_distances = np.full(len(params), np.inf)
+        steps = np.zeros(len(params))
+        scales = np.ones(len(params))
+        for i in range(iterations + 1):
+            positions, d1, d2 = nurbs.evaluate(
+                self.cvs, self.knots, self.degree, params, order=2
+            )
+            deltas = positions - points
+            distances = np.einsum('ij,ij->i', deltas, deltas)
+            closer = distances < best_distances
+            best[closer] = params[closer]
+            best_positions[closer] = positions[closer]
+            best_distances[closer] = distances[closer]
+            if i == iterations:
+                break
+
+            slope = np.einsum('ij,ij->i', deltas, d1)
+            curvature = (np.einsum('ij,ij->i', d1, d1) +
+                         np.einsum('ij,ij->i', deltas, d2))
+            # Only step where the distance is convex, otherwise keep the
+            # current estimate
+            step = np.divide(
+                slope,
+                curvature,
+                out=np.zeros_like(slope),
+                where=curvature > 0
+            )
+            steps[closer] = step[closer]
+            scales[closer] = 1
+            scales[~closer] *= 0.5
+            params = best - steps * scales
+            if self.periodic:
+                params = umin + (params - umin) % (umax - umin)
+            else:
+                params = np.clip(params, umin, umax)
+
+        return best, best_positions, best_distances
+
+    def closest(self, points, iterations=3):
+        '''Find the closest point on the curve to each point
+
+        :param points: (n, 3) query points
+        :param iterations: number of Newton steps to refine each hit with
+        :returns: params, positions
+        '''
+
+        points = np.asarray(points, dtype=np.float64)
+        point_ids, start = self.candidates(points)
+        params, positions, distances = self.refine(
+            points[point_ids], start, iterations
+        )
+        first = _group_first(point_ids, distances, start)
+        return params[first], positions[first]
+
+
+def closest_points(cvs, knots, degree, points, iterations=3):
+    '''Closest points on a curve, see CurveBVH
+
+    :param cvs: cvs of curve
+    :param knots: Maya knot array
+    :param degree: degree of curve
+    :param points: (n, 3) query points
+    :param iterations: number of Newton steps to refine each hit with
+    :returns: params, positions
+    '''
+
+    return CurveBVH(cvs, knots, degree).closest(points, iterations)
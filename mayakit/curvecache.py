@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+'''
+curvecache
+==========
+Compact on disk storage for large sets of curves. Like mayakit.nurbs this
+module does not depend on Maya.
+
+A cache is a directory holding one raw little endian file per array of a
+mayakit.nurbs.PackedCurves, plus one file per metadata field and a json
+header. Offsets are stored as the end of each curve, so curves can be
+appended without rewriting anything. Readers memory map the files, so
+opening a cache only reads the header and the offsets index, and fetching a
+curve only touches its own cvs and knots.
+
+The header records how many curves, cvs and knots have been committed.
+Data written after the last commit is ignored by readers and dropped when
+the cache is opened for appending again.
+
+Example::
+
+    with CurveCacheWriter('guides.curves', fields={'id': ('<i8', ())}) as w:
+        w.append_packed(packed, id=ids)
+
+    cache = CurveCache('guides.curves')
+    cvs, knots, degree, form = cache[100]
+'''
+from __future__ import division
+import json
+import os
+
+import numpy as np
+
+from . import nurbs
+
+VERSION = 1
+HEADER = 'header.json'
+ARRAYS = {
+    'cvs': '<f8',
+    'cv_ends': '<i8',
+    'knots': '<f8',
+    'knot_ends': '<i8',
+    'degrees': '<i8',
+    'forms': '<i8',
+}
+
+
+def _array_path(path, name):
+    return os.path.join(path, name + '.bin')
+
+
+def _field_name(name):
+    return 'field_' + name
+
+
+def read_header(path):
+    '''Read the header of a cache'''
+
+    with open(os.path.join(path, HEADER), 'r') as f:
+        header = json.load(f)
+    if header['version'] > VERSION:
+        raise ValueError('Unsupported curve cache version {}'.format(header['version']))
+    return header
+
+
+class CurveCacheWriter(object):
+    '''Append curves to a cache, creating it if it does not exist.
+
+    Curves are streamed straight to disk, the header is written on commit
+    and on close.
+
+    :param path: directory of the cache
+    :param dim: number of components per cv, 3 or 4 for rational curves
+    :param fields: per curve metadata fields, a dict mapping names to
+        (dtype, shape) of one curve's value
+    '''
+
+    def __init__(self, path, dim=3, fields=None):
+        self.path = path
+        if os.path.exists(os.path.join(path, HEADER)):
+            self.header = read_header(path)
+            if fields and set(fields) != set(self.header['fields']):
+                raise ValueError('Fields do not match existing cache')
+            self._truncate()
+        else:
+            if not os.path.isdir(path):
+                os.makedirs(path)
+            self.header = {
+                'version': VERSION,
+                'dim': dim,
+                'num_curves': 0,
+                'num_cvs': 0,
+                'num_knots': 0,
+                'fields': dict(
+                    (name, [np.dtype(dtype).str, list(shape)])
+                    for name, (dtype, shape) in (fields or {}).items()
+                ),
+            }
+            for name in list(ARRAYS) + [_field_name(f) for f in self.header['fields']]:
+                open(_array_path(path, name), 'wb').close()
+            self.commit()
+
+        self._files = dict(
+            (name, open(_array_path(path, name), 'ab'))
+            for name in list(ARRAYS) + [_field_name(f) for f in self.header['fields']]
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _truncate(self):
+        '''Drop data written after the last commit'''
+
+        header = self.header
+        counts = {
+            'cvs': header['num_cvs'] * header['dim'],
+            'cv_ends': header['num_curves'],
+            'knots': header['num_knots'],
+            'knot_ends': header['num_curves'],
+            'degrees': header['num_curves'],
+            'forms': header['num_curves'],
+        }
+        sizes = dict((name, counts[name] * 8) for name in ARRAYS)
+        for name, (dtype, shape) in header['fields'].items():
+            itemsize = np.dtype(dtype).itemsize * int(np.prod(shape))
+            sizes[_field_name(name)] = header['num_curves'] * itemsize
+        for name, size in sizes.items():
+            with open(_array_path(self.path, name), 'r+b') as f:
+                f.truncate(size)
+
+    def _write(self, name, array, dtype):
+        np.ascontiguousarray(array, dtype=dtype).tofile(self._files[name])
+
+    def append_packed(self, packed, **fields):
+        '''Append all curves of a PackedCurves
+
+        :param packed: PackedCurves
+        :param fields: one array of values per metadata field, the first
+            axis matching the number of curves
+        '''
+
+        header = self.header
+        num_curves = len(packed.degrees)
+        if set(fields) != set(header['fields']):
+            raise ValueError('Expected values for fields: {}'.format(
+                ', '.join(sorted(header['fields']))
+            ))
+        if np.shape(packed.cvs)[1:] != (header['dim'],):
+            raise ValueError('Expected cvs with {} components'.format(header['dim']))
+        values = {}
+        for name, (dtype, shape) in header['fields'].items():
+            values[name] = np.asarray(fields[name], dtype=dtype)
+            if values[name].shape != (num_curves,) + tuple(shape):
+                raise ValueError('Wrong shape for field {}: {}'.format(
+                    name, values[name].shape
+                ))
+
+        self._write('cvs', packed.cvs, ARRAYS['cvs'])
+        self._write('cv_ends', packed.cv_offsets[1:] + header['num_cvs'], ARRAYS['cv_ends'])
+        self._write('knots', packed.knots, ARRAYS['knots'])
+        self._write('knot_ends', packed.knot_offsets[1:] + header['num_knots'], ARRAYS['knot_ends'])
+        self._write('degrees', packed.degrees, ARRAYS['degrees'])
+        self._write('forms', packed.forms, ARRAYS['forms'])
+        for name, (dtype, shape) in header['fields'].items():
+            self._write(_field_name(name), values[name], dtype)
+
+        header['num_curves'] += num_curves
+        header['num_cvs'] += len(packed.cvs)
+        header['num_knots'] += len(packed.knots)
+
+    def append(self, cvs, knots, degree, form=1, **fields):
+        '''Append a single curve, see append_packed'''
+
+        self.append_packed(
+            nurbs.pack([(cvs, knots, degree, form)]),
+            **dict((name, [value]) for name, value in fields.items())
+        )
+
+    def commit(self):
+        '''Flush data and write the header so readers see appended curves'''
+
+        for f in getattr(self, '_files', {}).values():
+            f.flush()
+        with open(os.path.join(self.path, HEADER), 'w') as f:
+            json.dump(self.header, f, indent=4, sort_keys=True)
+
+    def close(self):
+        '''Commit and close all files'''
+
+        self.commit()
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+
+class CurveCache(object):
+    '''Read a cache written by CurveCacheWriter.
+
+    All arrays are memory mapped, indexing returns views into the files.
+
+    :param path: directory of the cache
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.header = header = read_header(path)
+        num_curves = header['num_curves']
+
+        def load(name, dtype, shape):
+            if not np.prod(shape):
+                return np.zeros(shape, dtype=dtype)
+            return np.memmap(
+                _array_path(path, name),
+                dtype=dtype,
+                mode='r',
+                shape=shape
+            )
+
+        self.cvs = load('cvs', ARRAYS['cvs'], (header['num_cvs'], header['dim']))
+        self.knots = load('knots', ARRAYS['knots'], (header['num_knots'],))
+        self.degrees = load('degrees', ARRAYS['degrees'], (num_curves,))
+        self.forms = load('forms', ARRAYS['forms'], (num_curves,))
+        self.cv_offsets = np.concatenate((
+            [0], load('cv_ends', ARRAYS['cv_ends'], (num_curves,))
+        )).astype(np.int64)
+        self.knot_offsets = np.concatenate((
+            [0], load('knot_ends', ARRAYS['knot_ends'], (num_curves,))
+        )).astype(np.int64)
+        self.fields = dict(
+            (name, load(_field_name(name), dtype, (num_curves,) + tuple(shape)))
+            for name, (dtype, shape) in header['fields'].items()
+        )
+
+    def __len__(self):
+        return self.header['num_curves']
+
+    def __getitem__(self, index):
+        '''Get the cvs, knots, degree and form of one curve'''
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Curve index out of range: {}'.format(index))
+        return nurbs.unpack(self, index)
+
+    def packed(self, start=0, stop=None):
+        '''Get a range of curves as a PackedCurves of views into the cache
+
+        :param start: index of first curve
+        :param stop: index after the last curve, defaults to all curves
+        '''
+
+        if stop is None:
+            stop = len(self)
+        cv_start, cv_stop = self.cv_offsets[[start, stop]]
+        knot_start, knot_stop = self.knot_offsets[[start, stop]]
+        return nurbs.PackedCurves(
+            cvs=self.cvs[cv_start:cv_stop],
+            cv_offsets=self.cv_offsets[start:stop + 1] - cv_start,
+            knots=self.knots[knot_start:knot_stop],
+            knot_offsets=self.knot_offsets[start:stop + 1] - knot_start,
+            degrees=self.degrees[start:stop],
+            forms=self.forms[start:stop],
+        )
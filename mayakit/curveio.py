@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+'''
+curveio
+=======
+Read and write many nurbsCurves at once through OpenMaya.
+
+Curves are read into a mayakit.nurbs.PackedCurves: flat arrays of cvs and
+knots plus offsets marking where each curve starts. Curves are resolved
+through a single MSelectionList. They are written back with one undoable
+setAttr per curve or created with MFnNurbsCurve.create.
+'''
+from __future__ import division
+
+import maya.api.OpenMaya as om
+from maya import cmds
+import numpy as np
+
+from . import knotvectors, nurbs
+
+
+def curve_paths(curves):
+    '''Get the MDagPath of the nurbsCurve shape of each curve
+
+    :param curves: names of nurbsCurve shapes or their transforms
+    '''
+
+    sel = om.MSelectionList()
+    for curve in curves:
+        sel.add(curve)
+
+    paths = []
+    for i in range(sel.length()):
+        path = sel.getDagPath(i)
+        if path.apiType() == om.MFn.kTransform:
+            for j in range(path.childCount()):
+                child = path.child(j)
+                if (child.hasFn(om.MFn.kNurbsCurve) and
+                        not om.MFnDagNode(child).isIntermediateObject):
+                    path.push(child)
+                    break
+        if not path.hasFn(om.MFn.kNurbsCurve):
+            raise Exception('Not a proper nurbsCurve: {}'.format(curves[i]))
+        paths.append(path)
+    return paths
+
+
+def curve_fns(curves):
+    '''Get an MFnNurbsCurve for each curve, see curve_paths'''
+
+    return [om.MFnNurbsCurve(path) for path in curve_paths(curves)]
+
+
+def _as_fns(curves):
+    if curves and isinstance(curves[0], om.MFnNurbsCurve):
+        return curves
+    return curve_fns(curves)
+
+
+def _as_paths(curves):
+    if curves and isinstance(curves[0], om.MFnNurbsCurve):
+        return [fn.dagPath() for fn in curves]
+    return curve_paths(curves)
+
+
+def read_points(curves, space=om.MSpace.kObject):
+    '''Read the cvs of many curves
+
+    :param curves: curve names or MFnNurbsCurves
+    :param space: MSpace to read cvs in
+    :returns: (num_cvs, 3) array of cvs and len(curves) + 1 offsets
+    '''
+
+    points = [
+        np.array(fn.cvPositions(space), dtype=np.float64)[:, :3]
+        for fn in _as_fns(curves)
+    ]
+    if not points:
+        return np.zeros((0, 3)), nurbs.offsets([])
+    return np.concatenate(points), nurbs.offsets([len(p) for p in points])
+
+
+def read_curves(curves, space=om.MSpace.kObject):
+    '''Read the cvs, knots, degree and form of many curves.
+
+    Rational weights are not read.
+
+    :param curves: curve names or MFnNurbsCurves
+    :param space: MSpace to read cvs in
+    :returns: PackedCurves
+    '''
+
+    fns = _as_fns(curves)
+    cvs, cv_offsets = read_points(fns, space)
+    knots = [np.array(fn.knots(), dtype=np.float64) for fn in fns]
+    return nurbs.PackedCurves(
+        cvs=cvs,
+        cv_offsets=cv_offsets,
+        knots=np.concatenate(knots) if knots else np.zeros(0),
+        knot_offsets=nurbs.offsets([len(k) for k in knots]),
+        degrees=np.array([fn.degree for fn in fns], dtype=np.int64),
+        forms=np.array([fn.form for fn in fns], dtype=np.int64),
+    )
+
+
+def read_curve(curve, space=om.MSpace.kObject):
+    '''Read the cvs, knots, degree and form of one curve'''
+
+    return nurbs.unpack(read_curves([curve], space), 0)
+
+
+def write_points(curves, points, offsets, space=om.MSpace.kObject):
+    '''Set the cvs of many curves, the number of cvs must not change
+
+    Each curve is set with a single undoable setAttr of its controlPoints.
+
+    :param curves: curve names or MFnNurbsCurves
+    :param points: (num_cvs, 3) array of cvs
+    :param offsets: len(curves) + 1 offsets into points
+    :param space: MSpace.kObject or MSpace.kWorld, the space of points
+    '''
+
+    paths = _as_paths(curves)
+    points = np.asarray(points, dtype=np.float64)
+    for path, start, end in zip(paths, offsets[:-1], offsets[1:]):
+        num_cvs = om.MFnNurbsCurve(path).numCVs
+        if num_cvs != end - start:
+            raise Exception('Expected {} cvs got {}'.format(num_cvs, end - start))
+        curve_points = points[start:end, :3]
+        if space == om.MSpace.kWorld:
+            inverse = np.array(path.inclusiveMatrixInverse()).reshape(4, 4)
+            curve_points = np.dot(curve_points, inverse[:3, :3]) + inverse[3, :3]
+        cmds.setAttr(
+            '{}.controlPoints[0:{}]'.format(path.fullPathName(), num_cvs - 1),
+            *curve_points.ravel().tolist()
+        )
+
+
+def write_curves(curves, packed, space=om.MSpace.kObject):
+    '''Set the cvs of many curves from a PackedCurves'''
+
+    write_points(curves, packed.cvs[:, :3], packed.cv_offsets, space)
+
+
+def create_curves(packed, parent=om.MObject.kNullObj):
+    '''Create a nurbsCurve for each curve in a PackedCurves
+
+    :param packed: PackedCurves
+    :param parent: optional transform to parent the curve shapes to,
+        by default each curve gets its own transform
+    :returns: MObjects of the created curves
+    '''
+
+    objects = []
+    curve_fn = om.MFnNurbsCurve()
+    for i in range(len(packed.degrees)):
+        cvs, knots, degree, form = nurbs.unpack(packed, i)
+        objects.append(curve_fn.create(
+            om.MPointArray(cvs[:, :3].tolist()),
+            om.MDoubleArray(knots),
+            degree,
+            form,
+            False,
+            False,
+            parent
+        ))
+    return objects
+
+
+def create_uniform_curves(points, offsets, degree=3, parent=om.MObject.kNullObj):
+    '''Create open curves with uniform knots from packed points
+
+    :param points: (num_cvs, 3) array of cvs
+    :param offsets: offsets into points
+    :param degree: degree of curves
+    :returns: MObjects of the created curves
+    '''
+
+    counts = np.diff(offsets)
+    return create_curves(nurbs.PackedCurves(
+        cvs=np.asarray(points, dtype=np.float64),
+        cv_offsets=np.asarray(offsets),
+        knots=np.concatenate([
+            knotvectors.uniform(count, min(degree, count - 1))
+            for count in counts
+        ]),
+        knot_offsets=nurbs.offsets(counts + np.minimum(degree, counts - 1) - 1),
+        degrees=np.minimum(degree, counts - 1),
+        forms=np.ones(len(counts), dtype=np.int64),
+    ), parent)
@@ -1,57 +1,160 @@
 # -*- coding: utf-8 -*-
-__all__ = ['align_to_curve', 'align_selected_to_curve']
+__all__ = ['align_to_curve', 'align_selected_to_curve', 'sweep_curves', 'sweep_selected_curves']
 
 import maya.api.OpenMaya as om
 from maya import cmds
+import numpy as np
+from functools import partial
+
+from . import curveio, frames, modifiers, nurbs
+from .plugins import safe_load
 
 
 def to_curve_fn(curve):
 
-    shape = None
-    if cmds.nodeType(curve, 'nurbsCurve'):
-        shape = curve
-    else:
-        child = cmds.listRelatives(curve, shapes=True, noIntermediate=True)
-        if child:
-            shape = child[0]
-        else:
-            cmds.warning('Not a proper nurbsCurve: {}'.format(curve))
-            raise Exception('Not a proper nurbsCurve: {}'.format(curve))
+    return curveio.curve_fns([curve])[0]
+
+
+def dag_paths(nodes):
+    '''Get an MDagPath for each node using a single MSelectionList'''
 
     sel = om.MSelectionList()
-    sel.add(shape)
-    dep = sel.getDagPath(0)
-    fn = om.MFnNurbsCurve(dep)
-    return fn
+    for node in nodes:
+        sel.add(node)
+    return [sel.getDagPath(i) for i in range(sel.length())]
+
+
+def _set_world_matrices(paths, matrices, modifier):
+    '''Set the translate, rotate, scale and shear of transforms through a
+    modifier, see set_world_matrices
+    '''
+
+    xform_fn = om.MFnTransform()
+    for path, matrix in zip(paths, matrices.reshape(-1, 16).tolist()):
+        local = om.MMatrix(matrix) * path.exclusiveMatrixInverse()
+        xform_fn.setObject(path)
+        transformation = om.MTransformationMatrix(local)
+        transformation.reorderRotation(xform_fn.rotationOrder())
+        rotation = transformation.rotation()
+        values = (
+            ('translate', transformation.translation(om.MSpace.kTransform)),
+            ('rotate', (rotation.x, rotation.y, rotation.z)),
+            ('scale', transformation.scale(om.MSpace.kTransform)),
+            ('shear', transformation.shear(om.MSpace.kTransform)),
+        )
+        for attr, value in values:
+            plug = xform_fn.findPlug(attr, False)
+            for i in range(3):
+                modifier.newPlugValueDouble(plug.child(i), value[i])
+    modifier.doIt()
+
+
+def set_world_matrices(paths, matrices):
+    '''Set the world space matrices of transforms as one undoable step.
+
+    All values are set through a single modifier, see mayakit.modifiers.
+
+    :param paths: MDagPaths of transforms
+    :param matrices: (n, 4, 4) array of world space matrices
+    '''
+
+    modifiers.run(partial(_set_world_matrices, paths, np.asarray(matrices)))
+
+
+def curve_frames(curve, num, mode='frenet', up=(0, 1, 0)):
+    '''Compute world space matrices evenly spaced in parameter along a curve.
+
+    Matrix rows are the tangent, bitangent, the negated normal and position.
+
+    :param curve: nurbsCurve or its transform
+    :param num: number of matrices
+    :param mode: 'frenet', 'fixed' for a fixed up vector or 'rmf' for
+        rotation minimizing frames
+    :param up: up vector used by fixed and rmf modes and where a frenet
+        frame is undefined
+    :returns: (num, 4, 4) array of matrices
+    '''
+
+    cvs, knots, degree, _ = curveio.read_curve(curve, om.MSpace.kWorld)
+    umin, umax = nurbs.domain(knots, degree)
+    params = np.linspace(umin, umax, num)
+    positions, derivs, curvatures = nurbs.evaluate(
+        cvs, knots, degree, params, order=2
+    )
+    tangents = nurbs.normalize(derivs)
+
+    if mode == 'frenet':
+        bitangents, normals = frames.frenet_frames(tangents, curvatures, up)
+    elif mode == 'fixed':
+        bitangents, normals = frames.fixed_up_frames(tangents, up)
+    elif mode == 'rmf':
+        bitangents, normals = frames.rotation_minimizing_frames(
+            positions,
+            tangents,
+            up
+        )
+    else:
+        raise ValueError('Unknown frame mode: {}'.format(mode))
+
+    return frames.to_matrices(positions, tangents, bitangents, -normals)
+
+
+def align_to_curve(xforms, curve, mode='frenet', up=(0, 1, 0)):
+    '''Distribute and orient transforms along a curve.
+
+    All frames are computed at once by curve_frames and written in a single
+    pass by set_world_matrices.
+
+    :param xforms: transforms or their MDagPaths
+    :param curve: nurbsCurve or its transform
+    :param mode: 'frenet', 'fixed' or 'rmf', see curve_frames
+    :param up: up vector
+    '''
+
+    paths = [x for x in xforms if isinstance(x, om.MDagPath)]
+    if len(paths) != len(xforms):
+        paths = dag_paths(xforms)
+    matrices = curve_frames(curve, len(paths), mode, up)
+    set_world_matrices(paths, matrices)
+
+
+def align_selected_to_curve(mode='frenet'):
+    sel = cmds.ls(sl=True, long=True)
+    align_to_curve(sel[:-1], sel[-1], mode)
+
 
+def sweep_curves(curves, profile=None, **attrs):
+    '''Create a sweepCurves node sweeping a profile along curves into one
+    mesh.
 
-def build_matrix(normal, tangent, position):
+    :param curves: curves to sweep along
+    :param profile: optional profile curve, defaults to a circle
+    :param attrs: values of the node's attributes like radius=0.05
+    :returns: sweepCurves node and the mesh transform
+    '''
 
-    bitangent = (normal ^ tangent).normalize()
-    tangent = (normal ^ bitangent).normalize()
-    normal = (tangent ^ bitangent).normalize()
-    return om.MMatrix([
-        tangent[0], tangent[1], tangent[2], 0,
-        bitangent[0], bitangent[1], bitangent[2], 0,
-        normal[0], normal[1], normal[2], 0,
-        position[0], position[1], position[2], 1
-    ])
+    safe_load('sweepCurves')
 
+    node = cmds.createNode('sweepCurves')
+    for i, path in enumerate(curveio.curve_paths(curves)):
+        cmds.connectAttr(
+            path.fullPathName() + '.worldSpace[0]',
+            '{}.inputCurve[{}]'.format(node, i)
+        )
+    if profile:
+        path = curveio.curve_paths([profile])[0]
+        cmds.connectAttr(path.fullPathName() + '.local', node + '.profileCurve')
+    for attr, value in attrs.items():
+        cmds.setAttr(node + '.' + attr, value)
 
-def align_to_curve(xforms, curve):
+    shape = cmds.createNode('mesh')
+    cmds.connectAttr(node + '.outputMesh', shape + '.inMesh')
+    cmds.sets(shape, edit=True, forceElement='initialShadingGroup')
+    return node, cmds.listRelatives(shape, parent=True)[0]
 
-    curve_fn = to_curve_fn(curve)
-    num_xforms = len(xforms)
-    param_step = curve_fn.numSpans / float(num_xforms - 1)
-    for i, xform in enumerate(xforms):
-        param = i * param_step
-        normal = curve_fn.normal(param, om.MSpace.kWorld)
-        tangent = -curve_fn.tangent(param, om.MSpace.kWorld)
-        position = curve_fn.getPointAtParam(param, om.MSpace.kWorld)
-        matrix = build_matrix(normal, tangent, position)
-        cmds.xform(xform, ws=True, matrix=matrix)
 
+def sweep_selected_curves(**attrs):
+    '''Sweep the first selected curve along the rest, see sweep_curves'''
 
-def align_selected_to_curve():
     sel = cmds.ls(sl=True, long=True)
-    align_to_curve(sel[:-1], sel[-1])
+    return sweep_curves(sel[1:], sel[0], **attrs)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+'''
+framecache
+==========
+Per frame cache of animated curves, like a baked hair simulation. Like
+mayakit.nurbs this module does not depend on Maya.
+
+Curves keep their knots, degrees and forms over time, only their cvs move.
+A cache is a directory holding the curves of the first frame as a
+mayakit.curvecache cache, the frame times and every frame's cvs in one raw
+little endian file, plus a json header. Every frame has the same size, so
+a frame is found by its index alone. Readers memory map the files, so
+fetching a frame is a view into the file that only touches that frame's
+cvs, no matter how long the cache is.
+
+Like mayakit.curvecache the header records how many frames have been
+committed, frames written after the last commit are dropped when the cache
+is opened for appending again.
+
+Example::
+
+    with FrameCacheWriter('sim.frames', packed) as w:
+        for frame in range(1, 101):
+            w.append(frame, read_cvs(frame))
+
+    cache = FrameCache('sim.frames')
+    packed = cache.packed(42)
+'''
+from __future__ import division
+import json
+import os
+
+import numpy as np
+
+from . import nurbs
+from .curvecache import CurveCache, CurveCacheWriter
+
+VERSION = 1
+HEADER = 'header.json'
+TOPOLOGY = 'topology.curves'
+POINTS = 'points.bin'
+FRAMES = 'frames.bin'
+FRAMES_DTYPE = '<f8'
+
+
+def read_header(path):
+    '''Read the header of a cache'''
+
+    with open(os.path.join(path, HEADER), 'r') as f:
+        header = json.load(f)
+    if header['version'] > VERSION:
+        raise ValueError('Unsupported frame cache version {}'.format(header['version']))
+    return header
+
+
+class FrameCacheWriter(object):
+    '''Append frames to a cache, creating it if it does not exist.
+
+    :param path: directory of the cache
+    :param topology: PackedCurves of the first frame, ignored when
+        appending to an existing cache
+    :param dtype: dtype cvs are stored as, '<f4' halves the size of a cache
+    :param fields: per curve metadata fields stored with the topology, see
+        mayakit.curvecache.CurveCacheWriter
+    :param values: one array of values per field
+    '''
+
+    def __init__(self, path, topology=None, dtype='<f8', fields=None, **values):
+        self.path = path
+        if os.path.exists(os.path.join(path, HEADER)):
+            self.header = read_header(path)
+            self._truncate()
+        else:
+            if topology is None:
+                raise ValueError('A new frame cache needs a topology')
+            if not os.path.isdir(path):
+                os.makedirs(path)
+            with CurveCacheWriter(
+                os.path.join(path, TOPOLOGY),
+                dim=np.shape(topology.cvs)[1],
+                fields=fields
+            ) as w:
+                w.append_packed(topology, **values)
+            self.header = {
+                'version': VERSION,
+                'dtype': np.dtype(dtype).str,
+                'num_frames': 0,
+                'num_cvs': len(topology.cvs),
+                'dim': np.shape(topology.cvs)[1],
+            }
+            for name in (POINTS, FRAMES):
+                open(os.path.join(path, name), 'wb').close()
+            self.commit()
+
+        frames = np.fromfile(os.path.join(path, FRAMES), dtype=FRAMES_DTYPE)
+        self._last_frame = frames[-1] if len(frames) else None
+        self._files = dict(
+            (name, open(os.path.join(path, name), 'ab'))
+            for name in (POINTS, FRAMES)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def frame_shape(self):
+        '''Shape of the cvs of one frame'''
+
+        return (self.header['num_cvs'], self.header['dim'])
+
+    def _truncate(self):
+        '''Drop frames written after the last commit'''
+
+        header = self.header
+        frame_size = np.dtype(header['dtype']).itemsize * int(np.prod(self.frame_shape))
+        sizes = {
+            POINTS: header['num_frames'] * frame_size,
+            FRAMES: header['num_frames'] * np.dtype(FRAMES_DTYPE).itemsize,
+        }
+        for name, size in sizes.items():
+            with open(os.path.join(self.path, name), 'r+b') as f:
+                f.truncate(size)
+
+    def append(self, frame, cvs):
+        '''Append the cvs of all curves at a frame
+
+        :param frame: time of the frame, greater than the last frame
+        :param cvs: (num_cvs, dim) cvs in the order of the topology
+        '''
+
+        if np.shape(cvs) != self.frame_shape:
+            raise ValueError('Expected cvs of shape {}, got {}'.format(
+                self.frame_shape, np.shape(cvs)
+            ))
+        if self._last_frame is not None and frame <= self._last_frame:
+            raise ValueError('Frame {} is not after frame {}'.format(
+                frame, self._last_frame
+            ))
+
+        np.ascontiguousarray(cvs, dtype=self.header['dtype']).tofile(self._files[POINTS])
+        np.array([frame], dtype=FRAMES_DTYPE).tofile(self._files[FRAMES])
+        self._last_frame = frame
+        self.header['num_frames'] += 1
+
+    def commit(self):
+        '''Flush data and write the header so readers see appended frames'''
+
+        for f in getattr(self, '_files', {}).values():
+            f.flush()
+        with open(os.path.join(self.path, HEADER), 'w') as f:
+            json.dump(self.header, f, indent=4, sort_keys=True)
+
+    def close(self):
+        '''Commit and close all files'''
+
+        self.commit()
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+
+class FrameCache(object):
+    '''Read a cache written by FrameCacheWriter.
+
+    Frames are memory mapped, the cvs of a frame are a view into the file.
+
+    :param path: directory of the cache
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.header = header = read_header(path)
+        self.topology = CurveCache(os.path.join(path, TOPOLOGY))
+        num_frames = header['num_frames']
+        if num_frames:
+            self.points = np.memmap(
+                os.path.join(path, POINTS),
+                dtype=header['dtype'],
+                mode='r',
+                shape=(num_frames, header['num_cvs'], header['dim'])
+            )
+            self.frames = np.memmap(
+                os.path.join(path, FRAMES),
+                dtype=FRAMES_DTYPE,
+                mode='r',
+                shape=(num_frames,)
+            )
+        else:
+            self.points = np.zeros((0, header['num_cvs'], header['dim']))
+            self.frames = np.zeros(0)
+
+    def __len__(self):
+        return self.header['num_frames']
+
+    def index(self, frame):
+        '''Get the index of the last cached frame at or before frame,
+        holding the first and last frames outside of the cached range
+        '''
+
+        if not len(self):
+            raise IndexError('Frame cache is empty')
+        index = np.searchsorted(self.frames, frame, side='right') - 1
+        return int(min(max(index, 0), len(self) - 1))
+
+    def cvs(self, frame):
+        '''Get the cvs of all curves at frame'''
+
+        return self.points[self.index(frame)]
+
+    def packed(self, frame):
+        '''Get all curves at frame as a PackedCurves'''
+
+        topology = self.topology
+        return nurbs.PackedCurves(
+            cvs=self.cvs(frame),
+            cv_offsets=topology.cv_offsets,
+            knots=topology.knots,
+            knot_offsets=topology.knot_offsets,
+            degrees=topology.degrees,
+            forms=topology.forms,
+        )
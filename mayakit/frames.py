@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+'''
+frames
+======
+Vectorized frames along sampled curves. Like mayakit.nurbs this module does
+not depend on Maya.
+
+A frame is made of a unit tangent, normal and bitangent. Frames are turned
+into matrices the same way mayakit has always laid them out: one row per
+axis, tangent, bitangent, normal and finally the position.
+'''
+from __future__ import division
+
+import numpy as np
+
+from .nurbs import normalize
+
+
+def dot(a, b):
+    '''Row wise dot product of two arrays of vectors'''
+
+    return np.einsum('...i,...i->...', a, b)
+
+
+def _prefix_products(matrices):
+    '''Cumulative products M[i] @ ... @ M[0] of an array of 3x3 matrices
+
+    Uses a Hillis-Steele scan so the work is done in log2(n) vectorized
+    steps. Products are rescaled as they grow so long chains of projections
+    do not underflow, only the direction of the vectors they map matters.
+    Leading axes are treated as independent chains.
+    '''
+
+    products = np.array(matrices, dtype=np.float64)
+    shift = 1
+    while shift < products.shape[-3]:
+        combined = np.matmul(products[..., shift:, :, :], products[..., :-shift, :, :])
+        scale = np.abs(combined).max(axis=(-2, -1), keepdims=True)
+        products[..., shift:, :, :] = np.divide(
+            combined,
+            scale,
+            out=combined,
+            where=scale != 0
+        )
+        shift *= 2
+    return products
+
+
+def _transport(seed, matrices):
+    '''Carry seed through the matrices, returning one vector per sample'''
+
+    shape = matrices.shape[:-3] + (matrices.shape[-3] + 1, 3)
+    vectors = np.empty(shape)
+    vectors[..., 0, :] = seed
+    if matrices.shape[-3]:
+        vectors[..., 1:, :] = np.matmul(
+            _prefix_products(matrices),
+            seed[..., None, :, None]
+        )[..., 0]
+    return vectors
+
+
+def _householder(vectors):
+    '''Reflection matrices across the planes with the given normals'''
+
+    lengths = dot(vectors, vectors)[..., None, None]
+    outer = vectors[..., :, None] * vectors[..., None, :]
+    reflect = np.divide(
+        2 * outer,
+        lengths,
+        out=np.zeros_like(outer),
+        where=lengths != 0
+    )
+    return np.eye(3) - reflect
+
+
+def seed_normal(tangent, up=None):
+    '''Get the first normal of a frame, perpendicular to tangent
+
+    :param tangent: unit tangent of the first sample
+    :param up: preferred up vector, when it's None or parallel to tangent the
+        axis least aligned with tangent is used instead
+    '''
+
+    tangent = np.asarray(tangent, dtype=np.float64)
+    if up is not None:
+        up = np.asarray(up, dtype=np.float64)
+        normal = up - dot(up, tangent) * tangent
+        if np.linalg.norm(normal) > 1e-8:
+            return normal / np.linalg.norm(normal)
+
+    axis = np.eye(3)[np.argmin(np.abs(tangent))]
+    normal = axis - dot(axis, tangent) * tangent
+    return normal / np.linalg.norm(normal)
+
+
+def seed_normals(tangents, up=None):
+    '''Vectorized seed_normal for the first tangents of many curves'''
+
+    tangents = np.asarray(tangents, dtype=np.float64)
+    if up is None:
+        up = (0, 0, 0)
+    up = np.broadcast_to(np.asarray(up, dtype=np.float64), tangents.shape)
+    return normalize(_perpendicular(tangents, up))
+
+
+def orthonormalize(tangents, normals):
+    '''Make normals perpendicular to tangents, returning bitangent, normal'''
+
+    bitangents = normalize(np.cross(tangents, normals))
+    normals = normalize(np.cross(bitangents, tangents))
+    return bitangents, normals
+
+
+def twist_normals(tangents, normals, angles):
+    '''Rotate normals around their tangents by angles in radians'''
+
+    angles = np.asarray(angles, dtype=np.float64)[..., None]
+    bitangents = np.cross(tangents, normals)
+    return normals * np.cos(angles) + bitangents * np.sin(angles)
+
+
+def ramp(num, roll=0.0, twist=0.0):
+    '''Angles starting at roll and ramping linearly to roll + twist'''
+
+    return roll + np.linspace(0, 1, num) * twist
+
+
+def _perpendicular(tangents, vectors):
+    '''Project vectors perpendicular to tangents. Where a vector is parallel
+    to its tangent the axis least aligned with the tangent is used instead.
+    '''
+
+    normals = vectors - dot(vectors, tangents)[:, None] * tangents
+    parallel = np.linalg.norm(normals, axis=1) < 1e-8
+    if parallel.any():
+        axes = np.eye(3)[np.argmin(np.abs(tangents[parallel]), axis=1)]
+        normals[parallel] = (
+            axes - dot(axes, tangents[parallel])[:, None] * tangents[parallel]
+        )
+    return normals
+
+
+def fixed_up_frames(tangents, up=(0, 1, 0)):
+    '''Frames whose normals are the up vector made perpendicular to each
+    tangent.
+
+    :param tangents: (n, 3) unit tangents
+    :param up: up vector shared by all samples
+    :returns: bitangents, normals
+    '''
+
+    tangents = np.asarray(tangents, dtype=np.float64)
+    up = np.broadcast_to(np.asarray(up, dtype=np.float64), tangents.shape)
+    return orthonormalize(tangents, _perpendicular(tangents, up))
+
+
+def frenet_frames(tangents, curvatures, up=(0, 1, 0)):
+    '''Frenet frames, normals point towards the center of curvature.
+
+    Where the curve is straight the normal is undefined, the normal of
+    fixed_up_frames is used there instead.
+
+    :param tangents: (n, 3) unit tangents
+    :param curvatures: (n, 3) second derivatives of the curve
+    :param up: up vector for straight parts of the curve
+    :returns: bitangents, normals
+    '''
+
+    tangents = np.asarray(tangents, dtype=np.float64)
+    curvatures = np.asarray(curvatures, dtype=np.float64)
+    normals = curvatures - dot(curvatures, tangents)[:, None] * tangents
+    lengths = np.linalg.norm(normals, axis=1)
+    straight = lengths <= 1e-8 * np.maximum(np.linalg.norm(curvatures, axis=1), 1)
+    if straight.any():
+        up = np.broadcast_to(np.asarray(up, dtype=np.float64), tangents.shape)
+        normals[straight] = _perpendicular(tangents[straight], up[straight])
+    return orthonormalize(tangents, normals)
+
+
+def projected_frames(tangents, up=(0, 1, 0)):
+    '''Frames carrying a normal from sample to sample.
+
+    Each normal is the previous one projected onto the plane perpendicular to
+    the current tangent. This is how pointsOnCurve always computed frames.
+
+    :param tangents: (n, 3) unit tangents
+    :param up: normal of the first sample before projection
+    :returns: bitangents, normals
+    '''
+
+    tangents = np.asarray(tangents, dtype=np.float64)
+    projections = np.eye(3) - tangents[:, :, None] * tangents[:, None, :]
+    normals = np.matmul(
+        _prefix_products(projections),
+        np.asarray(up, dtype=np.float64)
+    )
+    return orthonormalize(tangents, normals)
+
+
+def rotation_minimizing_frames(positions, tangents, up=None):
+    '''Rotation minimizing frames using the double reflection method.
+
+    Wang, Juttler, Zheng and Liu - Computation of Rotation Minimizing Frames.
+    Each step between samples is the product of two reflections, these are
+    built for all samples at once and then accumulated.
+
+    Frames of many curves with the same number of samples are computed
+    together by passing (m, n, 3) arrays.
+
+    :param positions: (n, 3) or (m, n, 3) sample positions
+    :param tangents: (n, 3) or (m, n, 3) unit tangents
+    :param up: optional up vector to seed the first normal with
+    :returns: bitangents, normals
+    '''
+
+    positions = np.asarray(positions, dtype=np.float64)
+    tangents = np.asarray(tangents, dtype=np.float64)
+
+    reflect_a = _householder(positions[..., 1:, :] - positions[..., :-1, :])
+    reflected = np.matmul(reflect_a, tangents[..., :-1, :, None])[..., 0]
+    reflect_b = _householder(tangents[..., 1:, :] - reflected)
+    steps = np.matmul(reflect_b, reflect_a)
+
+    if tangents.ndim == 2:
+        seed = seed_normal(tangents[0], up)
+    else:
+        seed = seed_normals(tangents[:, 0], up)
+    normals = _transport(seed, steps)
+    return orthonormalize(tangents, normals)
+
+
+def to_matrices(positions, tangents, bitangents, normals):
+    '''Pack frames into an (n, 4, 4) array of row major matrices'''
+
+    num = len(positions)
+    matrices = np.zeros((num, 4, 4))
+    matrices[:, 0, :3] = tangents
+    matrices[:, 1, :3] = bitangents
+    matrices[:, 2, :3] = normals
+    matrices[:, 3, :3] = positions
+    matrices[:, 3, 3] = 1
+    return matrices
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+'''
+guides
+======
+Interpolate dense child strands from a few guide strands. Like
+mayakit.nurbs this module does not depend on Maya.
+
+Each child is bound once to its k nearest guides by root position, with
+inverse distance weights and the offset of its root from the weighted
+guide roots. Every frame after that a child is the weighted sum of its
+guides' samples plus its offset, computed for all children at once.
+
+Example::
+
+    binding = bind(guide_points[:, 0], child_roots, k=4)
+    for frame in frames:
+        children = interpolate(binding, guide_points_at(frame))
+'''
+from __future__ import division
+from collections import namedtuple
+
+import numpy as np
+
+from . import knotvectors, nurbs
+
+Binding = namedtuple('Binding', 'indices weights offsets')
+
+
+def nearest_guides(guide_roots, child_roots, k=4, chunk=4096):
+    '''Find the k nearest guides of each child.
+
+    Distances are computed a chunk of children at a time, against all
+    guides at once.
+
+    :param guide_roots: (guides, 3) positions
+    :param child_roots: (children, 3) positions
+    :param k: number of guides per child, at most the number of guides
+    :param chunk: number of children per chunk
+    :returns: (children, k) guide indices and squared distances, nearest
+        first
+    '''
+
+    guides = np.asarray(guide_roots, dtype=np.float64)
+    children = np.asarray(child_roots, dtype=np.float64)
+    k = min(k, len(guides))
+    guide_lengths = np.einsum('ij,ij->i', guides, guides)
+
+    indices = np.empty((len(children), k), dtype=np.int64)
+    distances = np.empty((len(children), k))
+    for start in range(0, len(children), chunk):
+        block = children[start:start + chunk]
+        squared = np.dot(block, guides.T)
+        squared *= -2
+        squared += guide_lengths
+        squared += np.einsum('ij,ij->i', block, block)[:, None]
+        np.maximum(squared, 0, out=squared)
+
+        if k < len(guides):
+            nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(k), squared.shape)
+        nearest_distances = np.take_along_axis(squared, nearest, axis=1)
+        order = np.argsort(nearest_distances, axis=1, kind='mergesort')
+        indices[start:start + chunk] = np.take_along_axis(nearest, order, axis=1)
+        distances[start:start + chunk] = np.take_along_axis(nearest_distances, order, axis=1)
+    return indices, distances
+
+
+def guide_weights(distances, power=2):
+    '''Normalized inverse distance weights
+
+    A child on top of a guide follows that guide only.
+
+    :param distances: (children, k) squared distances to guides
+    :param power: falloff exponent of the distance
+    :returns: (children, k) weights summing to 1
+    '''
+
+    scaled = np.asarray(distances, dtype=np.float64) ** (power * 0.5)
+    exact = scaled == 0
+    weights = np.divide(1.0, scaled, out=np.zeros_like(scaled), where=~exact)
+    rows = exact.any(axis=1)
+    weights[rows] = exact[rows]
+    weights /= weights.sum(axis=1, keepdims=True)
+    return weights
+
+
+def blend(indices, weights, values, chunk=512):
+    '''Weighted sum of guide values for each child
+
+    Children are blended a chunk at a time so the values being summed stay
+    in cache.
+
+    :param indices: (children, k) guide indices
+    :param weights: (children, k) weights
+    :param values: (guides, ...) values per guide
+    :param chunk: number of children per chunk
+    :returns: (children, ...) blended values
+    '''
+
+    values = np.asarray(values, dtype=np.float64)
+    extra = (None,) * (values.ndim - 1)
+    result = np.empty((len(indices),) + values.shape[1:])
+    buffer = np.empty((chunk,) + values.shape[1:])
+    for start in range(0, len(indices), chunk):
+        rows = slice(start, start + chunk)
+        blended = result[rows]
+        gathered = buffer[:len(blended)]
+        np.take(values, indices[rows, 0], axis=0, out=blended)
+        blended *= weights[(rows, 0) + extra]
+        for j in range(1, indices.shape[1]):
+            np.take(values, indices[rows, j], axis=0, out=gathered)
+            gathered *= weights[(rows, j) + extra]
+            blended += gathered
+    return result
+
+
+def bind(guide_roots, child_roots, k=4, power=2):
+    '''Bind children to their nearest guides
+
+    :param guide_roots: (guides, 3) positions at bind time
+    :param child_roots: (children, 3) positions
+    :param k: number of guides per child
+    :param power: falloff exponent of the distance
+    :returns: Binding
+    '''
+
+    indices, distances = nearest_guides(guide_roots, child_roots, k)
+    weights = guide_weights(distances, power)
+    offsets = np.asarray(child_roots, dtype=np.float64) - blend(indices, weights, guide_roots)
+    return Binding(indices, weights, offsets)
+
+
+def interpolate(binding, guide_points):
+    '''Interpolate children from guides
+
+    :param binding: Binding
+    :param guide_points: (guides, samples, 3) points along each guide
+    :returns: (children, samples, 3) points along each child
+    '''
+
+    children = blend(binding.indices, binding.weights, guide_points)
+    children += binding.offsets[:, None]
+    return children
+
+
+def pack_children(points, degree=3):
+    '''Pack interpolated children as curves with their points as cvs
+
+    :param points: (children, samples, 3) points along each child
+    :param degree: degree of the curves, lowered for short children
+    :returns: PackedCurves
+    '''
+
+    num_children, samples = np.shape(points)[:2]
+    degree = min(degree, samples - 1)
+    knots = knotvectors.uniform(samples, degree)
+    return nurbs.PackedCurves(
+        cvs=np.reshape(points, (-1, 3)),
+        cv_offsets=nurbs.offsets(np.full(num_children, samples)),
+        knots=np.tile(knots, num_children),
+        knot_offsets=nurbs.offsets(np.full(num_children, len(knots))),
+        degrees=np.full(num_children, degree, dtype=np.int64),
+        forms=np.ones(num_children, dtype=np.int64),
+    )
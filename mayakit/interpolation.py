@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+'''
+interpolation
+=============
+Interpolation and falloff kernels that work on numpy arrays. Like
+mayakit.nurbs this module does not depend on Maya.
+
+Every kernel accepts scalars, numpy arrays or vector types like MVector and
+broadcasts like numpy does. Scalars in give a float out and a single vector
+in gives a vector of the same type out, so the kernels drop in wherever the
+old scalar helpers were used::
+
+    >>> hermite(0.5)
+    0.5
+    >>> lerp(MVector(0, 0, 0), MVector(2, 0, 0), 0.25)
+    maya.api.OpenMaya.MVector(0.5, 0, 0)
+    >>> lerp(0, 10, np.linspace(0, 1, 5))
+    array([ 0. ,  2.5,  5. ,  7.5, 10. ])
+'''
+from __future__ import division
+from functools import wraps
+from numbers import Number
+
+import numpy as np
+
+
+# Checked before Number, isinstance against an abstract base class is slow
+_SCALARS = (float, int, np.floating, np.integer)
+
+
+def _as_array(value):
+    '''Convert a scalar, array or vector to an array, also returning the
+    vector type to convert results back to
+    '''
+
+    if isinstance(value, (Number, np.ndarray, np.generic)):
+        return value, None
+    if isinstance(value, (list, tuple)):
+        return np.asarray(value, dtype=np.float64), None
+    return np.array(list(value), dtype=np.float64), type(value)
+
+
+def _restore(result, scalar, vector_typ):
+    if scalar:
+        return float(result)
+    if vector_typ is not None and np.ndim(result) == 1:
+        return vector_typ(*result.tolist())
+    return result
+
+
+def shim(fn):
+    '''Wrap an array kernel so scalars and vectors come back as they went
+    in. Kernels used inside other kernels are called unwrapped.
+    '''
+
+    @wraps(fn)
+    def kernel(*args):
+        for arg in args:
+            if not isinstance(arg, _SCALARS):
+                break
+        else:
+            return float(fn(*args))
+
+        values = []
+        vector_typ = None
+        scalar = True
+        for arg in args:
+            value, typ = _as_array(arg)
+            vector_typ = vector_typ or typ
+            scalar = scalar and isinstance(value, Number)
+            values.append(value)
+        return _restore(fn(*values), scalar, vector_typ)
+    return kernel
+
+
+def _lerp(a, b, t):
+    '''Linear interpolation between a and b'''
+
+    return a * (1.0 - t) + b * t
+
+
+def _hermite(t):
+    '''Quintic smootherstep of t'''
+
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def _invhermite(t):
+    '''Reflection of hermite across the line y = t'''
+
+    return t + (t - _hermite(t))
+
+
+def _smoothstep(a, b, t):
+    '''Hermite interpolation between a and b'''
+
+    return _lerp(a, b, _hermite(t))
+
+
+def _cool(t):
+    '''Sine ease out of t'''
+
+    return np.sin(t * np.pi * 0.5)
+
+
+def _inverse_square(t):
+    '''Reciprocal falloff of t, 1 where t is 0'''
+
+    t = np.asarray(t, dtype=np.float64)
+    return np.divide(1.0, t, out=np.ones_like(t), where=t != 0)
+
+
+lerp = shim(_lerp)
+hermite = shim(_hermite)
+invhermite = shim(_invhermite)
+smoothstep = shim(_smoothstep)
+cool = shim(_cool)
+inverse_square = shim(_inverse_square)
+
+
+def linspace(tmin, tmax, n):
+    '''Evenly spaced values from tmin to tmax, see numpy.linspace
+
+    :param tmin: Minimum value
+    :param tmax: Maximum value
+    :param n: Number of values
+    '''
+
+    return np.linspace(tmin, tmax, n)
+
+
+def graph_points(fn, params, scale=10, offset=(0, 0, 0)):
+    '''Points of a graph of fn in the xy plane
+
+    fn is called once with the array of params, functions that only take
+    scalars are called once per param instead.
+
+    :param fn: kernel to graph
+    :param params: values to graph fn at
+    :param scale: scale of both axes
+    :param offset: position of the graph's origin
+    :returns: (len(params), 3) array of points
+    '''
+
+    params = np.asarray(params, dtype=np.float64)
+    try:
+        values = np.asarray(fn(params), dtype=np.float64)
+    except TypeError:
+        values = None
+    if values is None or values.shape != params.shape:
+        values = np.array([fn(t) for t in params.tolist()], dtype=np.float64)
+
+    points = np.empty((len(params), 3))
+    points[:, 0] = params * scale + offset[0]
+    points[:, 1] = values * scale + offset[1]
+    points[:, 2] = offset[2]
+    return points
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+'''
+knotvectors
+===========
+Knot vectors for open, closed and periodic nurbsCurves.
+
+All knot vectors use Maya's convention of num_cvs + degree - 1 knots. For
+periodic curves num_cvs includes the degree cvs that overlap the start of
+the curve. Uniform knot vectors are memoized, numpy arrays are returned
+read only and other array types are returned as copies of a cached array.
+'''
+from __future__ import division
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+
+__all__ = ['OPEN', 'CLOSED', 'PERIODIC', 'uniform', 'chord_length',
+           'centripetal']
+
+# Values match MFnNurbsCurve.kOpen, kClosed and kPeriodic
+OPEN = 1
+CLOSED = 2
+PERIODIC = 3
+
+
+def memoize(maxsize=128):
+    '''Cache the results of a function in a bounded least recently used cache
+
+    :param maxsize: maximum number of results to keep
+    '''
+
+    def decorator(fn):
+        cache = OrderedDict()
+
+        @wraps(fn)
+        def wrapper(*args):
+            try:
+                value = cache.pop(args)
+            except KeyError:
+                value = fn(*args)
+                if len(cache) >= maxsize:
+                    cache.popitem(last=False)
+            cache[args] = value
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+def validate(num_cvs, degree, form):
+    '''Raise a ValueError if no curve can have these properties'''
+
+    if degree < 1:
+        raise ValueError('degree must be at least 1, got {}'.format(degree))
+    if form not in (OPEN, CLOSED, PERIODIC):
+        raise ValueError('form must be OPEN, CLOSED or PERIODIC')
+    min_cvs = degree * 2 + 1 if form == PERIODIC else degree + 1
+    if num_cvs < min_cvs:
+        raise ValueError(
+            'A degree {} curve needs at least {} cvs, got {}'.format(
+                degree, min_cvs, num_cvs
+            )
+        )
+
+
+def from_intervals(intervals, degree, form):
+    '''Build a knot vector from the lengths of a curve's spans
+
+    :param intervals: length of each span, for periodic curves the intervals
+        repeat to wrap around the seam
+    :param degree: degree of curve
+    :param form: OPEN, CLOSED or PERIODIC
+    '''
+
+    intervals = np.asarray(intervals, dtype=np.float64)
+    if form == PERIODIC:
+        spans = len(intervals)
+        wrapped = intervals[np.arange(-(degree - 1), spans + degree - 1) % spans]
+        knots = np.concatenate(([0], np.cumsum(wrapped)))
+        return knots - knots[degree - 1]
+
+    inner = np.concatenate(([0], np.cumsum(intervals)))
+    return np.concatenate((
+        np.full(degree - 1, inner[0]),
+        inner,
+        np.full(degree - 1, inner[-1]),
+    ))
+
+
+@memoize(maxsize=256)
+def _uniform(num_cvs, degree, form):
+    validate(num_cvs, degree, form)
+    knots = from_intervals(np.ones(num_cvs - degree), degree, form)
+    knots.flags.writeable = False
+    return knots
+
+
+@memoize(maxsize=256)
+def _uniform_as(num_cvs, degree, form, array_typ):
+    return array_typ(_uniform(num_cvs, degree, form))
+
+
+def uniform(num_cvs, degree, form=OPEN, array_typ=np.ndarray):
+    '''Get a uniform knot vector
+
+    Spans have unit length, so the parameter range is 0 to num_cvs - degree.
+
+    :param num_cvs: number of cvs
+    :param degree: degree of curve
+    :param form: OPEN, CLOSED or PERIODIC
+    :param array_typ: type of array to return like om.MDoubleArray or list
+    '''
+
+    if array_typ is np.ndarray:
+        return _uniform(int(num_cvs), int(degree), int(form))
+    return array_typ(_uniform_as(int(num_cvs), int(degree), int(form), array_typ))
+
+
+def _parameterized(points, degree, form, exponent, array_typ):
+    '''Knot vector with spans proportional to distances between points'''
+
+    points = np.asarray(points, dtype=np.float64)
+    num_cvs = len(points)
+    validate(num_cvs, degree, form)
+
+    if form == PERIODIC:
+        unique = points[:num_cvs - degree]
+        steps = np.roll(unique, -1, axis=0) - unique
+    else:
+        steps = np.diff(points, axis=0)
+    distances = np.linalg.norm(steps, axis=1) ** exponent
+
+    spans = num_cvs - degree
+    if form == PERIODIC:
+        intervals = distances
+    else:
+        # Average the parameters of the points onto the span boundaries,
+        # see The NURBS Book eq. 9.8
+        params = np.concatenate(([0], np.cumsum(distances)))
+        params = np.convolve(params, np.ones(degree) / degree, mode='valid')
+        intervals = np.diff(params[:spans + 1])
+
+    total = intervals.sum()
+    if not total > 0:
+        return uniform(num_cvs, degree, form, array_typ)
+
+    knots = from_intervals(intervals * (spans / total), degree, form)
+    if array_typ is np.ndarray:
+        return knots
+    return array_typ(knots)
+
+
+def chord_length(points, degree, form=OPEN, array_typ=np.ndarray):
+    '''Knot vector with spans proportional to the distance between cvs
+
+    The parameter range is scaled to 0 to num_cvs - degree to match
+    uniform knot vectors.
+
+    :param points: cvs of the curve
+    :param degree: degree of curve
+    :param form: OPEN, CLOSED or PERIODIC
+    :param array_typ: type of array to return like om.MDoubleArray or list
+    '''
+
+    return _parameterized(points, degree, form, 1.0, array_typ)
+
+
+def centripetal(points, degree, form=OPEN, array_typ=np.ndarray):
+    '''Knot vector with spans proportional to the square root of the
+    distance between cvs, see chord_length.
+    '''
+
+    return _parameterized(points, degree, form, 0.5, array_typ)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+'''
+modifiers
+=========
+Undoable edits through MDGModifier and MDagModifier.
+
+Edits made through a modifier from a script are not recorded by undo. run
+hands the modifier to the mayakitModifier command, which fills and applies
+it inside its doIt and undoes or redoes it as a single step.
+
+Example::
+
+    def build(modifier):
+        node = modifier.createNode('transform')
+        modifier.renameNode(node, 'grp')
+        modifier.doIt()
+        return node
+
+    node = run(build)
+'''
+import maya.api.OpenMaya as om
+from maya import cmds
+
+_pending = []
+
+
+def run(fn, modifier=None):
+    '''Call fn with a modifier inside the mayakitModifier command
+
+    fn must call modifier.doIt itself, as often as it needs to. Everything
+    applied through the modifier is undone in one step.
+
+    :param fn: callable taking the modifier
+    :param modifier: MDGModifier or MDagModifier, defaults to a new
+        MDagModifier
+    :returns: the return value of fn
+    '''
+
+    from .plugins import safe_load
+    safe_load('mayakitModifier')
+
+    entry = [fn, modifier or om.MDagModifier(), None]
+    _pending.append(entry)
+    try:
+        cmds.mayakitModifier()
+    finally:
+        if entry in _pending:
+            _pending.remove(entry)
+    return entry[2]
+
+
+def pop():
+    '''Get the next pending entry, used by the mayakitModifier command'''
+
+    return _pending.pop()
@@ -0,0 +1,508 @@
+# -*- coding: utf-8 -*-
+'''
+nurbs
+=====
+Vectorized nurbsCurve evaluation that does not depend on Maya.
+
+Curves are described the same way MFnNurbsCurve describes them: an array of
+cvs as returned by cvPositions(), Maya's knot array (num_cvs + degree - 1
+knots, the two superfluous end knots are omitted) and a degree. All
+parameters are evaluated at once using de Boor's algorithm.
+'''
+from __future__ import division
+from collections import OrderedDict, namedtuple
+from math import factorial
+import hashlib
+
+import numpy as np
+
+
+def full_knots(knots):
+    '''Pad a Maya knot array with the two superfluous end knots
+
+    :param knots: Maya knot array
+    '''
+
+    knots = np.asarray(knots, dtype=np.float64)
+    return np.concatenate((knots[:1], knots, knots[-1:]))
+
+
+def domain(knots, degree):
+    '''Get the min and max parameter of a curve
+
+    :param knots: Maya knot array
+    :param degree: degree of curve
+    '''
+
+    return float(knots[degree - 1]), float(knots[-degree])
+
+
+def span_params(knots, degree, subdivisions=1):
+    '''Get the distinct knots in a curve's domain, subdividing each span
+
+    :param knots: Maya knot array
+    :param degree: degree of curve
+    :param subdivisions: number of parameters per knot span
+    '''
+
+    knots = np.asarray(knots, dtype=np.float64)
+    umin, umax = domain(knots, degree)
+    breaks = np.unique(knots[(knots >= umin) & (knots <= umax)])
+    steps = np.linspace(0, 1, subdivisions + 1)[:-1]
+    params = breaks[:-1, None] + np.diff(breaks)[:, None] * steps
+    return np.append(params.ravel(), umax)
+
+
+def find_spans(full, num_cvs, degree, params, side='right'):
+    '''Find the knot span of each parameter
+
+    :param full: knot vector including end knots, see full_knots
+    :param num_cvs: number of cvs
+    :param degree: degree of curve
+    :param params: array of parameters
+    :param side: span to use for parameters that land on a knot, "left" is
+        useful to get the derivatives at the end of a span
+    '''
+
+    spans = np.searchsorted(full, params, side=side) - 1
+    return np.clip(spans, degree, num_cvs - 1)
+
+
+def from_curve_fn(curve_fn, space=None):
+    '''Pull cvs, knots and degree from an MFnNurbsCurve as arrays
+
+    :param curve_fn: MFnNurbsCurve
+    :param space: optional MSpace to get cvs in, defaults to object space
+    :returns: cvs, knots, degree
+    '''
+
+    if space is None:
+        cvs = curve_fn.cvPositions()
+    else:
+        cvs = curve_fn.cvPositions(space)
+    cvs = np.array(cvs, dtype=np.float64)
+    knots = np.array(curve_fn.knots(), dtype=np.float64)
+    return cvs, knots, curve_fn.degree
+
+
+def _binomial(n, k):
+    return factorial(n) // (factorial(k) * factorial(n - k))
+
+
+def _de_boor(cvs, full, spans, params, degree, order, levels):
+    '''Run levels of de Boor's algorithm on the local cvs of each parameter
+
+    :param cvs: (n, degree - order + 1, dim) local cvs of a derivative curve
+    :param full: knot vector of the original curve
+    :param spans: span of each parameter in the original curve
+    :param params: (n, 1) parameters
+    :param degree: degree of the original curve
+    :param order: derivative the local cvs belong to
+    :param levels: number of levels to run, the last cv of the final level
+        is the point on the curve
+    '''
+
+    cvs = cvs.copy()
+    q = degree - order
+    for r in range(1, levels + 1):
+        j = np.arange(r, q + 1)
+        lo = full[spans[:, None] - degree + order + j]
+        hi = full[spans[:, None] + j + 1 - r]
+        span = hi - lo
+        alpha = np.divide(
+            params - lo,
+            span,
+            out=np.zeros_like(span),
+            where=span != 0
+        )[..., None]
+        cvs[:, r:] = (1 - alpha) * cvs[:, r - 1:q] + alpha * cvs[:, r:q + 1]
+    return cvs
+
+
+def _polynomial_derivatives(local, full, degree, spans, params, order):
+    '''Positions and derivatives of a non-rational curve
+
+    :param local: (n, degree + 1, dim) cvs influencing each parameter
+    '''
+
+    num_params = len(params)
+    params = params[:, None]
+
+    if order == 1:
+        # The last level of de Boor's algorithm lerps between two points
+        # whose difference is proportional to the first derivative.
+        local = _de_boor(local, full, spans, params, degree, 0, degree - 1)
+        a, b = local[:, -2], local[:, -1]
+        lo = full[spans][:, None]
+        width = full[spans + 1][:, None] - lo
+        alpha = (params - lo) / width
+        return [a + alpha * (b - a), degree * (b - a) / width]
+
+    results = []
+    for k in range(order + 1):
+        q = degree - k
+        if q < 0:
+            results.append(np.zeros((num_params, local.shape[2])))
+            continue
+
+        point = _de_boor(local, full, spans, params, degree, k, q)[:, q]
+        results.append(np.ascontiguousarray(point))
+
+        if k < order and q > 0:
+            # Local cvs of the next derivative curve
+            j = np.arange(q)
+            hi = full[spans[:, None] + j + 1]
+            lo = full[spans[:, None] - degree + k + j + 1]
+            span = hi - lo
+            scale = np.divide(
+                float(q),
+                span,
+                out=np.zeros_like(span),
+                where=span != 0
+            )
+            local = (local[:, 1:] - local[:, :-1]) * scale[..., None]
+
+    return results
+
+
+def evaluate(cvs, knots, degree, params, order=1, side='right'):
+    '''Evaluate positions and derivatives of a curve at many parameters
+
+    Parameters outside of the curve's domain are evaluated on the nearest
+    end span, use numpy.clip to clamp them first if that is undesired.
+
+    :param cvs: (n, 3) cvs or (n, 4) cvs with weights in the last column
+    :param knots: Maya knot array
+    :param degree: degree of curve
+    :param params: parameters to evaluate
+    :param order: highest derivative to compute
+    :param side: span to evaluate parameters that land on a knot with
+    :returns: list of order + 1 contiguous (len(params), 3) arrays; positions
+        followed by the first, second... derivatives
+    '''
+
+    cvs = np.asarray(cvs, dtype=np.float64)
+    params = np.atleast_1d(np.asarray(params, dtype=np.float64))
+    full = full_knots(knots)
+    spans = find_spans(full, len(cvs), degree, params, side)
+    local = cvs[spans[:, None] - degree + np.arange(degree + 1)]
+    return _evaluate_local(local, full, degree, spans, params, order)
+
+
+def _evaluate_local(local, full, degree, spans, params, order):
+    '''Evaluate gathered local cvs, dividing out weights of rational curves'''
+
+    rational = local.shape[2] == 4 and np.any(local[..., 3] != 1)
+    if not rational:
+        return _polynomial_derivatives(
+            local[..., :3], full, degree, spans, params, order
+        )
+
+    weights = local[..., 3:]
+    homogeneous = np.concatenate((local[..., :3] * weights, weights), axis=2)
+    ders = _polynomial_derivatives(
+        homogeneous, full, degree, spans, params, order
+    )
+
+    results = []
+    for k in range(order + 1):
+        point = ders[k][:, :3].copy()
+        for i in range(1, k + 1):
+            point -= _binomial(k, i) * ders[i][:, 3:] * results[k - i]
+        results.append(point / ders[0][:, 3:])
+    return results
+
+
+def points_at(cvs, knots, degree, params):
+    '''Evaluate positions of a curve at many parameters'''
+
+    return evaluate(cvs, knots, degree, params, order=0)[0]
+
+
+def wrap_cvs(cvs, degree):
+    '''Append the first degree cvs to the end, as a periodic curve expects
+
+    :param cvs: the distinct cvs of a periodic curve
+    :param degree: degree of curve
+    '''
+
+    cvs = np.asarray(cvs)
+    return cvs[np.arange(len(cvs) + degree) % len(cvs)]
+
+
+def normalize(vectors):
+    '''Normalize an array of vectors leaving zero length vectors untouched'''
+
+    lengths = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(
+        vectors,
+        lengths,
+        out=np.zeros_like(vectors),
+        where=lengths != 0
+    )
+
+
+PackedCurves = namedtuple(
+    'PackedCurves',
+    'cvs cv_offsets knots knot_offsets degrees forms'
+)
+PackedCurves.__doc__ = '''Many curves packed into flat arrays.
+
+Curve i owns cvs[cv_offsets[i]:cv_offsets[i + 1]] and
+knots[knot_offsets[i]:knot_offsets[i + 1]]. Forms use the values of
+MFnNurbsCurve.form, 1 open, 2 closed and 3 periodic.
+'''
+
+
+def offsets(counts):
+    '''Convert an array of counts to an array of len(counts) + 1 offsets'''
+
+    return np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+
+def pack(curves):
+    '''Pack curves into a PackedCurves
+
+    :param curves: sequence of (cvs, knots, degree) or
+        (cvs, knots, degree, form) tuples, form defaults to open
+    '''
+
+    curves = list(curves)
+    cvs = [np.asarray(c[0], dtype=np.float64) for c in curves]
+    dim = max(c.shape[1] for c in cvs) if cvs else 3
+    if dim == 4:
+        cvs = [
+            c if c.shape[1] == 4 else np.hstack((c, np.ones((len(c), 1))))
+            for c in cvs
+        ]
+    knots = [np.asarray(c[1], dtype=np.float64) for c in curves]
+    return PackedCurves(
+        cvs=np.concatenate(cvs) if cvs else np.zeros((0, dim)),
+        cv_offsets=offsets([len(c) for c in cvs]),
+        knots=np.concatenate(knots) if knots else np.zeros(0),
+        knot_offsets=offsets([len(k) for k in knots]),
+        degrees=np.array([c[2] for c in curves], dtype=np.int64),
+        forms=np.array([c[3] if len(c) > 3 else 1 for c in curves], dtype=np.int64),
+    )
+
+
+def unpack(packed, index):
+    '''Get cvs, knots, degree and form of one curve in a PackedCurves'''
+
+    cv_start, cv_end = packed.cv_offsets[index:index + 2]
+    knot_start, knot_end = packed.knot_offsets[index:index + 2]
+    return (
+        packed.cvs[cv_start:cv_end],
+        packed.knots[knot_start:knot_end],
+        int(packed.degrees[index]),
+        int(packed.forms[index]),
+    )
+
+
+def packed_domains(packed):
+    '''Get arrays of the min and max parameter of each packed curve'''
+
+    umin = packed.knots[packed.knot_offsets[:-1] + packed.degrees - 1]
+    umax = packed.knots[packed.knot_offsets[1:] - packed.degrees]
+    return umin, umax
+
+
+def evaluate_packed(packed, params, curve_ids, order=1):
+    '''Evaluate many curves at once
+
+    Parameters of all curves are located with a single binary search over
+    the knots of every curve. Curves are then evaluated together, one pass
+    per distinct degree.
+
+    :param packed: PackedCurves
+    :param params: parameters to evaluate
+    :param curve_ids: index of the curve each parameter belongs to
+    :param order: highest derivative to compute
+    :returns: list of order + 1 (len(params), 3) arrays, see evaluate
+    '''
+
+    params = np.asarray(params, dtype=np.float64)
+    curve_ids = np.asarray(curve_ids, dtype=np.int64)
+    num_curves = len(packed.degrees)
+
+    # Pad every curve's knots with its superfluous end knots
+    counts = np.diff(packed.knot_offsets) + 2
+    full_offsets = offsets(counts)
+    local = np.arange(full_offsets[-1]) - np.repeat(full_offsets[:-1], counts)
+    source = np.repeat(packed.knot_offsets[:-1], counts) + np.clip(
+        local - 1, 0, np.repeat(counts - 3, counts)
+    )
+    full = packed.knots[source]
+
+    # Offset every curve's knots so all of them sort in one array
+    lo = full[full_offsets[:-1]]
+    width = full[full_offsets[1:] - 1] - lo
+    scale = np.divide(0.5, width, out=np.zeros_like(width), where=width != 0)
+    owner = np.repeat(np.arange(num_curves), counts)
+    keys = owner + (full - lo[owner]) * scale[owner]
+    param_keys = curve_ids + (params - lo[curve_ids]) * scale[curve_ids]
+    spans = np.searchsorted(keys, param_keys, side='right') - 1
+
+    degrees = packed.degrees[curve_ids]
+    num_cvs = np.diff(packed.cv_offsets)[curve_ids]
+    spans = np.clip(
+        spans - full_offsets[curve_ids],
+        degrees,
+        num_cvs - 1
+    )
+
+    dim = packed.cvs.shape[1]
+    results = [np.empty((len(params), 3)) for _ in range(order + 1)]
+    for degree in np.unique(degrees):
+        mask = degrees == degree
+        ids = curve_ids[mask]
+        curve_spans = spans[mask]
+        cv_index = packed.cv_offsets[ids] + curve_spans - degree
+        local_cvs = packed.cvs[cv_index[:, None] + np.arange(degree + 1)]
+        ders = _evaluate_local(
+            local_cvs.reshape(-1, degree + 1, dim),
+            full,
+            int(degree),
+            full_offsets[ids] + curve_spans,
+            params[mask],
+            order,
+        )
+        for result, der in zip(results, ders):
+            result[mask] = der
+    return results
+
+
+class CurveTable(object):
+    '''Dense table of points and first derivatives along a curve.
+
+    Entries are placed on every knot and subdivisions of each knot span,
+    lookups use cubic hermite interpolation between entries. That reproduces
+    non-rational curves up to degree 3 exactly, higher degrees and rational
+    curves are approximated.
+
+    :param cvs: cvs of curve
+    :param knots: Maya knot array
+    :param degree: degree of curve
+    :param subdivisions: number of table entries per knot span
+    '''
+
+    def __init__(self, cvs, knots, degree, subdivisions=8):
+        params = span_params(knots, degree, subdivisions)
+        points, derivs = evaluate(cvs, knots, degree, params[:-1])
+        end_points, end_derivs = evaluate(
+            cvs, knots, degree, params[1:], side='left'
+        )
+        self.params = params
+        self.points = points
+        self.derivs = derivs
+        self.end_points = end_points
+        self.end_derivs = end_derivs
+
+    @property
+    def nbytes(self):
+        '''Memory used by the table'''
+
+        return sum(a.nbytes for a in (
+            self.params,
+            self.points,
+            self.derivs,
+            self.end_points,
+            self.end_derivs,
+        ))
+
+    def evaluate(self, params):
+        '''Look up points and first derivatives at many parameters
+
+        :param params: parameters to look up, clamped to the curve's domain
+        :returns: points, derivatives
+        '''
+
+        params = np.clip(params, self.params[0], self.params[-1])
+        index = np.searchsorted(self.params, params, side='right') - 1
+        index = np.clip(index, 0, len(self.params) - 2)
+        lo = self.params[index]
+        width = (self.params[index + 1] - lo)[:, None]
+        s = (params - lo)[:, None] / width
+        s2 = s * s
+        s3 = s2 * s
+
+        p0 = self.points[index]
+        m0 = self.derivs[index] * width
+        p1 = self.end_points[index]
+        m1 = self.end_derivs[index] * width
+
+        points = (
+            (2 * s3 - 3 * s2 + 1) * p0 +
+            (s3 - 2 * s2 + s) * m0 +
+            (3 * s2 - 2 * s3) * p1 +
+            (s3 - s2) * m1
+        )
+        derivs = (
+            (6 * s2 - 6 * s) * p0 +
+            (3 * s2 - 4 * s + 1) * m0 +
+            (6 * s - 6 * s2) * p1 +
+            (3 * s2 - 2 * s) * m1
+        ) / width
+        return points, derivs
+
+
+class TableCache(object):
+    '''Least recently used cache of CurveTables keyed by curve data.
+
+    :param max_bytes: memory cap, least recently used tables are dropped
+        when it's exceeded
+    :param subdivisions: number of table entries per knot span
+    :ivar hits: number of lookups answered by an existing table
+    :ivar misses: number of lookups that built a new table
+    '''
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, subdivisions=8):
+        self.max_bytes = max_bytes
+        self.subdivisions = subdivisions
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._tables = OrderedDict()
+
+    def __len__(self):
+        return len(self._tables)
+
+    @staticmethod
+    def key(cvs, knots, degree):
+        '''Hash a curve's cv and knot buffers'''
+
+        digest = hashlib.sha1(np.ascontiguousarray(cvs, np.float64).tobytes())
+        digest.update(np.ascontiguousarray(knots, np.float64).tobytes())
+        digest.update(str(degree).encode())
+        return digest.hexdigest()
+
+    def table(self, cvs, knots, degree):
+        '''Get the table of a curve, building it on a miss'''
+
+        key = self.key(cvs, knots, degree)
+        table = self._tables.pop(key, None)
+        if table is None:
+            self.misses += 1
+            table = CurveTable(cvs, knots, degree, self.subdivisions)
+            self.nbytes += table.nbytes
+        else:
+            self.hits += 1
+
+        self._tables[key] = table
+        self.trim()
+        return table
+
+    def trim(self):
+        '''Drop least recently used tables until under the memory cap'''
+
+        while self._tables and self.nbytes > self.max_bytes:
+            _, table = self._tables.popitem(last=False)
+            self.nbytes -= table.nbytes
+
+    def clear(self):
+        '''Drop all tables and reset the counters'''
+
+        self._tables.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
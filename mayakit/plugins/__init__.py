@@ -0,0 +1,88 @@
+'''
+mayakit.plugins
+===============
+Adds this folder to MAYA_PLUG_IN_PATH so its plugins load by name, and
+helpers to load them. Plugin modules are submodules of this package, like
+mayakit.plugins.burnin.
+'''
+
+import os
+from maya import cmds
+
+__all__ = [
+    'is_loaded',
+    'safe_load',
+    'safe_unload',
+    'safe_reload',
+    'load_all',
+    'unload_all',
+    'reload_all',
+]
+
+plugins_path = os.path.dirname(os.path.abspath(__file__))
+
+try:
+    plugin_path = os.environ['MAYA_PLUG_IN_PATH']
+    if plugins_path not in plugin_path.split(os.pathsep):
+        plugin_path = plugins_path + os.pathsep + plugin_path
+except KeyError:
+    plugin_path = plugins_path
+os.environ['MAYA_PLUG_IN_PATH'] = plugin_path
+
+py_files = [
+    f for f in os.listdir(plugins_path)
+    if f.endswith('.py') and not f.startswith('_')
+]
+names = [f.split('.')[0] for f in py_files]
+
+
+def is_loaded(plugin):
+    '''Is plugin loaded?'''
+
+    return cmds.pluginInfo(plugin, q=True, loaded=True)
+
+
+def safe_load(plugin):
+    '''Load plugin'''
+
+    if is_loaded(plugin):
+        return
+
+    cmds.loadPlugin(plugin)
+
+
+def safe_unload(plugin):
+    '''Unload plugin'''
+
+    if not is_loaded(plugin):
+        return
+
+    cmds.unloadPlugin(plugin, force=False)
+
+
+def safe_reload(plugin):
+    '''Reload plugin'''
+
+    safe_unload(plugin)
+    safe_load(plugin)
+
+
+def load_all():
+    '''Load all mayakit plugins'''
+
+    for name in names:
+        safe_load(name)
+
+
+def unload_all():
+    '''Unload all mayakit plugins'''
+
+    for name in names:
+        safe_unload(name)
+
+
+def reload_all():
+    '''Reload all mayakit plugins'''
+
+    for name in names:
+        safe_reload(name)
@@ -0,0 +1,299 @@
+import maya.api.OpenMaya as om
+import pymel.core as pmc
+import numpy as np
+import sys
+
+from mayakit import curveio, guides, knotvectors, nurbs, tubes
+
+
+def maya_useNewAPI():
+    pass
+
+
+class interpolateStrands(om.MPxNode):
+    '''Interpolate child strands from an array of guide curves.
+
+    Children are bound to their nearest guides with inverse distance
+    weights, comparing childRoot to restRoot, the roots of the guides in
+    their rest pose. Both are stored on the node, so children bind the same
+    way whatever frame the scene is opened on. The binding is kept on the
+    node and only recomputed after these inputs, neighbors or power are
+    dirtied. Every compute samples all guides and blends all children in
+    one pass using mayakit.guides.
+    outputPoints holds samples points per child in bulk and is much
+    cheaper to read than the outputCurve array plug.
+    '''
+
+    id_ = om.MTypeId(0x00124df6)
+
+    def __init__(self):
+        super(interpolateStrands, self).__init__()
+        self._binding = None
+
+    @classmethod
+    def creator(cls):
+        return cls()
+
+    @classmethod
+    def initialize(cls):
+
+        typ_attr = om.MFnTypedAttribute()
+        num_attr = om.MFnNumericAttribute()
+
+        cls.inputCurve = typ_attr.create('inputCurve', 'ic', om.MFnData.kNurbsCurve)
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        typ_attr.cached = False
+        typ_attr.array = True
+        cls.addAttribute(cls.inputCurve)
+
+        cls.restRoot = typ_attr.create(
+            'restRoot',
+            'rr',
+            om.MFnData.kPointArray,
+            om.MFnPointArrayData().create()
+        )
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        cls.addAttribute(cls.restRoot)
+
+        cls.childRoot = typ_attr.create(
+            'childRoot',
+            'cr',
+            om.MFnData.kPointArray,
+            om.MFnPointArrayData().create()
+        )
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        cls.addAttribute(cls.childRoot)
+
+        cls.outputCurve = typ_attr.create('outputCurve', 'oc', om.MFnData.kNurbsCurve)
+        typ_attr.storable = False
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = False
+        typ_attr.cached = False
+        typ_attr.array = True
+        typ_attr.usesArrayDataBuilder = True
+        cls.addAttribute(cls.outputCurve)
+
+        cls.outputPoints = typ_attr.create(
+            'outputPoints',
+            'op',
+            om.MFnData.kPointArray,
+            om.MFnPointArrayData().create()
+        )
+        typ_attr.storable = False
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = False
+        cls.addAttribute(cls.outputPoints)
+
+        cls.neighbors = num_attr.create('neighbors', 'nb', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(1)
+        num_attr.default = 4
+        cls.addAttribute(cls.neighbors)
+
+        cls.power = num_attr.create('power', 'pw', om.MFnNumericData.kDouble)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(0)
+        num_attr.default = 2
+        cls.addAttribute(cls.power)
+
+        cls.samples = num_attr.create('samples', 'smp', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(2)
+        num_attr.default = 16
+        cls.addAttribute(cls.samples)
+
+        cls.degree = num_attr.create('degree', 'dg', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(1)
+        num_attr.setMax(7)
+        num_attr.default = 3
+        cls.addAttribute(cls.degree)
+
+        inputs = (
+            cls.inputCurve,
+            cls.restRoot,
+            cls.childRoot,
+            cls.neighbors,
+            cls.power,
+            cls.samples,
+            cls.degree,
+        )
+        for input_attr in inputs:
+            cls.attributeAffects(input_attr, cls.outputCurve)
+            cls.attributeAffects(input_attr, cls.outputPoints)
+
+    def setDependentsDirty(self, plug, affected):
+        '''Drop the binding when one of the inputs it was built from is
+        dirtied, it is rebuilt by the next compute
+        '''
+
+        if plug.attribute() in self.bind_inputs():
+            self._binding = None
+
+    @classmethod
+    def bind_inputs(cls):
+        return (cls.restRoot, cls.childRoot, cls.neighbors, cls.power)
+
+    def get_binding(self, data):
+        '''Get the binding of children to guides, only rebinding after
+        one of the bind inputs was dirtied
+        '''
+
+        if self._binding is None:
+            rest_roots = _points(data.inputValue(self.restRoot).data())
+            child_roots = _points(data.inputValue(self.childRoot).data())
+            neighbors = data.inputValue(self.neighbors).asInt()
+            power = data.inputValue(self.power).asDouble()
+            binding = None
+            if len(rest_roots):
+                binding = guides.bind(rest_roots, child_roots, neighbors, power)
+            self._binding = binding, len(rest_roots)
+        return self._binding
+
+    def compute(self, plug, data):
+
+        if plug.isElement:
+            plug = plug.array()
+
+        if plug == self.outputCurve or plug == self.outputPoints:
+
+            # Pull every guide once
+            in_curves_handle = data.inputArrayValue(self.inputCurve)
+            in_curve_fns = []
+            for i in range(len(in_curves_handle)):
+                in_curves_handle.jumpToPhysicalElement(i)
+                in_curve = in_curves_handle.inputValue().asNurbsCurveTransformed()
+                in_curve_fns.append(om.MFnNurbsCurve(in_curve))
+
+            binding, num_rest = self.get_binding(data)
+            samples = data.inputValue(self.samples).asInt()
+            if binding is not None and num_rest == len(in_curve_fns):
+                # Blend all children at once
+                guide_points = tubes.sample_curves(
+                    curveio.read_curves(in_curve_fns),
+                    samples
+                )[0]
+                children = guides.interpolate(binding, guide_points)
+            else:
+                if in_curve_fns:
+                    om.MGlobal.displayWarning(
+                        '{} has {} rest roots for {} guides, rebind it with '
+                        'mayakit.strands.bind_children'.format(
+                            self.name(), num_rest, len(in_curve_fns)
+                        )
+                    )
+                children = np.zeros((0, samples, 3))
+
+            # Write both outputs from the one blend
+            this = self.thisMObject()
+            if plug == self.outputPoints or om.MPlug(this, self.outputPoints).isConnected:
+                out_points_handle = data.outputValue(self.outputPoints)
+                out_points_handle.setMObject(om.MFnPointArrayData().create(
+                    om.MPointArray(children.reshape(-1, 3).tolist())
+                ))
+                out_points_handle.setClean()
+                data.setClean(self.outputPoints)
+
+            if plug == self.outputCurve or om.MPlug(this, self.outputCurve).numConnectedElements():
+                packed = guides.pack_children(children, data.inputValue(self.degree).asInt())
+                out_curves_handle = data.outputArrayValue(self.outputCurve)
+                out_curves_builder = om.MArrayDataBuilder(data, self.outputCurve, len(children))
+                if len(children):
+                    # Every child shares the same uniform knots
+                    out_knots = knotvectors.uniform(
+                        samples,
+                        int(packed.degrees[0]),
+                        array_typ=om.MDoubleArray
+                    )
+                for i in range(len(children)):
+                    cvs, _, degree, form = nurbs.unpack(packed, i)
+                    out_curve_data = om.MFnNurbsCurveData().create()
+                    out_curve_fn = om.MFnNurbsCurve()
+                    out_curve_fn.create(
+                        om.MPointArray(cvs.tolist()),
+                        out_knots,
+                        degree,
+                        form,
+                        False,
+                        True,
+                        out_curve_data
+                    )
+                    out_curve_handle = out_curves_builder.addElement(i)
+                    out_curve_handle.setMObject(out_curve_data)
+
+                out_curves_handle.set(out_curves_builder)
+                out_curves_handle.setAllClean()
+                data.setClean(self.outputCurve)
+
+
+def _points(point_array_data):
+    '''Convert point array data to an (n, 3) array'''
+
+    points = om.MFnPointArrayData(point_array_data).array()
+    return np.array(points, dtype=np.float64).reshape(-1, 4)[:, :3]
+
+
+def initializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.registerNode(
+            interpolateStrands.__name__,
+            interpolateStrands.id_,
+            interpolateStrands.creator,
+            interpolateStrands.initialize
+        )
+    except:
+        sys.stderr.write("Failed to register node\n")
+        raise
+
+
+def uninitializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.deregisterNode(interpolateStrands.id_)
+    except:
+        sys.stderr.write("Failed to deregister node\n")
+        raise
+
+
+class AEinterpolateStrandsTemplate(pmc.ui.AETemplate):
+    _nodeType = 'interpolateStrands'
+
+    def __init__(self, node_name):
+        self.beginScrollLayout()
+
+        self.beginLayout('Interpolate Strands', collapse=False)
+        self.addControl('neighbors')
+        self.addControl('power')
+        self.addControl('samples')
+        self.addControl('degree')
+        self.endLayout()
+
+        self.addExtraControls()
+
+        self.endScrollLayout()
@@ -0,0 +1,63 @@
+import maya.api.OpenMaya as om
+import sys
+
+from mayakit import modifiers
+
+
+def maya_useNewAPI():
+    pass
+
+
+class mayakitModifier(om.MPxCommand):
+    '''Apply the pending modifier of mayakit.modifiers.run as one undoable
+    step. Not meant to be called directly.
+    '''
+
+    def __init__(self):
+        super(mayakitModifier, self).__init__()
+        self.modifier = None
+
+    @classmethod
+    def creator(cls):
+        return cls()
+
+    def doIt(self, args):
+        entry = modifiers.pop()
+        fn, self.modifier, _ = entry
+        try:
+            entry[2] = fn(self.modifier)
+        except:
+            self.modifier.undoIt()
+            raise
+
+    def redoIt(self):
+        self.modifier.doIt()
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+    def isUndoable(self):
+        return True
+
+
+def initializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.registerCommand(
+            mayakitModifier.__name__,
+            mayakitModifier.creator
+        )
+    except:
+        sys.stderr.write("Failed to register command\n")
+        raise
+
+
+def uninitializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.deregisterCommand(mayakitModifier.__name__)
+    except:
+        sys.stderr.write("Failed to deregister command\n")
+        raise
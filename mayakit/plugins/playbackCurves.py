@@ -0,0 +1,173 @@
+import maya.api.OpenMaya as om
+import pymel.core as pmc
+import os
+import sys
+
+from mayakit import framecache
+
+
+def maya_useNewAPI():
+    pass
+
+
+class playbackCurves(om.MPxNode):
+    '''Play back curves baked with mayakit.framecache.
+
+    Each compute reads only the frame at time from the memory mapped cache,
+    so scrubbing in any direction costs the same and memory does not grow
+    with the length of the cache. Frames between cached frames hold the
+    previous cached frame. Curves are output in the order they were baked,
+    the cache is reopened when cachePath changes or the cache is rewritten.
+    '''
+
+    id_ = om.MTypeId(0x00124df7)
+
+    def __init__(self):
+        super(playbackCurves, self).__init__()
+        self._cache = None
+        self._cache_key = None
+        self._knots = []
+
+    @classmethod
+    def creator(cls):
+        return cls()
+
+    @classmethod
+    def initialize(cls):
+
+        typ_attr = om.MFnTypedAttribute()
+        unit_attr = om.MFnUnitAttribute()
+
+        cls.cachePath = typ_attr.create(
+            'cachePath',
+            'cp',
+            om.MFnData.kString,
+            om.MFnStringData().create()
+        )
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        typ_attr.usedAsFilename = True
+        cls.addAttribute(cls.cachePath)
+
+        cls.time = unit_attr.create('time', 't', om.MFnUnitAttribute.kTime)
+        unit_attr.storable = True
+        unit_attr.keyable = True
+        unit_attr.readable = True
+        unit_attr.writable = True
+        cls.addAttribute(cls.time)
+
+        cls.outputCurve = typ_attr.create('outputCurve', 'oc', om.MFnData.kNurbsCurve)
+        typ_attr.storable = False
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = False
+        typ_attr.cached = False
+        typ_attr.array = True
+        typ_attr.usesArrayDataBuilder = True
+        cls.addAttribute(cls.outputCurve)
+
+        for input_attr in (cls.cachePath, cls.time):
+            cls.attributeAffects(input_attr, cls.outputCurve)
+
+    def get_cache(self, path):
+        '''Get the open cache at path, reopening it if it was rewritten'''
+
+        try:
+            key = (path, os.stat(os.path.join(path, framecache.HEADER)).st_mtime)
+        except OSError:
+            self._cache = self._cache_key = None
+            return None
+
+        if key != self._cache_key:
+            self._cache = framecache.FrameCache(path)
+            self._cache_key = key
+            topology = self._cache.topology
+            self._knots = [
+                om.MDoubleArray(topology.knots[start:end].tolist())
+                for start, end in zip(topology.knot_offsets[:-1], topology.knot_offsets[1:])
+            ]
+        return self._cache
+
+    def compute(self, plug, data):
+
+        if plug.isElement:
+            plug = plug.array()
+
+        if plug == self.outputCurve:
+
+            path = data.inputValue(self.cachePath).asString()
+            frame = data.inputValue(self.time).asTime().asUnits(om.MTime.uiUnit())
+            cache = self.get_cache(path) if path else None
+
+            out_curves_handle = data.outputArrayValue(self.outputCurve)
+            if cache is None or not len(cache):
+                out_curves_handle.setAllClean()
+                data.setClean(plug)
+                return
+
+            # A view of one frame, nothing else is read from disk
+            cvs = cache.cvs(frame)
+            topology = cache.topology
+            out_curves_builder = om.MArrayDataBuilder(data, self.outputCurve, len(topology))
+            for i in range(len(topology)):
+                start, end = topology.cv_offsets[i:i + 2]
+                out_curve_data = om.MFnNurbsCurveData().create()
+                out_curve_fn = om.MFnNurbsCurve()
+                out_curve_fn.create(
+                    om.MPointArray(cvs[start:end].tolist()),
+                    self._knots[i],
+                    int(topology.degrees[i]),
+                    int(topology.forms[i]),
+                    False,
+                    True,
+                    out_curve_data
+                )
+                out_curve_handle = out_curves_builder.addElement(i)
+                out_curve_handle.setMObject(out_curve_data)
+
+            out_curves_handle.set(out_curves_builder)
+            out_curves_handle.setAllClean()
+            data.setClean(plug)
+
+
+def initializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.registerNode(
+            playbackCurves.__name__,
+            playbackCurves.id_,
+            playbackCurves.creator,
+            playbackCurves.initialize
+        )
+    except:
+        sys.stderr.write("Failed to register node\n")
+        raise
+
+
+def uninitializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.deregisterNode(playbackCurves.id_)
+    except:
+        sys.stderr.write("Failed to deregister node\n")
+        raise
+
+
+class AEplaybackCurvesTemplate(pmc.ui.AETemplate):
+    _nodeType = 'playbackCurves'
+
+    def __init__(self, node_name):
+        self.beginScrollLayout()
+
+        self.beginLayout('Playback Curves', collapse=False)
+        self.addControl('cachePath')
+        self.addControl('time')
+        self.endLayout()
+
+        self.addExtraControls()
+
+        self.endScrollLayout()
@@ -4,29 +4,23 @@ import sys
 
 import maya.api.OpenMaya as om
 import pymel.core as pmc
+import numpy as np
+
+from mayakit import nurbs, frames, sampling
 
 
 def maya_useNewAPI():
     pass
 
 
-def linspace(tmin, tmax, n):
-    '''Clone of numpy.linspace'''
-
-    output = []
-    spread = tmax - tmin
-    step = spread / (n - 1.0)
-    for i in range(n):
-        output.append(tmin + step * i)
-    return output
-
-
 class pointsOnCurve(om.MPxNode):
 
     id_ = om.MTypeId(0x00124dfb)
 
     def __init__(self):
         super(pointsOnCurve, self).__init__()
+        self._cache = nurbs.TableCache()
+        self._length_table = None
 
     @classmethod
     def creator(cls):
@@ -38,6 +32,8 @@ class pointsOnCurve(om.MPxNode):
         typ_attr = om.MFnTypedAttribute()
         num_attr = om.MFnNumericAttribute()
         mat_attr = om.MFnMatrixAttribute()
+        enum_attr = om.MFnEnumAttribute()
+        unit_attr = om.MFnUnitAttribute()
 
         cls.incurve = typ_attr.create('inCurve', 'ic', om.MFnData.kNurbsCurve)
         typ_attr.storable = True
@@ -79,7 +75,7 @@ class pointsOnCurve(om.MPxNode):
         typ_attr.cached = False
         cls.addAttribute(cls.outbitangent)
 
-        cls.outmatrx = mat_attr.create('outMatrix', 'om', om.MFnMatrixAttribute.kDouble)
+        cls.outmatrix = mat_attr.create('outMatrix', 'om', om.MFnMatrixAttribute.kDouble)
         mat_attr.storable = True
         mat_attr.keyable = False
         mat_attr.readable = True
@@ -89,6 +85,14 @@ class pointsOnCurve(om.MPxNode):
         mat_attr.usesArrayDataBuilder = True
         cls.addAttribute(cls.outmatrix)
 
+        cls.outmatrixarray = typ_attr.create('outMatrixArray', 'oma', om.MFnData.kMatrixArray)
+        typ_attr.storable = False
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = False
+        typ_attr.cached = False
+        cls.addAttribute(cls.outmatrixarray)
+
         cls.numpoints = num_attr.create('numPoints', 'np', om.MFnNumericData.kInt)
         num_attr.storable = True
         num_attr.keyable = True
@@ -98,6 +102,30 @@ class pointsOnCurve(om.MPxNode):
         num_attr.default = 20
         cls.addAttribute(cls.numpoints)
 
+        cls.spacing = unit_attr.create('spacing', 'sp', om.MFnUnitAttribute.kDistance)
+        unit_attr.storable = True
+        unit_attr.keyable = True
+        unit_attr.readable = True
+        unit_attr.writable = True
+        unit_attr.setMin(om.MDistance(0))
+        cls.addAttribute(cls.spacing)
+
+        cls.maxpoints = num_attr.create('maxPoints', 'mxp', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(1)
+        num_attr.default = 1000
+        cls.addAttribute(cls.maxpoints)
+
+        cls.outnumpoints = num_attr.create('outNumPoints', 'onp', om.MFnNumericData.kInt)
+        num_attr.storable = False
+        num_attr.keyable = False
+        num_attr.readable = True
+        num_attr.writable = False
+        cls.addAttribute(cls.outnumpoints)
+
         cls.tmin = num_attr.create('tMinimum', 'tmin', om.MFnNumericData.kDouble)
         num_attr.storable = True
         num_attr.keyable = True
@@ -133,99 +161,226 @@ class pointsOnCurve(om.MPxNode):
         num_attr.default = 1
         cls.addAttribute(cls.loop)
 
-        cls.attributeAffects(cls.incurve, cls.outmatrix)
-        cls.attributeAffects(cls.numpoints, cls.outmatrix)
-        cls.attributeAffects(cls.tmin, cls.outmatrix)
-        cls.attributeAffects(cls.tmax, cls.outmatrix)
-        cls.attributeAffects(cls.ushift, cls.outmatrix)
-        cls.attributeAffects(cls.loop, cls.outmatrix)
+        cls.framemode = enum_attr.create('frameMode', 'fm')
+        enum_attr.storable = True
+        enum_attr.keyable = True
+        enum_attr.readable = True
+        enum_attr.writable = True
+        enum_attr.addField('projected', 0)
+        enum_attr.addField('rotationMinimizing', 1)
+        cls.addAttribute(cls.framemode)
+
+        cls.upvector = num_attr.create('upVector', 'up', om.MFnNumericData.k3Double)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.default = (0.0, 1.0, 0.0)
+        cls.addAttribute(cls.upvector)
+
+        cls.roll = unit_attr.create('roll', 'rl', om.MFnUnitAttribute.kAngle)
+        unit_attr.storable = True
+        unit_attr.keyable = True
+        unit_attr.readable = True
+        unit_attr.writable = True
+        cls.addAttribute(cls.roll)
+
+        cls.twist = unit_attr.create('twist', 'tw', om.MFnUnitAttribute.kAngle)
+        unit_attr.storable = True
+        unit_attr.keyable = True
+        unit_attr.readable = True
+        unit_attr.writable = True
+        cls.addAttribute(cls.twist)
+
+        cls.cachelimit = num_attr.create('cacheLimit', 'cl', om.MFnNumericData.kDouble)
+        num_attr.storable = True
+        num_attr.keyable = False
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(0)
+        num_attr.default = 64
+        cls.addAttribute(cls.cachelimit)
+
+        cls.cachehits = num_attr.create('cacheHits', 'chi', om.MFnNumericData.kInt)
+        num_attr.storable = False
+        num_attr.keyable = False
+        num_attr.readable = True
+        num_attr.writable = False
+        cls.addAttribute(cls.cachehits)
+
+        cls.cachemisses = num_attr.create('cacheMisses', 'cmi', om.MFnNumericData.kInt)
+        num_attr.storable = False
+        num_attr.keyable = False
+        num_attr.readable = True
+        num_attr.writable = False
+        cls.addAttribute(cls.cachemisses)
+
+        inputs = (
+            cls.incurve,
+            cls.numpoints,
+            cls.spacing,
+            cls.maxpoints,
+            cls.tmin,
+            cls.tmax,
+            cls.ushift,
+            cls.loop,
+            cls.framemode,
+            cls.upvector,
+            cls.roll,
+            cls.twist,
+        )
+        for input_attr in inputs:
+            for output_attr in cls.outputs():
+                cls.attributeAffects(input_attr, output_attr)
+        cls.attributeAffects(cls.cachelimit, cls.cachehits)
+        cls.attributeAffects(cls.cachelimit, cls.cachemisses)
+
+    @classmethod
+    def outputs(cls):
+        return (
+            cls.outmatrix,
+            cls.outmatrixarray,
+            cls.outposition,
+            cls.outnormal,
+            cls.outtangent,
+            cls.outbitangent,
+            cls.outnumpoints,
+            cls.cachehits,
+            cls.cachemisses,
+        )
 
     def compute(self, plug, data):
 
-        this = self.thisMObject()
+        if plug.isElement:
+            plug = plug.array()
 
-        if plug == self.outmatrix:
+        if plug.attribute() in self.outputs():
 
             curve_handle = data.inputValue(self.incurve)
             curve = curve_handle.asNurbsCurveTransformed()
             curve_fn = om.MFnNurbsCurve(curve)
-            curve_spans = curve_fn.numSpans
+            cvs, knots, degree = nurbs.from_curve_fn(curve_fn)
+            umin, umax = nurbs.domain(knots, degree)
 
             tmin = data.inputValue(self.tmin).asDouble()
             tmax = data.inputValue(self.tmax).asDouble()
             ushift = data.inputValue(self.ushift).asDouble()
-            loop = data.inputValue(self.loop).asDouble()
-
-            # Get parameters to sample along incurve
-            numpoints = data.inputValue(self.numpoints).asInt()
-            params = linspace(
-                tmin * curve_spans,
-                tmax * curve_spans,
-                numpoints
-            )
 
-            # Create output arrays
-            positions = om.MPointArray()
-            tangents = om.MVectorArray()
-            bitangents = om.MVectorArray()
-            normals = om.MVectorArray()
-            matrices = om.MMatrixArray()
-            N = om.MVector(0, 1, 0)
-            for param in params:
-                param = (param + ushift) % curve_spans
-                P = curve_fn.getPointAtParam(param, om.MSpace.kObject)
-                T = curve_fn.tangent(param, om.MSpace.kObject).normal()
-
-                # N = curve_fn.normal(param, om.MSpace.kObject)
-                # P, T, N = curve_fn.getDerivativesAtParam(param, om.MSpace.kObject, True)
-                B = (T ^ N).normal()
-                N = (B ^ T).normal()
-                M = om.MMatrix([
-                    T.x, T.y, T.z, 0,
-                    B.x, B.y, B.z, 0,
-                    N.x, N.y, N.z, 0,
-                    P.x, P.y, P.z, 1
-                ])
-                positions.append(P)
-                normals.append(N)
-                tangents.append(T)
-                bitangents.append(B)
-                matrices.append(M)
-
-            # Set output attributes
-            outmatrix_handle = data.outputArrayValue(self.outmatrix)
-            outmatrix_builder = om.MArrayDataBuilder(data, self.outmatrix, numpoints)
-
-            outmatrix_builder.growArray(len(matrices))
-            for i, m in enumerate(matrices):
-                mhandle = outmatrix_builder.addElement(i)
-                mhandle.setMMatrix(m)
-
-            outmatrix_handle.set(outmatrix_builder)
-            outmatrix_handle.setAllClean()
-
-            # # Setting typed attributes is much nicer...
-            # outposition_handle = data.outputValue(self.outposition)
-            # outposition_data = om.MFnPointArrayData(outposition_handle.data())
-            # outposition_data.set(positions)
-
-            # outnormal_handle = data.outputValue(self.outnormal)
-            # outnormal_data = om.MFnVectorArrayData(outnormal_handle.data())
-            # outnormal_data.set(normals)
-
-            # outtangent_handle = data.outputValue(self.outtangent)
-            # outtangent_data = om.MFnVectorArrayData(outtangent_handle.data())
-            # outtangent_data.set(tangents)
-
-            # outbitangent_handle = data.outputValue(self.outbitangent)
-            # outbitangent_data = om.MFnVectorArrayData(outbitangent_handle.data())
-            # outbitangent_data.set(bitangents)
-
-            data.setClean(self.outmatrix)
-            data.setClean(self.outposition)
-            data.setClean(self.outnormal)
-            data.setClean(self.outtangent)
-            data.setClean(self.outbitangent)
+            # Get parameters to sample along incurve, either a fixed number
+            # of samples or one sample every spacing units of arc length
+            spacing = data.inputValue(self.spacing).asDistance().asUnits(
+                om.MDistance.internalUnit()
+            )
+            if spacing > 0:
+                table = self._length_table
+                if table is None or not table.matches(cvs, knots, degree):
+                    self._length_table = sampling.ArcLengthTable(
+                        cvs,
+                        knots,
+                        degree
+                    )
+                params = self._length_table.spaced_params(
+                    spacing,
+                    tmin,
+                    tmax,
+                    data.inputValue(self.maxpoints).asInt()
+                )
+            else:
+                numpoints = data.inputValue(self.numpoints).asInt()
+                params = umin + (umax - umin) * np.linspace(tmin, tmax, numpoints)
+            params = sampling.shift_params(params, umin, umax, ushift)
+            numpoints = len(params)
+            set_counter(data, self.outnumpoints, numpoints)
+
+            # Sample the cached table of incurve, only rebuilt when the
+            # curve's cvs or knots change
+            cache = self._cache
+            cache.max_bytes = data.inputValue(self.cachelimit).asDouble() * 1024 ** 2
+            table = cache.table(cvs, knots, degree)
+            points, derivs = table.evaluate(params)
+            tangents = nurbs.normalize(derivs)
+            set_counter(data, self.cachehits, cache.hits)
+            set_counter(data, self.cachemisses, cache.misses)
+
+            # Compute frames for all samples at once
+            frame_mode = data.inputValue(self.framemode).asInt()
+            up = data.inputValue(self.upvector).asDouble3()
+            if frame_mode == 1:
+                bitangents, normals = frames.rotation_minimizing_frames(
+                    points,
+                    tangents,
+                    up
+                )
+            else:
+                bitangents, normals = frames.projected_frames(tangents, up)
+
+            roll = data.inputValue(self.roll).asAngle().asRadians()
+            twist = data.inputValue(self.twist).asAngle().asRadians()
+            if roll or twist:
+                angles = frames.ramp(numpoints, roll, twist)
+                normals = frames.twist_normals(tangents, normals, angles)
+                bitangents, normals = frames.orthonormalize(tangents, normals)
+
+            matrices = frames.to_matrices(points, tangents, bitangents, normals)
+            matrices = om.MMatrixArray(matrices.reshape(-1, 16).tolist())
+
+            # Set typed attributes in bulk
+            set_data(data, self.outmatrixarray, om.MFnMatrixArrayData, matrices)
+            set_data(data, self.outposition, om.MFnPointArrayData, om.MPointArray(points.tolist()))
+            set_data(data, self.outnormal, om.MFnVectorArrayData, om.MVectorArray(normals.tolist()))
+            set_data(data, self.outtangent, om.MFnVectorArrayData, om.MVectorArray(tangents.tolist()))
+            set_data(data, self.outbitangent, om.MFnVectorArrayData, om.MVectorArray(bitangents.tolist()))
+
+            # Building the outMatrix array plug element by element is slow,
+            # only do it when it's actually requested. The array is only
+            # rebuilt when the number of points changes.
+            if plug == self.outmatrix:
+                outmatrix_handle = data.outputArrayValue(self.outmatrix)
+                if not has_elements(outmatrix_handle, numpoints):
+                    outmatrix_builder = om.MArrayDataBuilder(data, self.outmatrix, numpoints)
+                    for i in range(numpoints):
+                        outmatrix_builder.addElement(i)
+                    outmatrix_handle.set(outmatrix_builder)
+
+                for i, m in enumerate(matrices):
+                    outmatrix_handle.jumpToPhysicalElement(i)
+                    outmatrix_handle.outputValue().setMMatrix(m)
+
+                outmatrix_handle.setAllClean()
+                data.setClean(self.outmatrix)
+
+
+def has_elements(array_handle, count):
+    '''Does an array handle hold exactly the elements 0 to count - 1'''
+
+    if len(array_handle) != count:
+        return False
+    if count:
+        array_handle.jumpToPhysicalElement(count - 1)
+        return array_handle.elementLogicalIndex() == count - 1
+    return True
+
+
+def set_counter(data, attr, value):
+    '''Set the output value of a read only int attribute'''
+
+    handle = data.outputValue(attr)
+    handle.setInt(value)
+    data.setClean(attr)
+
+
+def set_data(data, attr, data_fn_typ, value):
+    '''Set a typed attribute's output value to a new data object
+
+    :param data: MDataBlock
+    :param attr: typed attribute MObject
+    :param data_fn_typ: function set type used to create the data object
+    :param value: value to create the data object with
+    '''
+
+    handle = data.outputValue(attr)
+    handle.setMObject(data_fn_typ().create(value))
+    data.setClean(attr)
 
 
 def initializePlugin(obj):
@@ -268,10 +423,23 @@ class AEpointsOnCurveTemplate(pmc.ui.AETemplate):
             'inCurve'
         )
         self.addControl('numPoints')
+        self.addControl('spacing')
+        self.addControl('maxPoints')
+        self.addControl('outNumPoints')
         self.addControl('tMinimum')
         self.addControl('tMaximum')
         self.addControl('uShift')
         self.addControl('loop')
+        self.addControl('frameMode')
+        self.addControl('upVector')
+        self.addControl('roll')
+        self.addControl('twist')
+        self.endLayout()
+
+        self.beginLayout('Cache', collapse=True)
+        self.addControl('cacheLimit')
+        self.addControl('cacheHits')
+        self.addControl('cacheMisses')
         self.endLayout()
 
         self.addExtraControls()
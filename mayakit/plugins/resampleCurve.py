@@ -1,44 +1,21 @@
 import maya.api.OpenMaya as om
 import pymel.core as pmc
 import sys
-from functools import partial
+
+from mayakit import nurbs, sampling
 
 
 def maya_useNewAPI():
     pass
 
 
-def linspace(tmin, tmax, n):
-    '''Clone of numpy.linspace'''
-
-    output = []
-    spread = tmax - tmin
-    step = spread / (n - 1)
-    for i in range(n):
-        output.append(tmin + step * i)
-    return output
-
-
-def compute_knots(num_points, degree, array_typ=om.MDoubleArray):
-    '''Compute knots for the given number of points '''
-
-    num_knots = num_points + degree - 1
-    knots = array_typ()
-    for i in range(degree):
-        knots.append(0)
-    for i in range(num_knots - degree * 2):
-        knots.append(i + 1)
-    for j in range(degree):
-        knots.append(i + 2)  # exploit leaked reference
-    return knots
-
-
 class resampleCurve(om.MPxNode):
 
     id_ = om.MTypeId(0x00124dff)
 
     def __init__(self):
         super(resampleCurve, self).__init__()
+        self._length_table = None
 
     @classmethod
     def creator(cls):
@@ -105,39 +82,134 @@ class resampleCurve(om.MPxNode):
         enum_attr.addField('linear', 1)
         cls.addAttribute(cls.degree)
 
-        cls.attributeAffects(cls.inputCurve, cls.outputCurve)
-        cls.attributeAffects(cls.numPoints, cls.outputCurve)
-        cls.attributeAffects(cls.degree, cls.outputCurve)
-        cls.attributeAffects(cls.tmin, cls.outputCurve)
-        cls.attributeAffects(cls.tmax, cls.outputCurve)
+        cls.spacing = enum_attr.create('spacing', 'sp')
+        enum_attr.storable = True
+        enum_attr.keyable = True
+        enum_attr.readable = True
+        enum_attr.writable = True
+        enum_attr.addField('parameter', 0)
+        enum_attr.addField('arcLength', 1)
+        enum_attr.addField('adaptive', 2)
+        cls.addAttribute(cls.spacing)
+
+        cls.tolerance = num_attr.create('tolerance', 'tol', om.MFnNumericData.kDouble)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(0)
+        num_attr.default = 0.01
+        cls.addAttribute(cls.tolerance)
+
+        cls.minPoints = num_attr.create('minPoints', 'mnp', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(2)
+        num_attr.default = 2
+        cls.addAttribute(cls.minPoints)
+
+        cls.maxPoints = num_attr.create('maxPoints', 'mxp', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(2)
+        num_attr.default = 1000
+        cls.addAttribute(cls.maxPoints)
+
+        cls.outNumPoints = num_attr.create('outNumPoints', 'onp', om.MFnNumericData.kInt)
+        num_attr.storable = False
+        num_attr.keyable = False
+        num_attr.readable = True
+        num_attr.writable = False
+        cls.addAttribute(cls.outNumPoints)
+
+        inputs = (
+            cls.inputCurve,
+            cls.numPoints,
+            cls.degree,
+            cls.tmin,
+            cls.tmax,
+            cls.spacing,
+            cls.tolerance,
+            cls.minPoints,
+            cls.maxPoints,
+        )
+        for input_attr in inputs:
+            cls.attributeAffects(input_attr, cls.outputCurve)
+            cls.attributeAffects(input_attr, cls.outNumPoints)
 
     def compute(self, plug, data):
 
-        if plug == self.outputCurve:
+        if plug == self.outputCurve or plug == self.outNumPoints:
 
             in_curve_handle = data.inputValue(self.inputCurve)
             in_curve = in_curve_handle.asNurbsCurveTransformed()
             in_curve_fn = om.MFnNurbsCurve(in_curve)
-            in_spans = in_curve_fn.numSpans
-            in_degree = in_curve_fn.degree
+            in_cvs, in_knots, in_degree = nurbs.from_curve_fn(in_curve_fn)
             in_form = in_curve_fn.form
 
             tmin = data.inputValue(self.tmin).asDouble()
             tmax = data.inputValue(self.tmax).asDouble()
             out_degree = (in_degree, 1)[data.inputValue(self.degree).asInt()]
 
+            # Closed curves resampled along their whole length become
+            # periodic, the seam is not sampled twice
+            closed = bool(sampling.closes(in_form, tmin, tmax))
+
             # Compute output data
             out_num_points = data.inputValue(self.numPoints).asInt()
-            out_spans = out_num_points - 1
-            out_knots = compute_knots(out_num_points, out_degree)
 
-            params = linspace(tmin * in_spans, tmax * in_spans, out_num_points)
-            if tmax > 0.9999:
-                params[-1] = in_spans
-
-            out_points = om.MPointArray()
-            for t in params:
-                out_points.append(in_curve_fn.getPointAtParam(t))
+            spacing = data.inputValue(self.spacing).asInt()
+            if spacing == 1:
+                table = self._length_table
+                if table is None or not table.matches(in_cvs, in_knots, in_degree):
+                    self._length_table = sampling.ArcLengthTable(
+                        in_cvs,
+                        in_knots,
+                        in_degree
+                    )
+                params = self._length_table.uniform_params(
+                    out_num_points,
+                    tmin,
+                    tmax,
+                    endpoint=not closed
+                )
+            elif spacing == 2:
+                min_points = data.inputValue(self.minPoints).asInt()
+                params = sampling.adaptive_params(
+                    in_cvs,
+                    in_knots,
+                    in_degree,
+                    data.inputValue(self.tolerance).asDouble(),
+                    tmin,
+                    tmax,
+                    max(min_points, out_degree + 1) + closed,
+                    data.inputValue(self.maxPoints).asInt() + closed
+                )
+                if closed:
+                    params = params[:-1]
+            else:
+                params = sampling.domain_params(
+                    in_knots,
+                    in_degree,
+                    out_num_points,
+                    tmin,
+                    tmax,
+                    endpoint=not closed
+                )
+
+            points = nurbs.points_at(in_cvs, in_knots, in_degree, params)
+            out_num_points = len(points)
+            cvs, out_knots, out_degree, out_form = sampling.resampled_curve(
+                points,
+                out_degree,
+                closed,
+                om.MDoubleArray
+            )
+            out_points = om.MPointArray(cvs.tolist())
 
             # Create output curve
             out_curve_data = om.MFnNurbsCurveData().create()
@@ -146,7 +218,7 @@ class resampleCurve(om.MPxNode):
                 out_points,
                 out_knots,
                 out_degree,
-                om.MFnNurbsCurve.kOpen,
+                out_form,
                 False,
                 True,
                 out_curve_data
@@ -155,7 +227,11 @@ class resampleCurve(om.MPxNode):
             # set output curve handles mobject
             out_curve_handle = data.outputValue(self.outputCurve)
             out_curve_handle.setMObject(out_curve_data)
-            data.setClean(plug)
+            data.setClean(self.outputCurve)
+
+            out_num_points_handle = data.outputValue(self.outNumPoints)
+            out_num_points_handle.setInt(out_num_points)
+            data.setClean(self.outNumPoints)
 
 
 def initializePlugin(obj):
@@ -204,10 +280,18 @@ class AEresampleCurveTemplate(pmc.ui.AETemplate):
         )
         self.addControl('numPoints')
         self.addControl('degree')
+        self.addControl('spacing')
         self.addControl('tMinimum')
         self.addControl('tMaximum')
         self.endLayout()
 
+        self.beginLayout('Adaptive Spacing', collapse=True)
+        self.addControl('tolerance')
+        self.addControl('minPoints')
+        self.addControl('maxPoints')
+        self.addControl('outNumPoints')
+        self.endLayout()
+
         self.addExtraControls()
 
         self.endScrollLayout()
@@ -0,0 +1,190 @@
+import maya.api.OpenMaya as om
+import pymel.core as pmc
+import sys
+
+from mayakit import curveio, knotvectors, nurbs, sampling
+
+
+def maya_useNewAPI():
+    pass
+
+
+class resampleCurves(om.MPxNode):
+    '''Batch version of resampleCurve.
+
+    Resamples an array of input curves in a single compute, all curves are
+    evaluated together by mayakit.nurbs.evaluate_packed. Like resampleCurve,
+    closed inputs resampled along their whole length output periodic curves.
+    '''
+
+    id_ = om.MTypeId(0x00124dfe)
+
+    def __init__(self):
+        super(resampleCurves, self).__init__()
+
+    @classmethod
+    def creator(cls):
+        return cls()
+
+    @classmethod
+    def initialize(cls):
+
+        typ_attr = om.MFnTypedAttribute()
+        num_attr = om.MFnNumericAttribute()
+        enum_attr = om.MFnEnumAttribute()
+
+        cls.inputCurve = typ_attr.create('inputCurve', 'ic', om.MFnData.kNurbsCurve)
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        typ_attr.cached = False
+        typ_attr.array = True
+        cls.addAttribute(cls.inputCurve)
+
+        cls.outputCurve = typ_attr.create('outputCurve', 'oc', om.MFnData.kNurbsCurve)
+        typ_attr.storable = False
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = False
+        typ_attr.cached = False
+        typ_attr.array = True
+        typ_attr.usesArrayDataBuilder = True
+        cls.addAttribute(cls.outputCurve)
+
+        cls.numPoints = num_attr.create('numPoints', 'np', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(1)
+        num_attr.default = 20
+        cls.addAttribute(cls.numPoints)
+
+        cls.tmin = num_attr.create('tMinimum', 'tmin', om.MFnNumericData.kDouble)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(0)
+        num_attr.setMax(1)
+        num_attr.default = 0
+        cls.addAttribute(cls.tmin)
+
+        cls.tmax = num_attr.create('tMaximum', 'tmax', om.MFnNumericData.kDouble)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(0)
+        num_attr.setMax(1)
+        num_attr.default = 1
+        cls.addAttribute(cls.tmax)
+
+        cls.degree = enum_attr.create('degree', 'deg')
+        enum_attr.storable = True
+        enum_attr.keyable = True
+        enum_attr.readable = True
+        enum_attr.writable = True
+        enum_attr.addField('input', 0)
+        enum_attr.addField('linear', 1)
+        cls.addAttribute(cls.degree)
+
+        cls.attributeAffects(cls.inputCurve, cls.outputCurve)
+        cls.attributeAffects(cls.numPoints, cls.outputCurve)
+        cls.attributeAffects(cls.degree, cls.outputCurve)
+        cls.attributeAffects(cls.tmin, cls.outputCurve)
+        cls.attributeAffects(cls.tmax, cls.outputCurve)
+
+    def compute(self, plug, data):
+
+        if plug.isElement:
+            plug = plug.array()
+
+        if plug == self.outputCurve:
+
+            # Pull every input curve once
+            in_curves_handle = data.inputArrayValue(self.inputCurve)
+            indices = []
+            in_curve_fns = []
+            for i in range(len(in_curves_handle)):
+                in_curves_handle.jumpToPhysicalElement(i)
+                in_curve = in_curves_handle.inputValue().asNurbsCurveTransformed()
+                indices.append(in_curves_handle.elementLogicalIndex())
+                in_curve_fns.append(om.MFnNurbsCurve(in_curve))
+            packed = curveio.read_curves(in_curve_fns)
+            num_curves = len(indices)
+
+            tmin = data.inputValue(self.tmin).asDouble()
+            tmax = data.inputValue(self.tmax).asDouble()
+            linear = data.inputValue(self.degree).asInt()
+            out_num_points = data.inputValue(self.numPoints).asInt()
+
+            # Resample all curves at once, closed curves become periodic
+            out_packed = sampling.resample_packed(packed, out_num_points, tmin, tmax, linear)
+
+            # Create output curves
+            out_curves_handle = data.outputArrayValue(self.outputCurve)
+            out_curves_builder = om.MArrayDataBuilder(data, self.outputCurve, num_curves)
+            for i, index in enumerate(indices):
+                cvs, _, degree, form = nurbs.unpack(out_packed, i)
+                out_curve_data = om.MFnNurbsCurveData().create()
+                out_curve_fn = om.MFnNurbsCurve()
+                out_curve_fn.create(
+                    om.MPointArray(cvs.tolist()),
+                    knotvectors.uniform(len(cvs), degree, form, om.MDoubleArray),
+                    degree,
+                    form,
+                    False,
+                    True,
+                    out_curve_data
+                )
+                out_curve_handle = out_curves_builder.addElement(index)
+                out_curve_handle.setMObject(out_curve_data)
+
+            out_curves_handle.set(out_curves_builder)
+            out_curves_handle.setAllClean()
+            data.setClean(plug)
+
+
+def initializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.registerNode(
+            resampleCurves.__name__,
+            resampleCurves.id_,
+            resampleCurves.creator,
+            resampleCurves.initialize
+        )
+    except:
+        sys.stderr.write("Failed to register node\n")
+        raise
+
+
+def uninitializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.deregisterNode(resampleCurves.id_)
+    except:
+        sys.stderr.write("Failed to deregister node\n")
+        raise
+
+
+class AEresampleCurvesTemplate(pmc.ui.AETemplate):
+    _nodeType = 'resampleCurves'
+
+    def __init__(self, node_name):
+        self.beginScrollLayout()
+
+        self.beginLayout('Resample Curves', collapse=False)
+        self.addControl('numPoints')
+        self.addControl('degree')
+        self.addControl('tMinimum')
+        self.addControl('tMaximum')
+        self.endLayout()
+
+        self.addExtraControls()
+
+        self.endScrollLayout()
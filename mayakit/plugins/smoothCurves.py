@@ -0,0 +1,214 @@
+import maya.api.OpenMaya as om
+import pymel.core as pmc
+import sys
+
+from mayakit import curveio, nurbs, smoothing
+
+
+def maya_useNewAPI():
+    pass
+
+
+class smoothCurves(om.MPxNode):
+    '''Relax the cvs of an array of curves.
+
+    Applies Laplacian or Taubin smoothing to every input curve in a single
+    compute using mayakit.smoothing. Output curves keep the knots, degree
+    and form of their input curves.
+    '''
+
+    id_ = om.MTypeId(0x00124df8)
+
+    def __init__(self):
+        super(smoothCurves, self).__init__()
+
+    @classmethod
+    def creator(cls):
+        return cls()
+
+    @classmethod
+    def initialize(cls):
+
+        typ_attr = om.MFnTypedAttribute()
+        num_attr = om.MFnNumericAttribute()
+        enum_attr = om.MFnEnumAttribute()
+
+        cls.inputCurve = typ_attr.create('inputCurve', 'ic', om.MFnData.kNurbsCurve)
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        typ_attr.cached = False
+        typ_attr.array = True
+        cls.addAttribute(cls.inputCurve)
+
+        cls.outputCurve = typ_attr.create('outputCurve', 'oc', om.MFnData.kNurbsCurve)
+        typ_attr.storable = False
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = False
+        typ_attr.cached = False
+        typ_attr.array = True
+        typ_attr.usesArrayDataBuilder = True
+        cls.addAttribute(cls.outputCurve)
+
+        cls.iterations = num_attr.create('iterations', 'it', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(0)
+        num_attr.default = 10
+        cls.addAttribute(cls.iterations)
+
+        cls.factor = num_attr.create('factor', 'f', om.MFnNumericData.kDouble)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(0)
+        num_attr.setMax(1)
+        num_attr.default = 0.5
+        cls.addAttribute(cls.factor)
+
+        cls.method = enum_attr.create('method', 'mt')
+        enum_attr.storable = True
+        enum_attr.keyable = True
+        enum_attr.readable = True
+        enum_attr.writable = True
+        enum_attr.addField('laplacian', 0)
+        enum_attr.addField('taubin', 1)
+        cls.addAttribute(cls.method)
+
+        cls.pinStart = num_attr.create('pinStart', 'ps', om.MFnNumericData.kBoolean)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.default = True
+        cls.addAttribute(cls.pinStart)
+
+        cls.pinEnd = num_attr.create('pinEnd', 'pe', om.MFnNumericData.kBoolean)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.default = True
+        cls.addAttribute(cls.pinEnd)
+
+        cls.preserveLength = num_attr.create('preserveLength', 'pl', om.MFnNumericData.kBoolean)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.default = False
+        cls.addAttribute(cls.preserveLength)
+
+        inputs = (
+            cls.inputCurve,
+            cls.iterations,
+            cls.factor,
+            cls.method,
+            cls.pinStart,
+            cls.pinEnd,
+            cls.preserveLength,
+        )
+        for input_attr in inputs:
+            cls.attributeAffects(input_attr, cls.outputCurve)
+
+    def compute(self, plug, data):
+
+        if plug.isElement:
+            plug = plug.array()
+
+        if plug == self.outputCurve:
+
+            # Pull every input curve once
+            in_curves_handle = data.inputArrayValue(self.inputCurve)
+            indices = []
+            in_curve_fns = []
+            for i in range(len(in_curves_handle)):
+                in_curves_handle.jumpToPhysicalElement(i)
+                in_curve = in_curves_handle.inputValue().asNurbsCurveTransformed()
+                indices.append(in_curves_handle.elementLogicalIndex())
+                in_curve_fns.append(om.MFnNurbsCurve(in_curve))
+            packed = curveio.read_curves(in_curve_fns)
+
+            # Smooth all curves at once
+            packed = smoothing.smooth_packed(
+                packed,
+                iterations=data.inputValue(self.iterations).asInt(),
+                factor=data.inputValue(self.factor).asDouble(),
+                method=('laplacian', 'taubin')[data.inputValue(self.method).asInt()],
+                pin_start=data.inputValue(self.pinStart).asBool(),
+                pin_end=data.inputValue(self.pinEnd).asBool(),
+                preserve_length=data.inputValue(self.preserveLength).asBool(),
+            )
+
+            # Create output curves
+            out_curves_handle = data.outputArrayValue(self.outputCurve)
+            out_curves_builder = om.MArrayDataBuilder(data, self.outputCurve, len(indices))
+            for i, index in enumerate(indices):
+                cvs, knots, degree, form = nurbs.unpack(packed, i)
+                out_curve_data = om.MFnNurbsCurveData().create()
+                out_curve_fn = om.MFnNurbsCurve()
+                out_curve_fn.create(
+                    om.MPointArray(cvs.tolist()),
+                    om.MDoubleArray(knots.tolist()),
+                    degree,
+                    form,
+                    False,
+                    True,
+                    out_curve_data
+                )
+                out_curve_handle = out_curves_builder.addElement(index)
+                out_curve_handle.setMObject(out_curve_data)
+
+            out_curves_handle.set(out_curves_builder)
+            out_curves_handle.setAllClean()
+            data.setClean(plug)
+
+
+def initializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.registerNode(
+            smoothCurves.__name__,
+            smoothCurves.id_,
+            smoothCurves.creator,
+            smoothCurves.initialize
+        )
+    except:
+        sys.stderr.write("Failed to register node\n")
+        raise
+
+
+def uninitializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.deregisterNode(smoothCurves.id_)
+    except:
+        sys.stderr.write("Failed to deregister node\n")
+        raise
+
+
+class AEsmoothCurvesTemplate(pmc.ui.AETemplate):
+    _nodeType = 'smoothCurves'
+
+    def __init__(self, node_name):
+        self.beginScrollLayout()
+
+        self.beginLayout('Smooth Curves', collapse=False)
+        self.addControl('iterations')
+        self.addControl('factor')
+        self.addControl('method')
+        self.addControl('pinStart')
+        self.addControl('pinEnd')
+        self.addControl('preserveLength')
+        self.endLayout()
+
+        self.addExtraControls()
+
+        self.endScrollLayout()
@@ -0,0 +1,229 @@
+import maya.api.OpenMaya as om
+import pymel.core as pmc
+import sys
+
+from mayakit import knotvectors, nurbs, stitching
+
+
+def maya_useNewAPI():
+    pass
+
+
+class stitchCurves(om.MPxNode):
+    '''Live version of mayakit.stitches.cross_stitch.
+
+    Outputs the two stitches of a cross stitch between curveA and curveB as
+    outputCurve[0] and outputCurve[1]. Dense tables of both input curves
+    are cached and only rebuilt when the curves change, so changing the
+    stitch attributes only looks up the tables.
+    '''
+
+    id_ = om.MTypeId(0x00124dfa)
+
+    def __init__(self):
+        super(stitchCurves, self).__init__()
+        self._cache = nurbs.TableCache(max_bytes=16 * 1024 * 1024)
+
+    @classmethod
+    def creator(cls):
+        return cls()
+
+    @classmethod
+    def initialize(cls):
+
+        typ_attr = om.MFnTypedAttribute()
+        num_attr = om.MFnNumericAttribute()
+        enum_attr = om.MFnEnumAttribute()
+        unit_attr = om.MFnUnitAttribute()
+
+        cls.curveA = typ_attr.create('curveA', 'ca', om.MFnData.kNurbsCurve)
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        typ_attr.cached = False
+        cls.addAttribute(cls.curveA)
+
+        cls.curveB = typ_attr.create('curveB', 'cb', om.MFnData.kNurbsCurve)
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        typ_attr.cached = False
+        cls.addAttribute(cls.curveB)
+
+        cls.outputCurve = typ_attr.create('outputCurve', 'oc', om.MFnData.kNurbsCurve)
+        typ_attr.storable = False
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = False
+        typ_attr.cached = False
+        typ_attr.array = True
+        typ_attr.usesArrayDataBuilder = True
+        cls.addAttribute(cls.outputCurve)
+
+        cls.stitches = num_attr.create('stitches', 'st', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(2)
+        num_attr.default = 108
+        cls.addAttribute(cls.stitches)
+
+        cls.stitchPoints = num_attr.create('stitchPoints', 'sp', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(1)
+        num_attr.default = 8
+        cls.addAttribute(cls.stitchPoints)
+
+        cls.uOffset = num_attr.create('uOffset', 'uo', om.MFnNumericData.kDouble)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        cls.addAttribute(cls.uOffset)
+
+        cls.tangentOffset = unit_attr.create('tangentOffset', 'to', om.MFnUnitAttribute.kDistance)
+        unit_attr.storable = True
+        unit_attr.keyable = True
+        unit_attr.readable = True
+        unit_attr.writable = True
+        cls.addAttribute(cls.tangentOffset)
+
+        cls.normalMode = enum_attr.create('normalMode', 'nm')
+        enum_attr.storable = True
+        enum_attr.keyable = True
+        enum_attr.readable = True
+        enum_attr.writable = True
+        enum_attr.addField('sphere', 0)
+        enum_attr.addField('lofted', 1)
+        cls.addAttribute(cls.normalMode)
+
+        cls.center = num_attr.create('center', 'ce', om.MFnNumericData.k3Double)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        cls.addAttribute(cls.center)
+
+        inputs = (
+            cls.curveA,
+            cls.curveB,
+            cls.stitches,
+            cls.stitchPoints,
+            cls.uOffset,
+            cls.tangentOffset,
+            cls.normalMode,
+            cls.center,
+        )
+        for input_attr in inputs:
+            cls.attributeAffects(input_attr, cls.outputCurve)
+
+    def compute(self, plug, data):
+
+        if plug.isElement:
+            plug = plug.array()
+
+        if plug == self.outputCurve:
+
+            # Look up the cached tables of both curves
+            tables = []
+            for attr in (self.curveA, self.curveB):
+                curve = data.inputValue(attr).asNurbsCurveTransformed()
+                cvs, knots, degree = nurbs.from_curve_fn(om.MFnNurbsCurve(curve))
+                tables.append(self._cache.table(cvs, knots, degree))
+
+            if data.inputValue(self.normalMode).asInt() == 0:
+                normal_fn = stitching.sphere_normals(
+                    data.inputValue(self.center).asDouble3()
+                )
+            else:
+                normal_fn = None
+
+            stitch_points = stitching.cross_stitch_points(
+                tables[0],
+                tables[1],
+                data.inputValue(self.stitches).asInt(),
+                data.inputValue(self.stitchPoints).asInt(),
+                data.inputValue(self.uOffset).asDouble(),
+                data.inputValue(self.tangentOffset).asDistance().asUnits(
+                    om.MDistance.internalUnit()
+                ),
+                normal_fn
+            )
+
+            # Create output curves
+            out_curves_handle = data.outputArrayValue(self.outputCurve)
+            out_curves_builder = om.MArrayDataBuilder(data, self.outputCurve, 2)
+            for index, points in enumerate(stitch_points):
+                out_degree = min(3, len(points) - 1)
+                out_curve_data = om.MFnNurbsCurveData().create()
+                out_curve_fn = om.MFnNurbsCurve()
+                out_curve_fn.create(
+                    om.MPointArray(points.tolist()),
+                    knotvectors.uniform(
+                        len(points),
+                        out_degree,
+                        array_typ=om.MDoubleArray
+                    ),
+                    out_degree,
+                    om.MFnNurbsCurve.kOpen,
+                    False,
+                    True,
+                    out_curve_data
+                )
+                out_curve_handle = out_curves_builder.addElement(index)
+                out_curve_handle.setMObject(out_curve_data)
+
+            out_curves_handle.set(out_curves_builder)
+            out_curves_handle.setAllClean()
+            data.setClean(plug)
+
+
+def initializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.registerNode(
+            stitchCurves.__name__,
+            stitchCurves.id_,
+            stitchCurves.creator,
+            stitchCurves.initialize
+        )
+    except:
+        sys.stderr.write("Failed to register node\n")
+        raise
+
+
+def uninitializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.deregisterNode(stitchCurves.id_)
+    except:
+        sys.stderr.write("Failed to deregister node\n")
+        raise
+
+
+class AEstitchCurvesTemplate(pmc.ui.AETemplate):
+    _nodeType = 'stitchCurves'
+
+    def __init__(self, node_name):
+        self.beginScrollLayout()
+
+        self.beginLayout('Stitch Curves', collapse=False)
+        self.addControl('stitches')
+        self.addControl('stitchPoints')
+        self.addControl('uOffset')
+        self.addControl('tangentOffset')
+        self.addControl('normalMode')
+        self.addControl('center')
+        self.endLayout()
+
+        self.addExtraControls()
+
+        self.endScrollLayout()
@@ -0,0 +1,230 @@
+import maya.api.OpenMaya as om
+import pymel.core as pmc
+import numpy as np
+import sys
+
+from mayakit import curveio, nurbs, tubes
+
+
+def maya_useNewAPI():
+    pass
+
+
+class sweepCurves(om.MPxNode):
+    '''Sweep a profile along an array of curves into one mesh.
+
+    Replaces an extrude and tessellate node per curve. The profile is a
+    circle with the given number of sides or samples of profileCurve, read
+    in the XZ plane like a default nurbsCircle. It's scaled by radius and by
+    the radiusScale value of each curve, in the order the curves are
+    connected. All curves are sampled, framed and swept together by
+    mayakit.tubes.
+    '''
+
+    id_ = om.MTypeId(0x00124df9)
+
+    def __init__(self):
+        super(sweepCurves, self).__init__()
+
+    @classmethod
+    def creator(cls):
+        return cls()
+
+    @classmethod
+    def initialize(cls):
+
+        typ_attr = om.MFnTypedAttribute()
+        num_attr = om.MFnNumericAttribute()
+        unit_attr = om.MFnUnitAttribute()
+
+        cls.inputCurve = typ_attr.create('inputCurve', 'ic', om.MFnData.kNurbsCurve)
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        typ_attr.cached = False
+        typ_attr.array = True
+        cls.addAttribute(cls.inputCurve)
+
+        cls.profileCurve = typ_attr.create('profileCurve', 'pc', om.MFnData.kNurbsCurve)
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        typ_attr.cached = False
+        cls.addAttribute(cls.profileCurve)
+
+        cls.outputMesh = typ_attr.create('outputMesh', 'om', om.MFnData.kMesh)
+        typ_attr.storable = False
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = False
+        typ_attr.cached = False
+        cls.addAttribute(cls.outputMesh)
+
+        cls.segments = num_attr.create('segments', 'seg', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(1)
+        num_attr.default = 16
+        cls.addAttribute(cls.segments)
+
+        cls.sides = num_attr.create('sides', 'sd', om.MFnNumericData.kInt)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.setMin(2)
+        num_attr.default = 8
+        cls.addAttribute(cls.sides)
+
+        cls.radius = unit_attr.create('radius', 'r', om.MFnUnitAttribute.kDistance)
+        unit_attr.storable = True
+        unit_attr.keyable = True
+        unit_attr.readable = True
+        unit_attr.writable = True
+        unit_attr.setMin(0)
+        unit_attr.default = om.MDistance(0.1)
+        cls.addAttribute(cls.radius)
+
+        cls.radiusScale = typ_attr.create('radiusScale', 'rs', om.MFnData.kDoubleArray)
+        typ_attr.storable = True
+        typ_attr.keyable = False
+        typ_attr.readable = True
+        typ_attr.writable = True
+        typ_attr.default = om.MFnDoubleArrayData().create()
+        cls.addAttribute(cls.radiusScale)
+
+        cls.upVector = num_attr.create('upVector', 'up', om.MFnNumericData.k3Double)
+        num_attr.storable = True
+        num_attr.keyable = True
+        num_attr.readable = True
+        num_attr.writable = True
+        num_attr.default = (0, 1, 0)
+        cls.addAttribute(cls.upVector)
+
+        inputs = (
+            cls.inputCurve,
+            cls.profileCurve,
+            cls.segments,
+            cls.sides,
+            cls.radius,
+            cls.radiusScale,
+            cls.upVector,
+        )
+        for input_attr in inputs:
+            cls.attributeAffects(input_attr, cls.outputMesh)
+
+    def profile(self, data, sides):
+        '''Get the profile points and whether the profile is closed'''
+
+        profile_handle = data.inputValue(self.profileCurve)
+        if profile_handle.data().isNull():
+            return tubes.circle_profile(sides), True
+
+        profile_fn = om.MFnNurbsCurve(profile_handle.asNurbsCurve())
+        cvs, knots, degree = nurbs.from_curve_fn(profile_fn)
+        closed = profile_fn.form != om.MFnNurbsCurve.kOpen
+        umin, umax = nurbs.domain(knots, degree)
+        params = np.linspace(umin, umax, sides, endpoint=not closed)
+        points = nurbs.points_at(cvs, knots, degree, params)
+        return points[:, [0, 2]], closed
+
+    def compute(self, plug, data):
+
+        if plug == self.outputMesh:
+
+            # Pull every input curve once
+            in_curves_handle = data.inputArrayValue(self.inputCurve)
+            in_curve_fns = []
+            for i in range(len(in_curves_handle)):
+                in_curves_handle.jumpToPhysicalElement(i)
+                in_curve = in_curves_handle.inputValue().asNurbsCurveTransformed()
+                in_curve_fns.append(om.MFnNurbsCurve(in_curve))
+            num_curves = len(in_curve_fns)
+
+            segments = data.inputValue(self.segments).asInt()
+            sides = data.inputValue(self.sides).asInt()
+            profile, closed = self.profile(data, sides)
+
+            radius = data.inputValue(self.radius).asDistance().asUnits(
+                om.MDistance.internalUnit()
+            )
+            scales = np.array(om.MFnDoubleArrayData(
+                data.inputValue(self.radiusScale).data()
+            ).array(), dtype=np.float64)[:num_curves]
+            scales = np.concatenate((scales, np.ones(num_curves - len(scales))))
+
+            out_mesh_data = om.MFnMeshData().create()
+            if num_curves:
+                mesh = tubes.tube_mesh(
+                    curveio.read_curves(in_curve_fns),
+                    segments,
+                    profile,
+                    radius * scales,
+                    closed,
+                    data.inputValue(self.upVector).asDouble3()
+                )
+                face_counts = om.MIntArray(mesh.face_counts.tolist())
+                out_mesh_fn = om.MFnMesh()
+                out_mesh_fn.create(
+                    om.MPointArray(mesh.points.tolist()),
+                    face_counts,
+                    om.MIntArray(mesh.face_connects.tolist()),
+                    om.MFloatArray(mesh.us.tolist()),
+                    om.MFloatArray(mesh.vs.tolist()),
+                    out_mesh_data
+                )
+                out_mesh_fn.assignUVs(
+                    face_counts,
+                    om.MIntArray(mesh.uv_ids.tolist())
+                )
+
+            out_mesh_handle = data.outputValue(self.outputMesh)
+            out_mesh_handle.setMObject(out_mesh_data)
+            data.setClean(plug)
+
+
+def initializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.registerNode(
+            sweepCurves.__name__,
+            sweepCurves.id_,
+            sweepCurves.creator,
+            sweepCurves.initialize
+        )
+    except:
+        sys.stderr.write("Failed to register node\n")
+        raise
+
+
+def uninitializePlugin(obj):
+    plugin = om.MFnPlugin(obj)
+
+    try:
+        plugin.deregisterNode(sweepCurves.id_)
+    except:
+        sys.stderr.write("Failed to deregister node\n")
+        raise
+
+
+class AEsweepCurvesTemplate(pmc.ui.AETemplate):
+    _nodeType = 'sweepCurves'
+
+    def __init__(self, node_name):
+        self.beginScrollLayout()
+
+        self.beginLayout('Sweep Curves', collapse=False)
+        self.addControl('segments')
+        self.addControl('sides')
+        self.addControl('radius')
+        self.addControl('upVector')
+        self.endLayout()
+
+        self.addExtraControls()
+
+        self.endScrollLayout()
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+'''
+registry
+========
+In memory index of the nodes mayakit.strands tags, so finding the active
+nucleus or hairSystem does not search the whole scene.
+
+The registry is built from one scan of the scene's tag attributes the first
+time it's used after a scene is opened, created or imported into. After
+that it's kept current by callbacks: nuclei and hairSystems are watched as
+they're added, tagged nodes are watched for changes to their tags and
+dropped when they're removed. mayakit.tags.add and remove notify the
+registry, so any node tagged through them is indexed and watched. Nodes
+are held as MObjectHandles, lookups are dictionary lookups.
+'''
+import maya.api.OpenMaya as om
+from maya import cmds
+
+ID = '_id'
+GROUP = 'hair_system'
+ACTIVE = {
+    'strands_nucleus': 'nucleus',
+    'strands_hairsystem': 'hairsystem',
+}
+TAGS = (ID, GROUP) + tuple(ACTIVE)
+WATCHED_TYPES = ('nucleus', 'hairSystem', 'transform')
+SCENE_MESSAGES = (
+    'kAfterOpen',
+    'kAfterNew',
+    'kAfterImport',
+    'kAfterCreateReference',
+    'kAfterLoadReference',
+    'kAfterUnloadReference',
+    'kAfterRemoveReference',
+)
+
+
+def _node(node):
+    if isinstance(node, om.MObject):
+        return node
+    sel = om.MSelectionList()
+    sel.add(node)
+    return sel.getDependNode(0)
+
+
+def _name(handle):
+    obj = handle.object()
+    if obj.hasFn(om.MFn.kDagNode):
+        return om.MFnDagNode(obj).partialPathName()
+    return om.MFnDependencyNode(obj).name()
+
+
+def read_tags(node):
+    '''Get the strands tags of a node'''
+
+    fn = om.MFnDependencyNode(node)
+    return dict(
+        (tag, fn.findPlug(tag, False).asString())
+        for tag in TAGS
+        if fn.hasAttribute(tag)
+    )
+
+
+class StrandsRegistry(object):
+    '''Index of tagged strands nodes by id, active state and hairSystem'''
+
+    def __init__(self):
+        self.built = False
+        self._nodes = {}
+        self._ids = {}
+        self._groups = {}
+        self._active = dict((kind, {}) for kind in ACTIVE.values())
+        self._callbacks = []
+        self._node_callbacks = {}
+
+    def build(self):
+        '''Index every tagged node in the scene'''
+
+        self.clear()
+        nodes = set()
+        for tag in TAGS:
+            nodes.update(cmds.ls(
+                '*.' + tag,
+                objectsOnly=True,
+                recursive=True,
+                long=True
+            ) or [])
+        for node in nodes:
+            self.update(node)
+        for node in cmds.ls(type=['nucleus', 'hairSystem'], long=True) or []:
+            self._watch(_node(node))
+        self.built = True
+
+    def clear(self):
+        '''Forget all nodes'''
+
+        for callback in self._node_callbacks.values():
+            om.MMessage.removeCallback(callback)
+        self._node_callbacks.clear()
+        self._nodes.clear()
+        self._ids.clear()
+        self._groups.clear()
+        for active in self._active.values():
+            active.clear()
+        self.built = False
+
+    def _ensure_built(self):
+        if not self.built:
+            self.build()
+
+    def _unindex(self, key):
+        handle, tags = self._nodes.pop(key, (None, {}))
+        if self._ids.get(tags.get(ID)) == key:
+            del self._ids[tags[ID]]
+        if self._groups.get(tags.get(GROUP)) == key:
+            del self._groups[tags[GROUP]]
+        for active in self._active.values():
+            active.pop(key, None)
+
+    def update(self, node):
+        '''Reindex a node after its tags changed'''
+
+        node = _node(node)
+        handle = om.MObjectHandle(node)
+        key = handle.hashCode()
+        self._unindex(key)
+
+        tags = read_tags(node)
+        if not tags:
+            return
+        self._nodes[key] = (handle, tags)
+        if ID in tags:
+            self._ids[tags[ID]] = key
+        if GROUP in tags:
+            self._groups[tags[GROUP]] = key
+        for tag, kind in ACTIVE.items():
+            if tags.get(tag) == 'active':
+                self._active[kind][key] = handle
+        self._watch(node)
+
+    def remove(self, node):
+        '''Forget a node'''
+
+        key = om.MObjectHandle(_node(node)).hashCode()
+        self._unindex(key)
+        callback = self._node_callbacks.pop(key, None)
+        if callback is not None:
+            om.MMessage.removeCallback(callback)
+
+    def _watch(self, node):
+        key = om.MObjectHandle(node).hashCode()
+        if key not in self._node_callbacks:
+            self._node_callbacks[key] = om.MNodeMessage.addAttributeChangedCallback(
+                node,
+                self._attribute_changed
+            )
+
+    def _lookup(self, key):
+        '''Get the name of an indexed node, dropping it if it's gone'''
+
+        if key not in self._nodes:
+            return None
+        handle = self._nodes[key][0]
+        if not handle.isValid():
+            self._unindex(key)
+            return None
+        return _name(handle)
+
+    def active(self, kind):
+        '''Get an active node, kind is nucleus or hairsystem'''
+
+        self._ensure_built()
+        for key in list(self._active[kind]):
+            name = self._lookup(key)
+            if name:
+                return name
+
+    def all_active(self, kind):
+        '''Get all active nodes, there should only ever be one'''
+
+        self._ensure_built()
+        return [
+            name for name in map(self._lookup, list(self._active[kind]))
+            if name
+        ]
+
+    def by_id(self, id_):
+        '''Get the node tagged with an id'''
+
+        self._ensure_built()
+        return self._lookup(self._ids.get(id_))
+
+    def group(self, hair_id):
+        '''Get the controls group of the hairSystem with hair_id'''
+
+        self._ensure_built()
+        return self._lookup(self._groups.get(hair_id))
+
+    def tags(self, node):
+        '''Get the indexed tags of a node'''
+
+        self._ensure_built()
+        key = om.MObjectHandle(_node(node)).hashCode()
+        return dict(self._nodes.get(key, (None, {}))[1])
+
+    def install(self):
+        '''Add the callbacks keeping the registry current'''
+
+        if self._callbacks:
+            return
+        for message in SCENE_MESSAGES:
+            self._callbacks.append(om.MSceneMessage.addCallback(
+                getattr(om.MSceneMessage, message),
+                self._scene_changed
+            ))
+        for typ in WATCHED_TYPES:
+            self._callbacks.append(om.MDGMessage.addNodeAddedCallback(
+                self._node_added,
+                typ
+            ))
+            self._callbacks.append(om.MDGMessage.addNodeRemovedCallback(
+                self._node_removed,
+                typ
+            ))
+
+    def uninstall(self):
+        '''Remove all callbacks and forget all nodes'''
+
+        self.clear()
+        if self._callbacks:
+            om.MMessage.removeCallbacks(self._callbacks)
+        self._callbacks = []
+
+    def _scene_changed(self, *args):
+        self.clear()
+
+    def _node_added(self, node, *args):
+        if not self.built:
+            return
+        if node.hasFn(om.MFn.kTransform):
+            # Transforms are only indexed when they already carry tags,
+            # like when undoing their deletion
+            if read_tags(node):
+                self.update(node)
+        else:
+            self.update(node)
+            self._watch(node)
+
+    def _node_removed(self, node, *args):
+        key = om.MObjectHandle(node).hashCode()
+        if key in self._nodes or key in self._node_callbacks:
+            self.remove(node)
+
+    def _attribute_changed(self, msg, plug, *args):
+        changed = (
+            om.MNodeMessage.kAttributeSet |
+            om.MNodeMessage.kAttributeAdded |
+            om.MNodeMessage.kAttributeRemoved
+        )
+        if msg & changed and plug.partialName(useLongNames=True) in TAGS:
+            self.update(plug.node())
+
+
+_registry = None
+
+
+def get_registry():
+    '''Get the registry, creating it and installing its callbacks on first
+    use
+    '''
+
+    global _registry
+    if _registry is None:
+        _registry = StrandsRegistry()
+        _registry.install()
+    return _registry
+
+
+def notify(nodes):
+    '''Reindex nodes whose strands tags were added or removed, used by
+    mayakit.tags. Until the registry is built it will find them itself.
+    '''
+
+    if _registry is None or not _registry.built:
+        return
+    for node in nodes:
+        _registry.update(node)
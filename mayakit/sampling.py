@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+'''
+sampling
+========
+Strategies for choosing the parameters to sample a nurbsCurve at. Like
+mayakit.nurbs this module does not depend on Maya.
+'''
+from __future__ import division
+
+import numpy as np
+
+from . import knotvectors, nurbs
+
+
+class ArcLengthTable(object):
+    '''Cumulative arc length of a curve, used to map lengths to parameters.
+
+    The table is integrated once with gauss-legendre quadrature over
+    subdivisions of each knot span. Mapping lengths back to parameters is a
+    binary search into the table and does not evaluate the curve.
+
+    :param cvs: cvs of curve
+    :param knots: Maya knot array
+    :param degree: degree of curve
+    :param subdivisions: number of table entries per knot span
+    :param quadrature: number of gauss-legendre points per table entry
+    '''
+
+    def __init__(self, cvs, knots, degree, subdivisions=16, quadrature=5):
+        cvs = np.array(cvs, dtype=np.float64)
+        knots = np.array(knots, dtype=np.float64)
+        params = nurbs.span_params(knots, degree, subdivisions)
+
+        nodes, weights = np.polynomial.legendre.leggauss(quadrature)
+        half = np.diff(params)[:, None] * 0.5
+        samples = (params[:-1, None] + half) + half * nodes
+        _, derivs = nurbs.evaluate(cvs, knots, degree, samples.ravel())
+        speeds = np.linalg.norm(derivs, axis=1).reshape(samples.shape)
+        segments = (speeds * weights * half).sum(axis=1)
+
+        self.cvs = cvs
+        self.knots = knots
+        self.degree = degree
+        self.params = params
+        self.lengths = np.concatenate(([0], np.cumsum(segments)))
+
+    def matches(self, cvs, knots, degree):
+        '''Was this table built for the given curve?'''
+
+        return (
+            degree == self.degree and
+            np.array_equal(cvs, self.cvs) and
+            np.array_equal(knots, self.knots)
+        )
+
+    @property
+    def length(self):
+        '''Total length of the curve'''
+
+        return float(self.lengths[-1])
+
+    def params_at(self, lengths):
+        '''Get the parameters at the given lengths along the curve'''
+
+        return np.interp(lengths, self.lengths, self.params)
+
+    def uniform_params(self, num_points, tmin=0, tmax=1, endpoint=True):
+        '''Get parameters evenly spaced by arc length
+
+        :param num_points: number of parameters
+        :param tmin: start of range as a fraction of the curve's length
+        :param tmax: end of range as a fraction of the curve's length
+        :param endpoint: include tmax, exclude it for closed curves where
+            the end of the curve is also the start
+        '''
+
+        steps = np.linspace(tmin, tmax, num_points, endpoint=endpoint)
+        lengths = steps * self.length
+        return self.params_at(lengths)
+
+    def spaced_params(self, spacing, tmin=0, tmax=1, max_points=None):
+        '''Get parameters a fixed distance apart along the curve
+
+        The first parameter is at tmin, the last is the furthest one that
+        fits before tmax.
+
+        :param spacing: distance between samples
+        :param tmin: start of range as a fraction of the curve's length
+        :param tmax: end of range as a fraction of the curve's length
+        :param max_points: optional maximum number of parameters
+        '''
+
+        start = tmin * self.length
+        span = max(tmax - tmin, 0) * self.length
+        num_points = int(np.floor(span / spacing + 1e-9)) + 1
+        if max_points is not None:
+            num_points = max(min(num_points, max_points), 1)
+        return self.params_at(start + np.arange(num_points) * spacing)
+
+
+def _segment_distance(points, starts, ends):
+    '''Distance from points to the line segments between starts and ends'''
+
+    segments = ends - starts
+    offsets = points - starts
+    projected = np.einsum('...i,...i->...', offsets, segments)
+    lengths = np.einsum('...i,...i->...', segments, segments)
+    lengths = np.broadcast_to(lengths, projected.shape)
+    t = np.divide(
+        projected,
+        lengths,
+        out=np.zeros_like(projected),
+        where=lengths != 0
+    )
+    t = np.clip(t, 0, 1)[..., None]
+    return np.linalg.norm(offsets - segments * t, axis=-1)
+
+
+def chord_deviation(cvs, knots, degree, params, probes=7):
+    '''Measure how far a curve strays from the polyline through params
+
+    :param cvs: cvs of curve
+    :param knots: Maya knot array
+    :param degree: degree of curve
+    :param params: sorted parameters of the polyline's points
+    :param probes: number of points to measure between each pair of params
+    :returns: max deviation between each pair of params
+    '''
+
+    params = np.asarray(params, dtype=np.float64)
+    points = nurbs.points_at(cvs, knots, degree, params)
+    steps = np.arange(1, probes + 1) / (probes + 1)
+    samples = params[:-1, None] + np.diff(params)[:, None] * steps
+    samples = nurbs.points_at(cvs, knots, degree, samples.ravel())
+    samples = samples.reshape(len(params) - 1, probes, 3)
+    return _segment_distance(
+        samples,
+        points[:-1, None],
+        points[1:, None]
+    ).max(axis=1)
+
+
+def adaptive_params(cvs, knots, degree, tolerance, tmin=0.0, tmax=1.0,
+                    min_points=2, max_points=1000, probes=7):
+    '''Get parameters whose polyline stays within tolerance of the curve.
+
+    Starts with min_points evenly spaced parameters plus any sharp knots,
+    then repeatedly splits every interval whose chord deviates more than
+    tolerance from the curve. Each round measures all pending intervals at
+    once. When max_points would be exceeded only the worst intervals are
+    split.
+
+    :param cvs: cvs of curve
+    :param knots: Maya knot array
+    :param degree: degree of curve
+    :param tolerance: maximum chord deviation
+    :param tmin: start of range as a fraction of the curve's domain
+    :param tmax: end of range as a fraction of the curve's domain
+    :param min_points: minimum number of parameters
+    :param max_points: maximum number of parameters
+    :param probes: odd number of points to measure each interval at, the
+        middle one becomes the new parameter when an interval is split
+    '''
+
+    knots = np.asarray(knots, dtype=np.float64)
+    umin, umax = nurbs.domain(knots, degree)
+    start = umin + (umax - umin) * tmin
+    end = umin + (umax - umin) * tmax
+
+    # Knots with full multiplicity are corners, always sample them
+    unique, counts = np.unique(knots, return_counts=True)
+    corners = unique[(counts >= degree) & (unique > start) & (unique < end)]
+    params = np.union1d(
+        np.linspace(start, end, max(min_points, 2)),
+        corners
+    )
+    points = nurbs.points_at(cvs, knots, degree, params)
+
+    accepted = [params]
+    count = len(params)
+    lo_t, hi_t = params[:-1], params[1:]
+    lo_p, hi_p = points[:-1], points[1:]
+    steps = np.arange(1, probes + 1) / (probes + 1)
+    middle = probes // 2
+    while len(lo_t) and count < max_points:
+        samples = lo_t[:, None] + (hi_t - lo_t)[:, None] * steps
+        sample_points = nurbs.points_at(cvs, knots, degree, samples.ravel())
+        sample_points = sample_points.reshape(len(lo_t), len(steps), 3)
+        errors = _segment_distance(
+            sample_points,
+            lo_p[:, None],
+            hi_p[:, None]
+        ).max(axis=1)
+
+        split = np.flatnonzero(errors > tolerance)
+        if not len(split):
+            break
+        budget = max_points - count
+        if len(split) > budget:
+            split = split[np.argsort(-errors[split])[:budget]]
+
+        mid_t = samples[split, middle]
+        mid_p = sample_points[split, middle]
+        accepted.append(mid_t)
+        count += len(split)
+
+        lo_t, hi_t = (
+            np.concatenate((lo_t[split], mid_t)),
+            np.concatenate((mid_t, hi_t[split]))
+        )
+        lo_p, hi_p = (
+            np.concatenate((lo_p[split], mid_p)),
+            np.concatenate((mid_p, hi_p[split]))
+        )
+
+    return np.sort(np.concatenate(accepted))
+
+
+def shift_params(params, umin, umax, shift):
+    '''Shift parameters along a curve, wrapping the ones that leave its
+    domain back around to the other end
+
+    Parameters still inside the domain after the shift are left alone, so
+    the last sample of an open curve stays at umax instead of wrapping to
+    umin.
+
+    :param params: parameters in the curve's domain
+    :param umin: min parameter of the curve
+    :param umax: max parameter of the curve
+    :param shift: offset added to every parameter
+    '''
+
+    params = np.asarray(params, dtype=np.float64) + shift
+    outside = (params < umin) | (params > umax)
+    params[outside] = umin + (params[outside] - umin) % (umax - umin)
+    return params
+
+
+def closes(form, tmin=0.0, tmax=1.0):
+    '''Does resampling a curve between tmin and tmax give a closed curve?
+
+    :param form: MFnNurbsCurve form, 1 open, 2 closed or 3 periodic, or an
+        array of forms
+    :param tmin: start of range as a fraction of the curve's domain
+    :param tmax: end of range as a fraction of the curve's domain
+    '''
+
+    return (np.asarray(form) != knotvectors.OPEN) & (tmin <= 0) & (tmax >= 1)
+
+
+def domain_params(knots, degree, num_points, tmin=0.0, tmax=1.0, endpoint=True):
+    '''Get parameters evenly spaced in a curve's domain
+
+    :param knots: Maya knot array
+    :param degree: degree of curve
+    :param num_points: number of parameters
+    :param tmin: start of range as a fraction of the curve's domain
+    :param tmax: end of range as a fraction of the curve's domain
+    :param endpoint: include tmax, exclude it for closed curves where
+        the end of the curve is also the start
+    '''
+
+    umin, umax = nurbs.domain(knots, degree)
+    steps = np.linspace(tmin, tmax, num_points, endpoint=endpoint)
+    params = umin + (umax - umin) * steps
+    if tmax > 0.9999 and endpoint:
+        params[-1] = umax
+    return params
+
+
+def resampled_curve(points, degree, closed=False, array_typ=np.ndarray):
+    '''Get the cvs, knots, degree and form of a curve through resampled
+    points.
+
+    Closed curves become periodic when they have more points than their
+    degree, the first point is not repeated at the seam. Otherwise they are
+    open curves that end on their first point. The degree is lowered when
+    there are too few cvs for it, a single point becomes a degree 1 curve
+    of two coincident cvs.
+
+    :param points: (n, 3) resampled points
+    :param degree: degree of the resampled curve
+    :param closed: were the points sampled from a closed curve
+    :param array_typ: type of knot array to return, see knotvectors.uniform
+    :returns: cvs, knots, degree and form
+    '''
+
+    points = np.asarray(points, dtype=np.float64)
+    if closed and len(points) > degree:
+        form = knotvectors.PERIODIC
+        cvs = nurbs.wrap_cvs(points, degree)
+    else:
+        form = knotvectors.OPEN
+        cvs = np.concatenate((points, points[:1])) if closed else points
+        if len(cvs) == 1:
+            cvs = np.concatenate((cvs, cvs))
+        degree = min(degree, len(cvs) - 1)
+    return cvs, knotvectors.uniform(len(cvs), degree, form, array_typ), degree, form
+
+
+def resample_packed(packed, num_points, tmin=0.0, tmax=1.0, linear=False):
+    '''Resample many curves at parameters evenly spaced in their domains.
+
+    All curves are evaluated at once by mayakit.nurbs.evaluate_packed.
+    Each curve is resampled the same way as domain_params and
+    resampled_curve resample a single curve.
+
+    :param packed: PackedCurves
+    :param num_points: number of points per curve
+    :param tmin: start of range as a fraction of each curve's domain
+    :param tmax: end of range as a fraction of each curve's domain
+    :param linear: output degree 1 curves instead of the input degrees
+    :returns: PackedCurves
+    '''
+
+    num_curves = len(packed.degrees)
+    closed = closes(packed.forms, tmin, tmax)
+    umin, umax = nurbs.packed_domains(packed)
+    steps = np.where(
+        closed[:, None],
+        np.linspace(tmin, tmax, num_points, endpoint=False),
+        np.linspace(tmin, tmax, num_points)
+    )
+    params = umin[:, None] + (umax - umin)[:, None] * steps
+    if tmax > 0.9999:
+        params[~closed, -1] = umax[~closed]
+    curve_ids = np.repeat(np.arange(num_curves), num_points)
+    points = nurbs.evaluate_packed(packed, params.ravel(), curve_ids, order=0)[0]
+    points = points.reshape(num_curves, num_points, 3)
+
+    curves = []
+    for curve_points, degree, curve_closed in zip(points, packed.degrees, closed):
+        out_degree = 1 if linear else int(degree)
+        curves.append(resampled_curve(curve_points, out_degree, curve_closed))
+    return nurbs.pack(curves)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+'''
+sharding
+========
+Split strands into balanced shards, used by mayakit.strands to spread
+follicles over several hairSystems. Like mayakit.nurbs this module does not
+depend on Maya.
+
+Shards are given as one shard index per strand.
+'''
+from __future__ import division
+import heapq
+
+import numpy as np
+
+
+def spatial_shards(points, num_shards):
+    '''Split points into num_shards groups of nearby points with balanced
+    counts, using recursive coordinate bisection.
+
+    Points are split across the axis of greatest extent, with each side
+    getting a share of points proportional to the shards it is split into.
+
+    :param points: (n, 3) positions, like the roots of strands
+    :param num_shards: number of shards
+    :returns: shard index per point
+    '''
+
+    points = np.asarray(points, dtype=np.float64)
+    shards = np.zeros(len(points), dtype=np.int64)
+
+    def split(ids, first, count):
+        if count == 1 or not len(ids):
+            shards[ids] = first
+            return
+        axis = np.argmax(np.ptp(points[ids], axis=0))
+        left_count = count // 2
+        num_left = int(round(len(ids) * left_count / count))
+        order = np.argsort(points[ids, axis], kind='mergesort')
+        split(ids[order[:num_left]], first, left_count)
+        split(ids[order[num_left:]], first + left_count, count - left_count)
+
+    split(np.arange(len(points)), 0, num_shards)
+    return shards
+
+
+def key_shards(keys, num_shards):
+    '''Split strands into shards keeping strands with the same key together.
+
+    Keys are placed largest first on the shard with the fewest strands.
+
+    :param keys: hashable key per strand
+    :param num_shards: number of shards
+    :returns: shard index per strand
+    '''
+
+    groups = {}
+    for index, key in enumerate(keys):
+        groups.setdefault(key, []).append(index)
+
+    loads = [(0, shard) for shard in range(num_shards)]
+    shards = np.zeros(len(keys), dtype=np.int64)
+    for key in sorted(groups, key=lambda k: (-len(groups[k]), str(k))):
+        load, shard = heapq.heappop(loads)
+        shards[groups[key]] = shard
+        heapq.heappush(loads, (load + len(groups[key]), shard))
+    return shards
+
+
+def match_shards(shards, previous, num_shards):
+    '''Relabel shards to agree with previous shards as much as possible, so
+    rebalancing moves as few strands as it can.
+
+    :param shards: new shard index per strand
+    :param previous: current shard index per strand, -1 for new strands
+    :param num_shards: number of shards
+    :returns: relabeled shard index per strand
+    '''
+
+    shards = np.asarray(shards, dtype=np.int64)
+    previous = np.asarray(previous, dtype=np.int64)
+    known = previous >= 0
+    overlap = np.zeros((num_shards, num_shards), dtype=np.int64)
+    np.add.at(overlap, (shards[known], previous[known]), 1)
+
+    # Greedily pair the groups that share the most strands
+    labels = np.full(num_shards, -1, dtype=np.int64)
+    free = np.ones(num_shards, dtype=bool)
+    for flat in np.argsort(-overlap, axis=None, kind='mergesort'):
+        new, old = divmod(int(flat), num_shards)
+        if labels[new] < 0 and free[old]:
+            labels[new] = old
+            free[old] = False
+    return labels[shards]
+
+
+def shard_counts(shards, num_shards):
+    '''Number of strands in each shard'''
+
+    return np.bincount(np.asarray(shards, dtype=np.int64), minlength=num_shards)
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+'''
+smoothing
+=========
+Laplacian and Taubin smoothing of many curves at once, used by the
+smoothCurves plugin. Like mayakit.nurbs this module does not depend on Maya.
+
+Points of all curves live in one flat array with offsets, see
+mayakit.nurbs.PackedCurves. The neighbors of every point are looked up
+once, each iteration then moves every point of every curve in a single
+vectorized step.
+
+Laplacian smoothing moves each point towards the average of its neighbors
+and shrinks curves as it goes. Taubin smoothing follows every shrinking step
+with an inflating step, removing noise while keeping the overall shape.
+'''
+from __future__ import division
+
+import numpy as np
+
+from . import nurbs
+
+
+def neighbors(offsets, closed=None):
+    '''Indices of the previous and next point of every point.
+
+    The first and last point of open curves are their own previous and next
+    point.
+
+    :param offsets: offsets of each curve's points
+    :param closed: optional bool per curve, closed curves wrap around
+    :returns: previous indices, next indices
+    '''
+
+    offsets = np.asarray(offsets, dtype=np.int64)
+    counts = np.diff(offsets)
+    starts = np.repeat(offsets[:-1], counts)
+    ends = np.repeat(offsets[1:], counts)
+    index = np.arange(offsets[-1])
+    prev_ids = np.maximum(index - 1, starts)
+    next_ids = np.minimum(index + 1, ends - 1)
+
+    if closed is not None:
+        wrap = np.repeat(np.asarray(closed, dtype=bool), counts)
+        prev_ids = np.where(wrap & (index == starts), ends - 1, prev_ids)
+        next_ids = np.where(wrap & (index == ends - 1), starts, next_ids)
+    return prev_ids, next_ids
+
+
+def taubin_mu(factor, pass_band=0.1):
+    '''Inflating factor for Taubin smoothing
+
+    :param factor: shrinking factor
+    :param pass_band: frequency below which shapes are left alone
+    '''
+
+    return 1 / (pass_band - 1 / factor)
+
+
+def _chain(points, offsets, lengths):
+    '''Rebuild curves from their first points, keeping the direction of
+    every segment and setting its length
+    '''
+
+    counts = np.diff(offsets)
+    steps = np.zeros_like(points)
+    steps[1:] = nurbs.normalize(points[1:] - points[:-1]) * lengths[1:, None]
+    steps[offsets[:-1][counts > 0]] = 0
+    totals = np.cumsum(steps, axis=0)
+    starts = np.repeat(offsets[:-1], counts)
+    return points[starts] + totals - totals[starts]
+
+
+def smooth(points, offsets, iterations=1, factor=0.5, method='laplacian',
+           mu=None, pin_start=True, pin_end=True, preserve_length=False,
+           closed=None):
+    '''Smooth the points of many curves
+
+    :param points: (n, 3) points of all curves
+    :param offsets: offsets of each curve's points
+    :param iterations: number of smoothing steps, with Taubin smoothing each
+        step shrinks and inflates once
+    :param factor: how far to move points towards their neighbors per step
+    :param method: 'laplacian' or 'taubin'
+    :param mu: inflating factor for Taubin smoothing, see taubin_mu
+    :param pin_start: keep the first point of open curves in place
+    :param pin_end: keep the last point of open curves in place
+    :param preserve_length: restore the length of every segment of open
+        curves by rebuilding them from their first points, the last point
+        is no longer pinned. Closed curves are scaled about their center
+        to their original length instead.
+    :param closed: optional bool per curve, closed curves wrap around and
+        have no pinned points
+    :returns: (n, 3) smoothed points
+    '''
+
+    if method not in ('laplacian', 'taubin'):
+        raise ValueError('Unknown smoothing method: {}'.format(method))
+
+    points = np.array(points, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    counts = np.diff(offsets)
+    num_curves = len(counts)
+    if closed is None:
+        closed = np.zeros(num_curves, dtype=bool)
+    closed = np.asarray(closed, dtype=bool)
+    prev_ids, next_ids = neighbors(offsets, closed)
+
+    weights = np.ones(len(points))
+    open_starts = offsets[:-1][~closed & (counts > 0)]
+    open_ends = offsets[1:][~closed & (counts > 0)] - 1
+    if pin_start:
+        weights[open_starts] = 0
+    if pin_end:
+        weights[open_ends] = 0
+    weights = weights[:, None]
+
+    if preserve_length:
+        lengths = np.zeros(len(points))
+        lengths[1:] = np.linalg.norm(points[1:] - points[:-1], axis=1)
+        perimeters = _perimeters(points, offsets, next_ids)
+
+    # Neighbors are mostly the adjacent points, shift the whole array and
+    # only patch up the ends of curves
+    index = np.arange(len(points))
+    prev_fix = np.flatnonzero(prev_ids != index - 1)
+    next_fix = np.flatnonzero(next_ids != index + 1)
+    neighborhood = np.empty_like(points)
+    previous = np.empty_like(points)
+
+    factors = [factor]
+    if method == 'taubin':
+        factors.append(taubin_mu(factor) if mu is None else mu)
+    for _ in range(iterations):
+        for step in factors:
+            previous[1:] = points[:-1]
+            previous[prev_fix] = points[prev_ids[prev_fix]]
+            neighborhood[:-1] = points[1:]
+            neighborhood[next_fix] = points[next_ids[next_fix]]
+            neighborhood += previous
+            neighborhood *= 0.5
+            neighborhood -= points
+            neighborhood *= weights * step
+            points += neighborhood
+
+    if preserve_length:
+        ids = np.repeat(np.arange(num_curves), counts)
+        wrap = closed[ids]
+        points[~wrap] = _chain(points, offsets, lengths)[~wrap]
+        if wrap.any():
+            scales = np.divide(
+                perimeters,
+                _perimeters(points, offsets, next_ids),
+                out=np.ones(num_curves),
+                where=perimeters != 0
+            )
+            sums = np.zeros((num_curves, points.shape[1]))
+            np.add.at(sums, ids, points)
+            centers = sums / np.maximum(counts, 1)[:, None]
+            points[wrap] = (
+                centers[ids][wrap] +
+                (points[wrap] - centers[ids][wrap]) * scales[ids][wrap, None]
+            )
+    return points
+
+
+def _perimeters(points, offsets, next_ids):
+    '''Total length of each closed curve'''
+
+    counts = np.diff(offsets)
+    lengths = np.linalg.norm(points[next_ids] - points, axis=1)
+    return np.bincount(
+        np.repeat(np.arange(len(counts)), counts),
+        lengths,
+        minlength=len(counts)
+    )
+
+
+def smooth_packed(packed, **kwargs):
+    '''Smooth the cvs of a PackedCurves, see smooth
+
+    Periodic curves are smoothed as closed curves and their overlapping cvs
+    are kept in sync.
+
+    :returns: PackedCurves with smoothed cvs
+    '''
+
+    counts = np.diff(packed.cv_offsets)
+    periodic = packed.forms == 3
+    distinct_counts = counts - np.where(periodic, packed.degrees, 0)
+    distinct_offsets = nurbs.offsets(distinct_counts)
+
+    curve_ids = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(len(packed.cvs)) - packed.cv_offsets[curve_ids]
+    distinct = local < distinct_counts[curve_ids]
+    source = distinct_offsets[curve_ids] + (
+        local % np.maximum(distinct_counts[curve_ids], 1)
+    )
+
+    smoothed = smooth(
+        packed.cvs[distinct],
+        distinct_offsets,
+        closed=periodic,
+        **kwargs
+    )
+    return packed._replace(cvs=smoothed[source])
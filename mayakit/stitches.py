@@ -1,94 +1,110 @@
 # -*- coding: utf-8 -*-
 from maya import cmds
-from maya.api.OpenMaya import MVector
-from math import pi, sin, cos, sqrt
-from functools import partial
+from maya.api.OpenMaya import MVector, MPoint, MSpace, MFnNurbsCurve
+import numpy as np
+
+from . import closest, curveio, stitching
+from .ctxmanagers import undo_chunk
+from .plugins import safe_load
+from .interpolation import (
+    cool,
+    graph_points,
+    hermite,
+    inverse_square,
+    invhermite,
+    lerp,
+    smoothstep,
+)
 
 
 def get_curve_info(curve):
 
-    spans = cmds.getAttr(curve + '.spans')
-    degree = cmds.getAttr(curve + '.degree')
-    form = cmds.getAttr(curve + '.form')
-    cvs = spans + degree
-    return cvs, spans, degree, form
+    curve_fn = curveio.curve_fns([curve])[0]
+    return curve_fn.numCVs, curve_fn.numSpans, curve_fn.degree, curve_fn.form
 
 
-def average_curves(*curves):
+def average_curves(*curves, **kwargs):
+    '''Get the weighted average of the cvs of curves.
 
-    cvs, spans, degree, form = get_curve_info(curves[0])
-    points = [cmds.getAttr(curve + '.cv[*]') for curve in curves]
-    if not all(len(points[0]) == len(curve_points) for curve_points in points):
-        raise Exception('Input curves need to have the same number of cvs')
-
-    averaged = [[0, 0, 0] for i in range(len(points[0]))]
-    for curve_points in points:
-        for point in curve_points:
-            averaged[0] += point[0]
-            averaged[1] += point[1]
-            averaged[2] += point[2]
-    averaged = [pnt / len(points) for pnt in averaged]
-    return averaged
-
-
-def conform_curve(source, destination):
-
-    point_on_curve = cmds.createNode('nearestPointOnCurve')
-    cmds.connectAttr(destination + '.worldSpace', point_on_curve + '.inputCurve')
+    :param curves: curves with the same number of cvs
+    :param weights: optional weight per curve, defaults to equal weights
+    :returns: (num_cvs, 3) array of averaged cvs
+    '''
 
-    for i, point in enumerate(cmds.getAttr(source + '.cv[*]')):
-        cmds.setAttr(point_on_curve + '.inPosition', point[0], point[1], point[2])
-        result_point = cmds.getAttr(point_on_curve + '.result.position')[0]
-        cmds.setAttr('{}.cv[{}]'.format(source, i), result_point[0], result_point[1], result_point[2])
-    cmds.delete(point_on_curve)
+    weights = kwargs.pop('weights', None)
 
+    points, offsets = curveio.read_points(curves)
+    counts = np.diff(offsets)
+    if np.any(counts != counts[0]):
+        raise Exception('Input curves need to have the same number of cvs')
 
-def cool(t):
-    return sin(t * pi * 0.5)
+    if weights is not None and len(weights) != len(curves):
+        raise Exception('Need one weight per curve')
+    points = points.reshape(len(curves), counts[0], 3)
+    return np.average(points, axis=0, weights=weights)
 
 
-def inverse_square(t):
-    try:
-        return 1.0 / t
-    except ZeroDivisionError:
-        return 1.0
+def average_curves_into(curves, target=None, weights=None):
+    '''Average curves and write the result into a curve.
 
+    The cvs are set with a single undoable setAttr by curveio.write_points,
+    a new target and its cvs are undone in one step.
 
-def lerp(a, b, t):
+    :param curves: curves with the same number of cvs
+    :param target: existing curve to set the cvs of, defaults to a new
+        duplicate of the first curve
+    :param weights: optional weight per curve
+    :returns: name of target
     '''
-    Linear Interpolate between two values
-    '''
-
-    return a * (1.0 - t) + b * t
-
-
-def hermite(t):
-    return t * t * t * (t * (t * 6 - 15) + 10)
 
+    points = average_curves(*curves, weights=weights)
+    with undo_chunk():
+        if target is None:
+            target = cmds.duplicate(curves[0], name='averageCurve#')[0]
+        curveio.write_points([target], points, [0, len(points)])
+    return target
 
-def invhermite(t):
-    return t + (t - hermite(t))
 
+def conform_curve(source, destination):
+    '''Move the cvs of source to the closest points on destination.
 
-def smoothstep(a, b, t):
-    '''
-    Hermite interpolation between two values
+    All cvs are queried at once using mayakit.closest and written back with
+    a single undoable setAttr.
     '''
 
-    real_t = t * t * t * (t * (t * 6 - 15) + 10)
-    return lerp(a, b, real_t)
+    cvs, knots, degree, form = curveio.read_curve(destination, MSpace.kWorld)
+    bvh = closest.CurveBVH(
+        cvs,
+        knots,
+        degree,
+        periodic=form == MFnNurbsCurve.kPeriodic
+    )
+
+    points, _ = curveio.read_points([source], MSpace.kWorld)
+    _, positions = bvh.closest(points)
+
+    path = curveio.curve_paths([source])[0]
+    inverse = path.inclusiveMatrixInverse()
+    values = []
+    for position in positions.tolist():
+        point = MPoint(position) * inverse
+        values.extend((point.x, point.y, point.z))
+    cmds.setAttr(
+        '{}.controlPoints[0:{}]'.format(path.fullPathName(), len(positions) - 1),
+        *values
+    )
 
 
 def graph(fn, params, scale=10, offset=(0, 0, 0)):
-    '''Graph fn for the provided params'''
+    '''Graph fn for the provided params
 
-    points = []
-    for t in params:
-        x = t * scale + offset[0]
-        y = fn(t) * scale + offset[1]
-        points.append((x, y, offset[2]))
+    :param fn: kernel taking an array of params, like the kernels in
+        mayakit.interpolation. Scalar functions are called once per param.
+    :returns: name of the graph curve
+    '''
 
-    cmds.curve(point=points)
+    points = graph_points(fn, params, scale, offset)
+    return cmds.curve(point=points.tolist())
 
 
 def tangent_at_parameter(curve, t):
@@ -108,52 +124,34 @@ def point_at_parameter(curve, t):
     return cmds.pointPosition('{}.u[{}]'.format(curve, t))
 
 
-def stitch_curves(curve_a, curve_b, stitches, stitch_points, u_offset=0,
-                  tangent_offset=0, normal_fn=None):
-
-    if not normal_fn:
-        normal_fn = partial(lofted_normal, curve_a, curve_b)
-
-    stitch_step = 1.0 / (stitches * 2)
-    stitch_blend_step = 1.0 / (stitch_points)
-
-    points = []
-
-    a_point = MVector(*point_at_parameter(curve_a, u_offset))
-    a_normal = normal_fn(a_point)
-    a_tangent = MVector(*tangent_at_parameter(curve_a, u_offset))
-
-    for i in range(stitches * 2):
+def get_curve(curve):
+    '''Get the world space cvs, knots and degree of a curve'''
 
-        u = ((stitch_step * (i + 1)) + u_offset) % 1
-        tangent_offset *= -1
+    return curveio.read_curve(curve, MSpace.kWorld)[:3]
 
-        if i % 2: # curve_a for odd steps
-            b_point = MVector(*point_at_parameter(curve_a, u))
-            b_tangent = MVector(*tangent_at_parameter(curve_a, u))
-            b_normal = normal_fn(b_point)
-        else: # curve_b for even steps
-            b_point = MVector(*point_at_parameter(curve_b, u))
-            b_tangent = MVector(*tangent_at_parameter(curve_b, u))
-            b_normal = normal_fn(b_point)
 
-        for j in range(stitch_points):
-
-            t = j * stitch_blend_step
-            normal = lerp(a_normal, b_normal, t)
-            tangent = lerp(a_tangent, b_tangent, t)
+def stitch_curves(curve_a, curve_b, stitches, stitch_points, u_offset=0,
+                  tangent_offset=0, normal_fn=None):
+    '''Compute the points of a stitch between two curves.
 
-            j_point = lerp(a_point, b_point, t)
-            j_normal = normal * (t - hermite(t))
-            j_tangent = tangent * tangent_offset * sin(t * pi)
+    See mayakit.stitching.stitch_points, normal_fn may follow the vectorized
+    protocol or take and return single MVectors.
 
-            points.append(j_point + j_normal + j_tangent)
+    :returns: (n, 3) array of points
+    '''
 
-        a_point = b_point
-        a_normal = b_normal
-        a_tangent = b_tangent
+    if normal_fn and not stitching.is_vectorized(normal_fn):
+        normal_fn = stitching.per_point(normal_fn, MVector)
 
-    return points
+    return stitching.stitch_points(
+        get_curve(curve_a),
+        get_curve(curve_b),
+        stitches,
+        stitch_points,
+        u_offset,
+        tangent_offset,
+        normal_fn
+    )
 
 
 def cross_stitch(stitches=108, stitch_points=8, u_offset=0, tangent_offset=0, normal_fn=None):
@@ -162,16 +160,40 @@ def cross_stitch(stitches=108, stitch_points=8, u_offset=0, tangent_offset=0, no
     a, b = cmds.ls(sl=True, dag=True, leaf=True)
 
     if not normal_fn:
-        normal_fn = partial(sphere_normal, center=MVector(0, 0, 0))
-
-    half_stitches = int(stitches * 0.5)
-    u_offset_a = u_offset
-    u_offset_b = u_offset + 1.0 / (half_stitches * 2)
-    a0, a1 = MVector(*point_at_parameter(a, 0)), MVector(*point_at_parameter(a, u_offset_b))
-    tangent_offset += (a0-a1).length() * 0.3
+        normal_fn = stitching.sphere_normals(center=(0, 0, 0))
+    elif not stitching.is_vectorized(normal_fn):
+        normal_fn = stitching.per_point(normal_fn, MVector)
+
+    for points in stitching.cross_stitch_points(
+            get_curve(a),
+            get_curve(b),
+            stitches,
+            stitch_points,
+            u_offset,
+            tangent_offset,
+            normal_fn):
+        cmds.curve(point=points.tolist())
+
+
+def live_cross_stitch(**attrs):
+    '''Create a stitchCurves node cross stitching the two selected curves.
+
+    :param attrs: values of the node's attributes like stitches=54
+    :returns: stitchCurves node and the two stitch curves
+    '''
 
-    points = stitch_curves(a, b, half_stitches, stitch_points, u_offset_a, tangent_offset, normal_fn)
-    cmds.curve(point=points)
+    safe_load('stitchCurves')
 
-    points = stitch_curves(a, b, half_stitches, stitch_points, u_offset_b, tangent_offset, normal_fn)
-    cmds.curve(point=points)
+    a, b = cmds.ls(sl=True, dag=True, leaf=True)
+    node = cmds.createNode('stitchCurves')
+    cmds.connectAttr(a + '.worldSpace[0]', node + '.curveA')
+    cmds.connectAttr(b + '.worldSpace[0]', node + '.curveB')
+    for attr, value in attrs.items():
+        cmds.setAttr(node + '.' + attr, value)
+
+    curves = []
+    for i in range(2):
+        shape = cmds.createNode('nurbsCurve')
+        cmds.connectAttr('{}.outputCurve[{}]'.format(node, i), shape + '.create')
+        curves.append(cmds.listRelatives(shape, parent=True)[0])
+    return node, curves
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+'''
+stitching
+=========
+Vectorized stitch generation between two curves, used by mayakit.stitches
+and the stitchCurves plugin. Like mayakit.nurbs this module does not depend
+on Maya.
+
+Curves are given either as (cvs, knots, degree) tuples or as
+mayakit.nurbs.CurveTable instances. Stitch parameters range from 0 to 1
+over each curve's domain and wrap around.
+
+A normal_fn takes an (n, 3) array of points on the curves and returns an
+(n, 3) array of normals. Functions that take and return a single MVector
+are still supported, wrap them with per_point or let
+mayakit.stitches.stitch_curves do it for you.
+'''
+from __future__ import division
+
+import numpy as np
+
+from . import nurbs
+from .interpolation import hermite
+
+
+def vectorized(fn):
+    '''Mark fn as following the vectorized normal_fn protocol'''
+
+    fn.vectorized = True
+    return fn
+
+
+def is_vectorized(fn):
+    '''Does fn follow the vectorized normal_fn protocol'''
+
+    return getattr(fn, 'vectorized', False)
+
+
+def per_point(fn, vector_typ):
+    '''Wrap a normal_fn that takes and returns single vectors
+
+    :param fn: callable taking and returning one vector
+    :param vector_typ: type to pass points as, like MVector
+    '''
+
+    @vectorized
+    def normal_fn(points):
+        return np.array([
+            list(fn(vector_typ(*point))) for point in points.tolist()
+        ], dtype=np.float64).reshape(-1, 3)
+    return normal_fn
+
+
+def sphere_normals(center=(0, 0, 0)):
+    '''normal_fn pointing away from center'''
+
+    center = np.asarray(center, dtype=np.float64)
+
+    @vectorized
+    def normal_fn(points):
+        return nurbs.normalize(points - center)
+    return normal_fn
+
+
+def sample(curve, u):
+    '''Positions and unit tangents of a curve at normalized parameters
+
+    :param curve: (cvs, knots, degree) or CurveTable
+    :param u: parameters from 0 to 1 over the curve's domain
+    '''
+
+    u = np.asarray(u, dtype=np.float64)
+    if isinstance(curve, nurbs.CurveTable):
+        umin, umax = curve.params[0], curve.params[-1]
+        points, derivs = curve.evaluate(umin + (umax - umin) * u)
+    else:
+        cvs, knots, degree = curve
+        umin, umax = nurbs.domain(knots, degree)
+        points, derivs = nurbs.evaluate(cvs, knots, degree, umin + (umax - umin) * u)
+    return points, nurbs.normalize(derivs)
+
+
+def lofted_normals(points_a, tangents_a, points_b, tangents_b):
+    '''Normals of the surface lofted between two curves sampled at the same
+    parameters
+
+    :returns: normals at the samples of curve a and at the samples of curve b
+    '''
+
+    across = points_b - points_a
+    return (
+        nurbs.normalize(np.cross(across, tangents_a)),
+        nurbs.normalize(np.cross(across, tangents_b))
+    )
+
+
+def stitch_points(curve_a, curve_b, stitches, points_per_stitch, u_offset=0,
+                  tangent_offset=0, normal_fn=None):
+    '''Compute the points of a stitch zig zagging between two curves.
+
+    The stitch passes through 2 * stitches + 1 nodes alternating between
+    curve_a and curve_b, starting on curve_a at u_offset. Between each pair
+    of nodes points_per_stitch points are blended, pushed along the normals
+    and alternately along and against the tangents by tangent_offset.
+
+    :param curve_a: (cvs, knots, degree) or CurveTable
+    :param curve_b: (cvs, knots, degree) or CurveTable
+    :param stitches: number of stitches
+    :param points_per_stitch: number of points between two nodes
+    :param u_offset: parameter of the first node
+    :param tangent_offset: distance to push points along the tangents
+    :param normal_fn: vectorized callable returning normals for points,
+        defaults to the normals of the surface lofted between the curves
+    :returns: (2 * stitches * points_per_stitch, 3) array of points
+    '''
+
+    num_nodes = stitches * 2 + 1
+    steps = np.arange(num_nodes) / (stitches * 2)
+    u = np.where(steps > 0, (steps + u_offset) % 1, u_offset)
+    on_b = np.arange(num_nodes) % 2 == 1
+
+    # Sample both curves at every node, the curve a node is not on is only
+    # needed by the default normal_fn
+    points_a, tangents_a = sample(curve_a, u)
+    points_b, tangents_b = sample(curve_b, u)
+    points = np.where(on_b[:, None], points_b, points_a)
+    tangents = np.where(on_b[:, None], tangents_b, tangents_a)
+    if normal_fn is None:
+        normals_a, normals_b = lofted_normals(
+            points_a, tangents_a, points_b, tangents_b
+        )
+        normals = np.where(on_b[:, None], normals_b, normals_a)
+    else:
+        normals = np.asarray(normal_fn(points), dtype=np.float64)
+
+    # Blend between each pair of nodes, all pairs at once
+    t = (np.arange(points_per_stitch) / points_per_stitch)[None, :, None]
+    signs = np.where(np.arange(num_nodes - 1) % 2, 1.0, -1.0)[:, None, None]
+
+    def blend(values):
+        return values[:-1, None] * (1 - t) + values[1:, None] * t
+
+    blended = (
+        blend(points) +
+        blend(normals) * (t - hermite(t)) +
+        blend(tangents) * (signs * tangent_offset) * np.sin(t * np.pi)
+    )
+    return blended.reshape(-1, 3)
+
+
+def cross_stitch_points(curve_a, curve_b, stitches=108, points_per_stitch=8,
+                        u_offset=0, tangent_offset=0, normal_fn=None):
+    '''Compute the two stitches of a cross stitch between two curves.
+
+    The second stitch is offset by half a stitch so the two cross. Both
+    stitches are pushed along their tangents by an extra 30% of the distance
+    between stitch nodes.
+
+    :returns: points of the first and second stitch
+    '''
+
+    half_stitches = int(stitches * 0.5)
+    u_offset_b = u_offset + 1.0 / (half_stitches * 2)
+    ends, _ = sample(curve_a, [0, u_offset_b % 1])
+    tangent_offset += np.linalg.norm(ends[0] - ends[1]) * 0.3
+
+    return tuple(
+        stitch_points(
+            curve_a,
+            curve_b,
+            half_stitches,
+            points_per_stitch,
+            offset,
+            tangent_offset,
+            normal_fn
+        )
+        for offset in (u_offset, u_offset_b)
+    )
@@ -4,11 +4,19 @@ strands
 =======
 Easy strands library
 '''
-from __future__ import division
+from __future__ import division, print_function
 import maya.api.OpenMaya as om
 from maya import cmds
+import numpy as np
+import os
+import shutil
 import uuid
-from . import tags
+from functools import partial
+from . import tags, curveio, knotvectors, modifiers, sharding, framecache
+from .ctxmanagers import undo_chunk, restore_time
+from .plugins import safe_load
+from .registry import get_registry
+from .interpolation import lerp, linspace
 
 
 def set_color(obj, *color):
@@ -23,25 +31,26 @@ def set_default_color(obj):
     cmds.color(obj)
 
 
+def tag(obj, **values):
+    '''Add tags to obj, the strands registry is notified by tags.add'''
+
+    tags.add(obj, **values)
+
+
 def get_active_nucleus():
-    nuclei = tags.search(strands_nucleus='active')
-    if nuclei:
-        return nuclei[0]
+    return get_registry().active('nucleus')
 
 
 def set_active_nucleus(nucleus):
-    nuclei = tags.search(strands_nucleus='active')
-    for _nucleus in nuclei:
-        tags.add(_nucleus, strands_nucleus='inactive')
+    for _nucleus in get_registry().all_active('nucleus'):
+        tag(_nucleus, strands_nucleus='inactive')
         set_default_color(_nucleus)
-    tags.add(nucleus, strands_nucleus='active')
+    tag(nucleus, strands_nucleus='active')
     set_color(nucleus, 1.0, 1.0, 0.0)
 
 
 def get_active_hairsystem():
-    hair_systems = tags.search(strands_hairsystem='active')
-    if hair_systems:
-        return hair_systems[0]
+    return get_registry().active('hairsystem')
 
 
 def get_hairsystem_grp(hair_system):
@@ -52,20 +61,20 @@ def get_hairsystem_grp(hair_system):
 
 
 def get_strands_grp(hair_system):
-    groups = tags.search(hair_system=tags.query(hair_system, '_id'))
-    if groups:
-        return groups[0]
+    registry = get_registry()
+    hair_id = registry.tags(hair_system).get('_id')
+    if hair_id:
+        return registry.group(hair_id)
 
 
 def set_active_hairsystem(hair_system):
-    hair_systems = tags.search(strands_hairsystem='active')
-    for _hair_system in hair_systems:
-        tags.add(_hair_system, strands_hairsystem='inactive')
+    for _hair_system in get_registry().all_active('hairsystem'):
+        tag(_hair_system, strands_hairsystem='inactive')
         set_default_color(cmds.listRelatives(_hair_system, parent=True)[0])
         strands_grp = get_strands_grp(_hair_system)
         set_default_color(strands_grp)
 
-    tags.add(hair_system, strands_hairsystem='active')
+    tag(hair_system, strands_hairsystem='active')
     set_color(cmds.listRelatives(hair_system, parent=True)[0], 1.0, 1.0, 0.0)
     strands_grp = get_strands_grp(hair_system)
     set_color(strands_grp, 1.0, 1.0, 0.0)
@@ -123,7 +132,7 @@ def create_strands_system(name='strands', activate=True):
 
     nucleus = create_nucleus(name + '_nucleus#')
     nucleus_id = uuid.uuid4()
-    tags.add(nucleus, _id=nucleus_id)
+    tag(nucleus, _id=nucleus_id)
     cmds.group(nucleus, name=name + '_root#')
     create_strands_hair_system(name, nucleus, activate)
 
@@ -142,9 +151,9 @@ def create_strands_hair_system(name='strands', nucleus=None, activate=True):
     cmds.setAttr(hair_system + '.damp', 0.002)
     cmds.setAttr(hair_system + '.restLengthScale', 0.5)
     hair_id = uuid.uuid4()
-    tags.add(hair_system, _id=hair_id)
+    tag(hair_system, _id=hair_id)
     strands_grp = cmds.group(name=name + '_controls#')
-    tags.add(strands_grp, hair_system=hair_id)
+    tag(strands_grp, hair_system=hair_id)
 
     if activate:
         set_active_hairsystem(hair_system)
@@ -198,50 +207,21 @@ def create_strand(hair_system=None):
     if strands_grp:
         cmds.parent(root_grp, strands_grp)
 
-    follicle_nodes, out_curve_nodes = add_curve_to_system(
-        curve_shape,
-        hair_system
-    )
+    if len(get_shards(hair_system)) > 1:
+        follicle_nodes, out_curve_nodes = add_curves_to_shards(
+            [curve_shape],
+            hair_system
+        )[0]
+    else:
+        follicle_nodes, out_curve_nodes = add_curve_to_system(
+            curve_shape,
+            hair_system
+        )
     cmds.setAttr(follicle_nodes[1] + '.pointLock', 3)
     cmds.setAttr(follicle_nodes[1] + '.sampleDensity', 96)
     cmds.parent(curve, follicle_nodes[0])
 
 
-def linspace(tmin, tmax, n):
-    '''Clone of numpy.linspace
-
-    :param tmin: Minimum value
-    :param tmax: Maximum value
-    :param n: Steps between tmin and tmax
-    '''
-
-    output = []
-    spread = tmax - tmin
-    step = spread / (n - 1)
-    for i in range(n):
-        output.append(tmin + step * i)
-    return output
-
-
-def compute_knots(num_points, degree, array_typ=list):
-    '''Compute knots for the given number of points
-
-    :param num_points: number of points along curve
-    :param degree: degree of curve
-    :param array_typ: Type of array to return
-    '''
-
-    num_knots = num_points + degree - 1
-    knots = array_typ()
-    for i in range(degree):
-        knots.append(0)
-    for i in range(num_knots - degree * 2):
-        knots.append(i + 1)
-    for j in range(degree):
-        knots.append(i + 2)  # exploit leaked reference
-    return knots
-
-
 def curve_between(a, b, num_points=24, degree=3, name='curve#'):
     '''Create a nurbsCurve between two MVectors
 
@@ -251,12 +231,8 @@ def curve_between(a, b, num_points=24, degree=3, name='curve#'):
     :param degree: degree of curve
     '''
 
-    v = b - a
-
-    cvs = []
-    for t in linspace(0, 1, num_points):
-        cvs.append(a + v * t)
-    knots = compute_knots(num_points, degree)
+    cvs = lerp(a, b, linspace(0, 1, num_points)[:, None]).tolist()
+    knots = knotvectors.uniform(num_points, degree, array_typ=list)
 
     curve = cmds.curve(point=cvs, degree=degree, knot=knots)
     curve = cmds.rename(curve, name)
@@ -307,26 +283,154 @@ def curve_to_hair(curve_shape, hair_system):
 
 def add_curve_to_system(curve_shape, hair_system=None):
 
-    hair_system = hair_system or get_active_hairsystem()
+    return add_curves_to_system([curve_shape], hair_system)[0]
+
+
+def _node(name):
+    sel = om.MSelectionList()
+    sel.add(name)
+    return sel.getDependNode(0)
+
+
+def _name(node):
+    return om.MFnDagNode(node).partialPathName()
+
+
+def _next_hair_index(hair_system):
+    plug = om.MFnDependencyNode(_node(hair_system)).findPlug('inputHair', False)
+    indices = plug.getExistingArrayAttributeIndices()
+    return max(indices) + 1 if len(indices) else 0
+
+
+def plan_hair_curves(curve_shapes, hair_system):
+    '''Resolve everything needed to attach curves to a hairSystem up front
+
+    :param curve_shapes: nurbsCurve shapes or their transforms
+    :param hair_system: hairSystem shape
+    :returns: dict passed to build_hair_curves
+    '''
+
     hair_system_grp = get_hairsystem_grp(hair_system)
     basename = hair_system.replace('Shape', '')
+    groups = []
+    for suffix in ('Follicles', 'OutputCurves'):
+        name = basename + suffix
+        existing = cmds.ls(name, long=True)
+        groups.append((name, existing[0] if existing else None))
+
+    curves = []
+    for path in curveio.curve_paths(curve_shapes):
+        xform_path = om.MDagPath(path)
+        xform_path.pop()
+        curves.append((
+            xform_path.node(),
+            path.node(),
+            xform_path.partialPathName().split('|')[-1],
+        ))
+
+    start = _next_hair_index(hair_system)
+    return {
+        'hair_system': _node(hair_system),
+        'hair_system_grp': (
+            _node(hair_system_grp) if hair_system_grp else om.MObject.kNullObj
+        ),
+        'groups': groups,
+        'curves': curves,
+        'indices': list(range(start, start + len(curves))),
+    }
+
+
+def build_hair_curves(plan, modifier):
+    '''Create and connect a follicle and output curve per planned curve
+
+    Nodes are created, then connected, each batch applied with a single
+    doIt of modifier.
+
+    :param plan: dict returned by plan_hair_curves
+    :param modifier: MDagModifier
+    :returns: [[follicle, follicle_shape], [out_curve, out_curve_shape]]
+        per curve
+    '''
 
-    follicle_nodes, out_curve_nodes = curve_to_hair(curve_shape, hair_system)
-    follicles_grp = basename + 'Follicles'
-    if not cmds.objExists(follicles_grp):
-        cmds.group(empty=True, name=follicles_grp)
-        if hair_system_grp:
-            cmds.parent(follicles_grp, hair_system_grp)
-    cmds.parent(follicle_nodes[0], follicles_grp)
-
-    outcurves_grp = basename + 'OutputCurves'
-    if not cmds.objExists(outcurves_grp):
-        cmds.group(empty=True, name=outcurves_grp)
-        if hair_system_grp:
-            cmds.parent(outcurves_grp, hair_system_grp)
-    cmds.parent(out_curve_nodes[0], outcurves_grp)
+    # Find or create the groups
+    group_nodes = []
+    for name, existing in plan['groups']:
+        if existing:
+            group_nodes.append(_node(existing))
+            continue
+        group = modifier.createNode('transform', plan['hair_system_grp'])
+        modifier.renameNode(group, name)
+        group_nodes.append(group)
+    modifier.doIt()
+    follicles_grp, outcurves_grp = group_nodes
+
+    # Create follicles and output curves
+    created = []
+    for _, _, curve_name in plan['curves']:
+        follicle = modifier.createNode('transform', follicles_grp)
+        follicle_shape = modifier.createNode('follicle', follicle)
+        modifier.renameNode(follicle, curve_name + '_follicle1')
+        modifier.renameNode(follicle_shape, curve_name + '_follicleShape1')
+        out_curve = modifier.createNode('transform', outcurves_grp)
+        out_curve_shape = modifier.createNode('nurbsCurve', out_curve)
+        modifier.renameNode(out_curve, curve_name + '_out1')
+        modifier.renameNode(out_curve_shape, curve_name + '_outShape1')
+        created.append((follicle, follicle_shape, out_curve, out_curve_shape))
+    modifier.doIt()
+
+    # Connect everything
+    hair_fn = om.MFnDependencyNode(plan['hair_system'])
+    input_hair = hair_fn.findPlug('inputHair', False)
+    output_hair = hair_fn.findPlug('outputHair', False)
+    for (xform, shape, _), index, nodes in zip(plan['curves'], plan['indices'], created):
+        follicle, follicle_shape, out_curve, out_curve_shape = nodes
+        xform_fn = om.MFnDependencyNode(xform)
+        shape_fn = om.MFnDependencyNode(shape)
+        follicle_fn = om.MFnDependencyNode(follicle_shape)
+        out_curve_fn = om.MFnDependencyNode(out_curve_shape)
+        modifier.connect(
+            xform_fn.findPlug('worldMatrix', False).elementByLogicalIndex(0),
+            follicle_fn.findPlug('startPositionMatrix', False)
+        )
+        modifier.connect(
+            shape_fn.findPlug('local', False),
+            follicle_fn.findPlug('startPosition', False)
+        )
+        modifier.connect(
+            follicle_fn.findPlug('outCurve', False),
+            out_curve_fn.findPlug('create', False)
+        )
+        modifier.connect(
+            follicle_fn.findPlug('outHair', False),
+            input_hair.elementByLogicalIndex(index)
+        )
+        modifier.connect(
+            output_hair.elementByLogicalIndex(index),
+            follicle_fn.findPlug('currentPosition', False)
+        )
+    modifier.doIt()
+
+    return [
+        [[_name(follicle), _name(follicle_shape)], [_name(out_curve), _name(out_curve_shape)]]
+        for follicle, follicle_shape, out_curve, out_curve_shape in created
+    ]
+
+
+def add_curves_to_system(curve_shapes, hair_system=None):
+    '''Attach many curves to a hairSystem as one undoable step
+
+    Every follicle, output curve and connection is planned up front and
+    applied through a single MDagModifier.
+
+    :param curve_shapes: nurbsCurve shapes or their transforms
+    :param hair_system: hairSystem shape, defaults to the active one
+    :returns: [[follicle, follicle_shape], [out_curve, out_curve_shape]]
+        per curve
+    '''
 
-    return follicle_nodes, out_curve_nodes
+    hair_system = hair_system or get_active_hairsystem()
+    plan = plan_hair_curves(curve_shapes, hair_system)
+    return modifiers.run(partial(build_hair_curves, plan))
 
 
 def add_curves_to_hair_system():
@@ -342,8 +446,548 @@ def add_curves_to_hair_system():
         cmds.warning(hair_system + ' is not a hairSystem.')
         return
 
-    for curve in curves:
-        add_curve_to_system(curve, hair_system)
+    if len(get_shards(hair_system)) > 1:
+        add_curves_to_shards(curves, hair_system)
+    else:
+        add_curves_to_system(curves, hair_system)
+
+
+def get_shards(hair_system):
+    '''Get the hairSystems a hairSystem's follicles are sharded across,
+    starting with hair_system itself
+    '''
+
+    shard_ids = tags.get(hair_system, 'strands_shards', '')
+    if not shard_ids:
+        return [hair_system]
+
+    registry = get_registry()
+    shards = [registry.by_id(shard_id) for shard_id in shard_ids.split(',')]
+    return [shard for shard in shards if shard]
+
+
+def _copy_attrs(source, target):
+    '''Copy the keyable scalar attributes of source to target'''
+
+    for attr in cmds.listAttr(source, keyable=True, scalar=True) or []:
+        try:
+            cmds.setAttr(target + '.' + attr, cmds.getAttr(source + '.' + attr))
+        except (RuntimeError, ValueError):
+            # Locked, connected or compound attributes
+            pass
+
+
+def _copy_passive(source, target):
+    '''Connect the passive colliders of nucleus source to nucleus target'''
+
+    fn = om.MFnDependencyNode(_node(source))
+    for attr in ('inputPassive', 'inputPassiveStart'):
+        plug = fn.findPlug(attr, False)
+        for index in plug.getExistingArrayAttributeIndices():
+            sources = plug.elementByLogicalIndex(index).connectedTo(True, False)
+            if sources:
+                cmds.connectAttr(
+                    sources[0].name(),
+                    '{}.{}[{}]'.format(target, attr, index)
+                )
+
+
+def create_shards(hair_system=None, num_shards=4):
+    '''Shard a hairSystem into num_shards hairSystems, each on its own
+    nucleus.
+
+    A nucleus solves its hairSystems one after another, so every shard gets
+    a nucleus of its own that the evaluation manager can solve in parallel
+    with the others. New nuclei copy the keyable attributes and passive
+    colliders of the nucleus of hair_system, new hairSystems copy the
+    keyable attributes of hair_system. Shards can not collide with each
+    other. Use rebalance_shards to spread existing follicles over new
+    shards.
+
+    :param hair_system: hairSystem shape, defaults to the active one
+    :param num_shards: total number of hairSystems including hair_system
+    :returns: all shards
+    '''
+
+    hair_system = hair_system or get_active_hairsystem()
+    shards = get_shards(hair_system)
+    nucleus = cmds.listConnections(hair_system, type='nucleus')[0]
+    xform = cmds.listRelatives(hair_system, parent=True)[0]
+    group = get_hairsystem_grp(hair_system)
+
+    with undo_chunk():
+        if not tags.get(hair_system, '_id', None):
+            tag(hair_system, _id=uuid.uuid4())
+
+        for _ in range(len(shards), num_shards):
+            shard_nucleus = create_nucleus(nucleus + '_shard#')
+            _copy_attrs(nucleus, shard_nucleus)
+            _copy_passive(nucleus, shard_nucleus)
+            shard = create_hair_system(xform + '_shard#', shard_nucleus)
+            _copy_attrs(hair_system, shard)
+            tag(shard, _id=uuid.uuid4())
+            if group:
+                cmds.parent(
+                    [shard_nucleus, cmds.listRelatives(shard, parent=True)[0]],
+                    group
+                )
+            shards.append(shard)
+
+        tag(hair_system, strands_shards=','.join(
+            tags.get(shard, '_id') for shard in shards
+        ))
+    return shards
+
+
+def _follicles(hair_system):
+    '''Get the inputHair index and follicle of each of a hairSystem's
+    follicles
+    '''
+
+    plug = om.MFnDependencyNode(_node(hair_system)).findPlug('inputHair', False)
+    follicles = []
+    for index in plug.getExistingArrayAttributeIndices():
+        sources = plug.elementByLogicalIndex(index).connectedTo(True, False)
+        if sources:
+            follicles.append((index, sources[0].node()))
+    return follicles
+
+
+def _follicle_curve(follicle):
+    '''Get the name of a follicle's input curve'''
+
+    plug = om.MFnDependencyNode(follicle).findPlug('startPosition', False)
+    sources = plug.connectedTo(True, False)
+    if sources:
+        return _name(sources[0].node())
+
+
+def _follicle_root(follicle):
+    '''Get the world space root of a follicle's input curve'''
+
+    fn = om.MFnDependencyNode(follicle)
+    try:
+        curve = fn.findPlug('startPosition', False).asMObject()
+        matrix = om.MFnMatrixData(
+            fn.findPlug('startPositionMatrix', False).asMObject()
+        ).matrix()
+        root = om.MFnNurbsCurve(curve).cvPosition(0) * matrix
+    except RuntimeError:
+        return (0.0, 0.0, 0.0)
+    return (root.x, root.y, root.z)
+
+
+def _shard_follicles(shards):
+    '''Get the follicles of all shards with their shard, inputHair index,
+    root and input curve
+    '''
+
+    follicles = []
+    for label, shard in enumerate(shards):
+        for index, follicle in _follicles(shard):
+            follicles.append((
+                label,
+                index,
+                follicle,
+                _follicle_root(follicle),
+                _follicle_curve(follicle),
+            ))
+    return follicles
+
+
+def _assign_shards(roots, keys, previous, num_shards, key_fn=None):
+    if key_fn:
+        labels = sharding.key_shards([key_fn(key) for key in keys], num_shards)
+    else:
+        labels = sharding.spatial_shards(np.array(roots).reshape(-1, 3), num_shards)
+    return sharding.match_shards(labels, previous, num_shards)
+
+
+def add_curves_to_shards(curve_shapes, hair_system=None, key_fn=None):
+    '''Attach curves to the shards of a hairSystem.
+
+    Curves are grouped with the follicles already on the shards by the
+    position of their roots, or by key_fn, existing follicles are not moved.
+
+    :param curve_shapes: nurbsCurve shapes or their transforms
+    :param hair_system: sharded hairSystem, defaults to the active one
+    :param key_fn: optional callable returning a key per curve, curves with
+        the same key go to the same shard
+    :returns: [[follicle, follicle_shape], [out_curve, out_curve_shape]]
+        per curve
+    '''
+
+    hair_system = hair_system or get_active_hairsystem()
+    shards = get_shards(hair_system)
+    existing = _shard_follicles(shards)
+
+    points, offsets = curveio.read_points(curve_shapes, om.MSpace.kWorld)
+    roots = [f[3] for f in existing] + points[offsets[:-1]].tolist()
+    keys = [f[4] for f in existing] + list(curve_shapes)
+    previous = [f[0] for f in existing] + [-1] * len(curve_shapes)
+    labels = _assign_shards(roots, keys, previous, len(shards), key_fn)
+    labels = labels[len(existing):]
+
+    results = [None] * len(curve_shapes)
+    with undo_chunk():
+        for label, shard in enumerate(shards):
+            ids = np.flatnonzero(labels == label)
+            if not len(ids):
+                continue
+            nodes = add_curves_to_system([curve_shapes[i] for i in ids], shard)
+            for i, node in zip(ids, nodes):
+                results[i] = node
+    return results
+
+
+def _ensure_hair_groups(hair_system):
+    '''Get the follicle and output curve groups of a hairSystem, creating
+    them when missing
+    '''
+
+    hair_system_grp = get_hairsystem_grp(hair_system)
+    basename = hair_system.replace('Shape', '')
+    groups = []
+    for suffix in ('Follicles', 'OutputCurves'):
+        name = basename + suffix
+        if not cmds.objExists(name):
+            cmds.group(empty=True, name=name)
+            if hair_system_grp:
+                cmds.parent(name, hair_system_grp)
+        groups.append(_node(name))
+    return groups
+
+
+def _move_follicles(moves, modifier):
+    '''Reconnect follicles to other hairSystems
+
+    :param moves: (follicle, from shard, from index, to shard, to index,
+        follicles group, output curves group) per follicle
+    '''
+
+    for follicle, source, source_index, target, target_index, follicles_grp, outcurves_grp in moves:
+        follicle_fn = om.MFnDependencyNode(follicle)
+        out_hair = follicle_fn.findPlug('outHair', False)
+        current_position = follicle_fn.findPlug('currentPosition', False)
+        source_fn = om.MFnDependencyNode(source)
+        target_fn = om.MFnDependencyNode(target)
+
+        modifier.disconnect(
+            out_hair,
+            source_fn.findPlug('inputHair', False).elementByLogicalIndex(source_index)
+        )
+        modifier.disconnect(
+            source_fn.findPlug('outputHair', False).elementByLogicalIndex(source_index),
+            current_position
+        )
+        modifier.connect(
+            out_hair,
+            target_fn.findPlug('inputHair', False).elementByLogicalIndex(target_index)
+        )
+        modifier.connect(
+            target_fn.findPlug('outputHair', False).elementByLogicalIndex(target_index),
+            current_position
+        )
+
+        modifier.reparentNode(om.MFnDagNode(follicle).parent(0), follicles_grp)
+        for out_curve in follicle_fn.findPlug('outCurve', False).connectedTo(False, True):
+            modifier.reparentNode(
+                om.MFnDagNode(out_curve.node()).parent(0),
+                outcurves_grp
+            )
+    modifier.doIt()
+
+
+def rebalance_shards(hair_system=None, key_fn=None):
+    '''Spread the follicles of a sharded hairSystem evenly over its shards.
+
+    Follicles are grouped by the position of their roots, or by key_fn, and
+    only follicles whose group changed are moved, as one undoable step.
+
+    :param hair_system: sharded hairSystem, defaults to the active one
+    :param key_fn: optional callable returning a key per input curve
+    :returns: number of follicles moved
+    '''
+
+    hair_system = hair_system or get_active_hairsystem()
+    shards = get_shards(hair_system)
+    follicles = _shard_follicles(shards)
+    if not follicles:
+        return 0
+
+    labels = _assign_shards(
+        [f[3] for f in follicles],
+        [f[4] for f in follicles],
+        [f[0] for f in follicles],
+        len(shards),
+        key_fn
+    )
+
+    shard_nodes = [_node(shard) for shard in shards]
+    next_index = [_next_hair_index(shard) for shard in shards]
+    groups = {}
+    moves = []
+    with undo_chunk():
+        for (label, index, follicle, _, _), new_label in zip(follicles, labels):
+            if label == new_label:
+                continue
+            if new_label not in groups:
+                groups[new_label] = _ensure_hair_groups(shards[new_label])
+            moves.append((
+                follicle,
+                shard_nodes[label],
+                index,
+                shard_nodes[new_label],
+                next_index[new_label],
+            ) + tuple(groups[new_label]))
+            next_index[new_label] += 1
+
+        if moves:
+            modifiers.run(partial(_move_follicles, moves))
+    return len(moves)
+
+
+def shard_report(hair_system=None):
+    '''Print and return the number of follicles on each shard'''
+
+    hair_system = hair_system or get_active_hairsystem()
+    counts = [(shard, len(_follicles(shard))) for shard in get_shards(hair_system)]
+    total = sum(count for _, count in counts)
+    for shard, count in counts:
+        print('{:<40} {:>8} {:>6.1f}%'.format(
+            shard, count, 100.0 * count / total if total else 0
+        ))
+    print('{:<40} {:>8}'.format('total', total))
+    return counts
+
+
+def _out_curves(hair_system):
+    '''Get the inputHair index and output curve shape of each of a
+    hairSystem's follicles
+    '''
+
+    out_curves = []
+    for index, follicle in _follicles(hair_system):
+        plug = om.MFnDependencyNode(follicle).findPlug('outCurve', False)
+        for destination in plug.connectedTo(False, True):
+            if destination.node().hasFn(om.MFn.kNurbsCurve):
+                out_curves.append((index, destination.node()))
+                break
+    return out_curves
+
+
+def bake_hair_system(path, hair_system=None, start=None, end=None, step=1,
+                     dtype='<f4', overwrite=False):
+    '''Bake the output curves of a hairSystem to a mayakit.framecache cache.
+
+    The simulation is stepped through the frame range once, streaming each
+    frame's cvs to disk, so memory does not grow with the frame range.
+
+    :param path: directory of the cache
+    :param hair_system: hairSystem shape, defaults to the active one
+    :param start: first frame, defaults to the playback start
+    :param end: last frame, defaults to the playback end
+    :param step: frames between samples
+    :param dtype: dtype cvs are stored as
+    :param overwrite: replace an existing cache at path
+    :returns: number of frames baked
+    '''
+
+    hair_system = hair_system or get_active_hairsystem()
+    if start is None:
+        start = cmds.playbackOptions(query=True, minTime=True)
+    if end is None:
+        end = cmds.playbackOptions(query=True, maxTime=True)
+    if os.path.exists(path):
+        if not overwrite:
+            raise IOError('Cache already exists: ' + path)
+        shutil.rmtree(path)
+
+    out_curves = _out_curves(hair_system)
+    fns = [
+        om.MFnNurbsCurve(om.MDagPath.getAPathTo(out_curve))
+        for _, out_curve in out_curves
+    ]
+    frames = np.arange(start, end + step * 0.5, step)
+    with restore_time():
+        cmds.currentTime(start)
+        with framecache.FrameCacheWriter(
+            path,
+            curveio.read_curves(fns),
+            dtype=dtype,
+            fields={'hair_index': ('<i8', ())},
+            hair_index=[index for index, _ in out_curves]
+        ) as writer:
+            for frame in frames:
+                cmds.currentTime(frame)
+                writer.append(frame, curveio.read_points(fns)[0])
+    return len(frames)
+
+
+def play_hair_cache(path, hair_system=None):
+    '''Drive the output curves of a hairSystem from a cache baked with
+    bake_hair_system, replacing the simulation.
+
+    :param path: directory of the cache
+    :param hair_system: hairSystem shape the cache was baked from
+    :returns: playbackCurves node
+    '''
+
+    safe_load('playbackCurves')
+
+    hair_system = hair_system or get_active_hairsystem()
+    hair_indices = framecache.FrameCache(path).topology.fields['hair_index']
+    out_curves = dict(_out_curves(hair_system))
+
+    with undo_chunk():
+        node = cmds.createNode('playbackCurves')
+        cmds.setAttr(node + '.cachePath', path, type='string')
+        cmds.connectAttr('time1.outTime', node + '.time')
+        for i, index in enumerate(hair_indices):
+            if index in out_curves:
+                cmds.connectAttr(
+                    '{}.outputCurve[{}]'.format(node, i),
+                    _name(out_curves[index]) + '.create',
+                    force=True
+                )
+    return node
+
+
+def stop_hair_cache(node, hair_system=None):
+    '''Reconnect the output curves driven by a playbackCurves node to
+    their follicles and delete the node
+
+    :param node: playbackCurves node created by play_hair_cache
+    :param hair_system: hairSystem shape the cache was baked from
+    '''
+
+    hair_system = hair_system or get_active_hairsystem()
+    path = cmds.getAttr(node + '.cachePath')
+    hair_indices = framecache.FrameCache(path).topology.fields['hair_index']
+    follicles = dict(_follicles(hair_system))
+    output_curve = om.MFnDependencyNode(_node(node)).findPlug('outputCurve', False)
+
+    with undo_chunk():
+        for i, index in enumerate(hair_indices):
+            if index not in follicles:
+                continue
+            destinations = output_curve.elementByLogicalIndex(i).connectedTo(False, True)
+            for destination in destinations:
+                cmds.connectAttr(
+                    _name(follicles[index]) + '.outCurve',
+                    _name(destination.node()) + '.create',
+                    force=True
+                )
+        cmds.delete(node)
+
+
+def _set_points(attr, points):
+    '''Set a pointArray attribute with an undoable setAttr'''
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    cmds.setAttr(
+        attr,
+        len(points),
+        *[(x, y, z, 1.0) for x, y, z in points.tolist()],
+        type='pointArray'
+    )
+
+
+def _points_at_uvs(mesh, uvs):
+    '''Get the world space position of uvs on a mesh'''
+
+    sel = om.MSelectionList()
+    sel.add(mesh)
+    mesh_fn = om.MFnMesh(sel.getDagPath(0))
+    points = np.zeros((len(uvs), 3))
+    missed = 0
+    for i, (u, v) in enumerate(np.asarray(uvs, dtype=np.float64).tolist()):
+        try:
+            point = mesh_fn.getPointsAtUV(u, v, om.MSpace.kWorld)[1][0]
+        except (RuntimeError, IndexError):
+            missed += 1
+            continue
+        points[i] = point.x, point.y, point.z
+    if missed:
+        cmds.warning('{} uvs are outside of {}'.format(missed, mesh))
+    return points
+
+
+def bind_children(node, frame=None):
+    '''Store the roots of the guides of an interpolateStrands node as its
+    rest pose, children are bound against them
+
+    :param node: interpolateStrands node
+    :param frame: rest frame, defaults to the current frame
+    '''
+
+    plug = om.MFnDependencyNode(_node(node)).findPlug('inputCurve', False)
+    with restore_time():
+        if frame is not None:
+            cmds.currentTime(frame)
+        roots = []
+        for index in plug.getExistingArrayAttributeIndices():
+            sources = plug.elementByLogicalIndex(index).connectedTo(True, False)
+            if not sources:
+                continue
+            curve_fn = om.MFnNurbsCurve(om.MDagPath.getAPathTo(sources[0].node()))
+            root = curve_fn.getPointAtParam(curve_fn.knotDomain[0], om.MSpace.kWorld)
+            roots.append((root.x, root.y, root.z))
+    _set_points(node + '.restRoot', roots)
+
+
+def create_children(child_roots=None, hair_system=None, mesh=None, uvs=None,
+                    rest_frame=None, create_curves=False, **attrs):
+    '''Interpolate child strands from the output curves of a hairSystem
+    with an interpolateStrands node.
+
+    Children are bound to the guides as they are at rest_frame, uvs are
+    placed on mesh at rest_frame too.
+
+    :param child_roots: (children, 3) root positions
+    :param hair_system: hairSystem shape, defaults to the active one
+    :param mesh: mesh to place children on by uvs instead of child_roots
+    :param uvs: (children, 2) uvs on mesh
+    :param rest_frame: frame to bind at, defaults to the current frame
+    :param create_curves: create a curve per child, only practical for a
+        few thousand children, outputPoints holds all children in bulk
+    :param attrs: values of the node's attributes like neighbors=3
+    :returns: interpolateStrands node and the child curve transforms
+    '''
+
+    safe_load('interpolateStrands')
+
+    hair_system = hair_system or get_active_hairsystem()
+    if mesh is not None and uvs is not None:
+        with restore_time():
+            if rest_frame is not None:
+                cmds.currentTime(rest_frame)
+            child_roots = _points_at_uvs(mesh, uvs)
+    child_roots = np.asarray(child_roots, dtype=np.float64).reshape(-1, 3)
+
+    with undo_chunk():
+        node = cmds.createNode('interpolateStrands')
+        for i, (_, out_curve) in enumerate(_out_curves(hair_system)):
+            cmds.connectAttr(
+                om.MDagPath.getAPathTo(out_curve).fullPathName() + '.worldSpace[0]',
+                '{}.inputCurve[{}]'.format(node, i)
+            )
+        _set_points(node + '.childRoot', child_roots)
+        bind_children(node, rest_frame)
+
+        for attr, value in attrs.items():
+            cmds.setAttr(node + '.' + attr, value)
+
+        curves = []
+        if create_curves:
+            for i in range(len(child_roots)):
+                shape = cmds.createNode('nurbsCurve')
+                cmds.connectAttr(
+                    '{}.outputCurve[{}]'.format(node, i),
+                    shape + '.create'
+                )
+                curves.append(cmds.listRelatives(shape, parent=True)[0])
+    return node, curves
 
 
 def _quick_test_():
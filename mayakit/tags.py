@@ -8,6 +8,7 @@ from fnmatch import fnmatch
 
 MISSING = object()
 ANY = '*'
+SEQUENCE = list, tuple, set
 
 
 def add(objects=None, **tags):
@@ -21,11 +22,14 @@ def add(objects=None, **tags):
     if not isinstance(objects, SEQUENCE):
         objects = [objects]
 
-    for tag, value in tags.items():
-        tag_path = obj + '.' + tag
-        if not cmds.objExists(tag_path):
-            cmds.addAttr(obj, ln=tag, dt='string')
-        cmds.setAttr(tag_path, value, type='string')
+    for obj in objects:
+        for tag, value in tags.items():
+            tag_path = obj + '.' + tag
+            if not cmds.objExists(tag_path):
+                cmds.addAttr(obj, ln=tag, dt='string')
+            cmds.setAttr(tag_path, str(value), type='string')
+
+    _notify(objects, tags)
 
 
 def remove(obj, *tags):
@@ -36,6 +40,16 @@ def remove(obj, *tags):
         if cmds.objExists(tag_path):
             cmds.deleteAttr(tag_path)
 
+    _notify([obj], tags)
+
+
+def _notify(objects, tags):
+    '''Reindex objects in mayakit.registry when strands tags changed'''
+
+    from .registry import TAGS, notify
+    if any(tag in TAGS for tag in tags):
+        notify(objects)
+
 
 def ls(obj):
     '''Get all of an object's tags'''
@@ -0,0 +1,98 @@
+from __future__ import division
+
+import numpy as np
+
+from .. import closest, knotvectors, nurbs
+
+
+def brute_force(cvs, knots, degree, points, samples=100000):
+    '''Reference closest distances from densely sampling the curve'''
+
+    umin, umax = nurbs.domain(knots, degree)
+    dense = nurbs.points_at(cvs, knots, degree, np.linspace(umin, umax, samples))
+    deltas = points[:, None] - dense[None]
+    return np.sqrt(np.einsum('ijk,ijk->ij', deltas, deltas).min(axis=1))
+
+
+def test_segment_bvh():
+    '''The hierarchy finds the same segments as checking all of them'''
+
+    random = np.random.RandomState(0)
+    chain = np.cumsum(random.randn(101, 3), axis=0)
+    points = random.rand(50, 3) * 20 - 10
+    bvh = closest.SegmentBVH(chain[:-1], chain[1:], leaf_size=4)
+    _, _, distances = bvh.closest(points)
+
+    expected = np.array([
+        closest.segment_closest(
+            np.tile(point, (100, 1)), chain[:-1], chain[1:]
+        )[1].min()
+        for point in points
+    ])
+    assert np.allclose(distances, expected)
+
+    bvh = closest.SegmentBVH(chain[:1], chain[1:2])
+    segment_ids, _, _ = bvh.closest(points)
+    assert not segment_ids.any()
+
+
+def test_curve_bvh():
+    '''Refined hits are at least as close as dense sampling'''
+
+    random = np.random.RandomState(1)
+    cvs = np.cumsum(random.randn(60, 3), axis=0)
+    knots = knotvectors.uniform(60, 3)
+    points = cvs[::3] + random.randn(20, 3) * 0.5
+
+    params, positions = closest.closest_points(cvs, knots, 3, points)
+    distances = np.linalg.norm(positions - points, axis=1)
+
+    assert np.all(distances <= brute_force(cvs, knots, 3, points) + 1e-6)
+    assert np.allclose(positions, nurbs.points_at(cvs, knots, 3, params))
+
+    # Points on the curve map to themselves
+    on_curve = nurbs.points_at(cvs, knots, 3, np.linspace(0, 57, 30))
+    _, positions = closest.closest_points(cvs, knots, 3, on_curve)
+    assert np.allclose(positions, on_curve, atol=1e-6)
+
+
+def test_curve_bvh_periodic():
+    '''Parameters wrap around the seam of periodic curves'''
+
+    angles = np.linspace(0, 2 * np.pi, 8, endpoint=False)
+    cvs = nurbs.wrap_cvs(
+        np.column_stack((np.cos(angles), np.sin(angles), angles * 0)), 3
+    )
+    knots = knotvectors.uniform(11, 3, knotvectors.PERIODIC)
+    bvh = closest.CurveBVH(cvs, knots, 3, periodic=True)
+    points = np.array([[2, 0.001, 0], [2, -0.001, 0], [0, 0, 3]])
+    params, positions = bvh.closest(points)
+
+    assert np.all((params >= 0) & (params < 8))
+    assert np.all(
+        np.linalg.norm(positions - points, axis=1) <=
+        brute_force(cvs, knots, 3, points) + 1e-6
+    )
+
+
+def test_curve_bvh_tangled():
+    '''A curve passing a point many times is refined on each pass, Newton
+    steps from the closest segment alone settle in farther local minima
+    '''
+
+    random = np.random.RandomState(29)
+    cvs = random.randn(40, 3) * 2
+    knots = knotvectors.uniform(40, 3)
+    points = random.randn(300, 3) * 2
+
+    bvh = closest.CurveBVH(cvs, knots, 3)
+    params, positions = bvh.closest(points)
+    distances = np.linalg.norm(positions - points, axis=1)
+    assert np.all(distances <= brute_force(cvs, knots, 3, points, 20000) + 1e-4)
+    assert np.allclose(positions, nurbs.points_at(cvs, knots, 3, params))
+
+    # Refining never moves farther than the start
+    point_ids, start = bvh.candidates(points)
+    _, _, refined = bvh.refine(points[point_ids], start)
+    starts = nurbs.points_at(cvs, knots, 3, start) - points[point_ids]
+    assert np.all(refined <= np.einsum('ij,ij->i', starts, starts))
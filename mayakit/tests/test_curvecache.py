@@ -0,0 +1,114 @@
+from __future__ import division
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+
+from .. import curvecache, knotvectors, nurbs
+
+
+@pytest.fixture
+def path():
+    root = tempfile.mkdtemp()
+    yield os.path.join(root, 'guides.curves')
+    shutil.rmtree(root)
+
+
+def random_curves(random, count):
+    curves = []
+    for i in range(count):
+        num_cvs = random.randint(4, 12)
+        degree = random.randint(1, 4)
+        curves.append((
+            random.randn(num_cvs, 3),
+            knotvectors.uniform(num_cvs, degree),
+            degree,
+            1
+        ))
+    return curves
+
+
+def assert_curves_equal(a, b):
+    assert np.array_equal(a[0], b[0])
+    assert np.array_equal(a[1], b[1])
+    assert a[2:] == b[2:]
+
+
+def test_round_trip(path):
+    '''Curves and fields come back unchanged from random access and packed'''
+
+    random = np.random.RandomState(0)
+    curves = random_curves(random, 20)
+    ids = np.arange(20) * 10
+    roots = random.rand(20, 2)
+
+    fields = {'id': ('<i8', ()), 'root_uv': ('<f4', (2,))}
+    with curvecache.CurveCacheWriter(path, fields=fields) as writer:
+        writer.append_packed(nurbs.pack(curves[:15]), id=ids[:15], root_uv=roots[:15])
+        for curve, id_, root in zip(curves[15:], ids[15:], roots[15:]):
+            writer.append(*curve, id=id_, root_uv=root)
+
+    cache = curvecache.CurveCache(path)
+    assert len(cache) == 20
+    for index in random.permutation(20):
+        assert_curves_equal(cache[index], curves[index])
+    assert_curves_equal(cache[-1], curves[-1])
+    with pytest.raises(IndexError):
+        cache[20]
+
+    assert np.array_equal(cache.fields['id'], ids)
+    assert np.allclose(cache.fields['root_uv'], roots.astype(np.float32))
+
+    packed = cache.packed(5, 12)
+    for index in range(7):
+        assert_curves_equal(nurbs.unpack(packed, index), curves[index + 5])
+
+
+def test_append(path):
+    '''Reopening appends and drops data written after the last commit'''
+
+    random = np.random.RandomState(1)
+    curves = random_curves(random, 6)
+
+    with curvecache.CurveCacheWriter(path) as writer:
+        writer.append_packed(nurbs.pack(curves[:2]))
+    assert len(curvecache.CurveCache(path)) == 2
+
+    # An uncommitted curve is invisible to readers
+    writer = curvecache.CurveCacheWriter(path)
+    writer.append(*curves[2])
+    writer._files['cvs'].flush()
+    assert len(curvecache.CurveCache(path)) == 2
+    for f in writer._files.values():
+        f.close()
+
+    with curvecache.CurveCacheWriter(path) as writer:
+        writer.append_packed(nurbs.pack(curves[3:]))
+        writer.commit()
+        assert len(curvecache.CurveCache(path)) == 5
+
+    cache = curvecache.CurveCache(path)
+    for index, curve in enumerate(curves[:2] + curves[3:]):
+        assert_curves_equal(cache[index], curve)
+
+
+def test_empty(path):
+    with curvecache.CurveCacheWriter(path, dim=4):
+        pass
+    cache = curvecache.CurveCache(path)
+    assert len(cache) == 0
+    assert cache.cvs.shape == (0, 4)
+    assert len(cache.packed().degrees) == 0
+
+
+def test_invalid(path):
+    writer = curvecache.CurveCacheWriter(path, fields={'id': ('<i8', ())})
+    curves = nurbs.pack(random_curves(np.random.RandomState(2), 2))
+    with pytest.raises(ValueError):
+        writer.append_packed(curves)
+    with pytest.raises(ValueError):
+        writer.append_packed(curves, id=[1, 2, 3])
+    writer.close()
+    assert len(curvecache.CurveCache(path)) == 0
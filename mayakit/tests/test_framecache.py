@@ -0,0 +1,84 @@
+from __future__ import division
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+
+from .. import framecache, knotvectors, nurbs
+
+
+@pytest.fixture
+def path():
+    root = tempfile.mkdtemp()
+    yield os.path.join(root, 'sim.frames')
+    shutil.rmtree(root)
+
+
+def hairs(random, count):
+    return nurbs.pack([
+        (random.randn(8, 3), knotvectors.uniform(8, 3), 3, 1)
+        for _ in range(count)
+    ])
+
+
+def test_round_trip(path):
+    '''Frames come back as written and hold outside the cached range'''
+
+    random = np.random.RandomState(0)
+    topology = hairs(random, 5)
+    frames = [random.randn(40, 3) for _ in range(10)]
+    with framecache.FrameCacheWriter(
+        path,
+        topology,
+        fields={'hair_index': ('<i8', ())},
+        hair_index=np.arange(5) * 2
+    ) as w:
+        for frame, cvs in enumerate(frames, 1):
+            w.append(frame, cvs)
+
+    cache = framecache.FrameCache(path)
+    assert len(cache) == 10
+    assert np.array_equal(cache.topology.fields['hair_index'], np.arange(5) * 2)
+    assert np.array_equal(cache.cvs(3), frames[2])
+    assert np.array_equal(cache.cvs(3.5), frames[2])
+    assert np.array_equal(cache.cvs(-10), frames[0])
+    assert np.array_equal(cache.cvs(100), frames[-1])
+
+    packed = cache.packed(7)
+    cvs, knots, degree, form = nurbs.unpack(packed, 4)
+    assert np.array_equal(cvs, frames[6][32:])
+    assert np.array_equal(knots, knotvectors.uniform(8, 3))
+    assert (degree, form) == (3, 1)
+
+
+def test_append(path):
+    '''Frames are appended after the last commit and must move forward'''
+
+    random = np.random.RandomState(1)
+    topology = hairs(random, 2)
+    with framecache.FrameCacheWriter(path, topology, dtype='<f4') as w:
+        w.append(1, topology.cvs)
+        with pytest.raises(ValueError):
+            w.append(1, topology.cvs)
+        with pytest.raises(ValueError):
+            w.append(2, topology.cvs[:-1])
+
+    w = framecache.FrameCacheWriter(path)
+    w.append(2, topology.cvs + 1)
+    w.commit()
+    w.append(3, topology.cvs + 2)
+    w._files[framecache.POINTS].flush()
+
+    cache = framecache.FrameCache(path)
+    assert len(cache) == 2
+    assert cache.points.dtype == np.float32
+    assert np.allclose(cache.cvs(2), topology.cvs + 1)
+    for f in w._files.values():
+        f.close()
+
+    w = framecache.FrameCacheWriter(path)
+    w.append(3, topology.cvs + 3)
+    w.close()
+    assert np.allclose(framecache.FrameCache(path).cvs(3), topology.cvs + 3)
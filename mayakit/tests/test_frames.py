@@ -0,0 +1,105 @@
+from __future__ import division
+
+import numpy as np
+
+from .. import frames, nurbs
+
+
+def helix(num):
+    t = np.linspace(0, 12, num)
+    positions = np.stack([np.cos(t), np.sin(t), t * 0.3], axis=1)
+    tangents = np.stack([-np.sin(t), np.cos(t), np.full(num, 0.3)], axis=1)
+    return positions, nurbs.normalize(tangents)
+
+
+def test_projected_frames():
+    '''Projected frames match carrying the normal sample by sample'''
+
+    _, tangents = helix(200)
+    _, normals = frames.projected_frames(tangents)
+
+    normal = np.array([0.0, 1.0, 0.0])
+    for tangent, result in zip(tangents, normals):
+        bitangent = nurbs.normalize(np.cross(tangent, normal))
+        normal = nurbs.normalize(np.cross(bitangent, tangent))
+        assert np.allclose(result, normal)
+
+
+def test_rotation_minimizing_frames():
+    '''Double reflection frames match the sequential algorithm'''
+
+    positions, tangents = helix(500)
+    bitangents, normals = frames.rotation_minimizing_frames(
+        positions,
+        tangents,
+        up=(0, 0, 1)
+    )
+
+    normal = frames.seed_normal(tangents[0], (0, 0, 1))
+    for i in range(len(positions) - 1):
+        v1 = positions[i + 1] - positions[i]
+        c1 = v1.dot(v1)
+        normal_l = normal - 2 / c1 * v1.dot(normal) * v1
+        tangent_l = tangents[i] - 2 / c1 * v1.dot(tangents[i]) * v1
+        v2 = tangents[i + 1] - tangent_l
+        c2 = v2.dot(v2)
+        normal = normal_l - 2 / c2 * v2.dot(normal_l) * v2
+        assert np.allclose(normals[i + 1], normal)
+
+    assert np.allclose(frames.dot(normals, tangents), 0)
+    assert np.allclose(frames.dot(bitangents, normals), 0)
+
+
+def test_vertical_frames():
+    '''Frames do not flip or collapse on vertical curves'''
+
+    positions = np.zeros((10000, 3))
+    positions[:, 1] = np.linspace(0, 100, 10000)
+    tangents = np.tile([0.0, 1.0, 0.0], (10000, 1))
+    _, normals = frames.rotation_minimizing_frames(positions, tangents)
+
+    assert np.allclose(normals, normals[0])
+    assert np.isclose(np.linalg.norm(normals[0]), 1)
+
+
+def test_frenet_frames():
+    '''Frenet normals point at the axis of a helix'''
+
+    t = np.linspace(0, 12, 100)
+    positions, tangents = helix(100)
+    curvatures = np.stack([-np.cos(t), -np.sin(t), t * 0], axis=1)
+    _, normals = frames.frenet_frames(tangents, curvatures)
+
+    assert np.allclose(normals[:, :2], -positions[:, :2])
+    assert np.allclose(normals[:, 2], 0)
+
+    tangents = np.tile([1.0, 0.0, 0.0], (2, 1))
+    _, normals = frames.frenet_frames(tangents, np.zeros((2, 3)))
+    assert np.allclose(normals, [0, 1, 0])
+
+
+def test_fixed_up_frames():
+    '''Fixed up normals stay in the plane of the tangent and up vector'''
+
+    _, tangents = helix(100)
+    bitangents, normals = frames.fixed_up_frames(tangents, (0, 0, 1))
+
+    assert np.allclose(frames.dot(normals, tangents), 0)
+    assert np.allclose(frames.dot(bitangents, [0, 0, 1]), 0)
+    assert np.all(normals[:, 2] > 0)
+
+    tangents = np.tile([0.0, 1.0, 0.0], (2, 1))
+    _, normals = frames.fixed_up_frames(tangents)
+    assert np.allclose(np.linalg.norm(normals, axis=1), 1)
+    assert np.allclose(frames.dot(normals, tangents), 0)
+
+
+def test_twist():
+    '''Twist rotates normals linearly around the tangent'''
+
+    tangents = np.tile([1.0, 0.0, 0.0], (3, 1))
+    normals = np.tile([0.0, 1.0, 0.0], (3, 1))
+    angles = frames.ramp(3, twist=np.pi)
+    twisted = frames.twist_normals(tangents, normals, angles)
+
+    assert np.allclose(twisted, [[0, 1, 0], [0, 0, 1], [0, -1, 0]])
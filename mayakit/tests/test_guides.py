@@ -0,0 +1,62 @@
+from __future__ import division
+
+import numpy as np
+
+from .. import guides, nurbs
+
+
+def test_nearest_guides():
+    '''Chunked search finds the same guides as sorting all distances'''
+
+    random = np.random.RandomState(0)
+    guide_roots = random.randn(50, 3)
+    child_roots = random.randn(300, 3)
+    indices, distances = guides.nearest_guides(guide_roots, child_roots, k=4, chunk=64)
+
+    squared = ((child_roots[:, None] - guide_roots[None]) ** 2).sum(axis=2)
+    expected = np.argsort(squared, axis=1)[:, :4]
+    assert np.array_equal(indices, expected)
+    assert np.allclose(distances, np.take_along_axis(squared, expected, axis=1))
+
+    indices, _ = guides.nearest_guides(guide_roots[:2], child_roots, k=4)
+    assert indices.shape == (300, 2)
+
+
+def test_guide_weights():
+    distances = [[1.0, 4.0], [0.0, 1.0], [4.0, 4.0]]
+    weights = guides.guide_weights(distances)
+    assert np.allclose(weights, [[0.8, 0.2], [1, 0], [0.5, 0.5]])
+    weights = guides.guide_weights(distances, power=1)
+    assert np.allclose(weights[0], [2 / 3, 1 / 3])
+
+
+def test_interpolate():
+    '''Children keep their root offset and follow their guides'''
+
+    random = np.random.RandomState(1)
+    guide_points = np.cumsum(random.randn(20, 8, 3), axis=1)
+    child_roots = guide_points[:, 0].repeat(5, axis=0) + random.randn(100, 3) * 0.1
+    binding = guides.bind(guide_points[:, 0], child_roots, k=3)
+    assert np.allclose(binding.weights.sum(axis=1), 1)
+
+    children = guides.interpolate(binding, guide_points)
+    assert children.shape == (100, 8, 3)
+    assert np.allclose(children[:, 0], child_roots)
+
+    # Moving every guide moves every child the same way
+    moved = guides.interpolate(binding, guide_points + [1, 2, 3])
+    assert np.allclose(moved, children + [1, 2, 3])
+
+    # A child on a guide is that guide
+    binding = guides.bind(guide_points[:, 0], guide_points[3:4, 0], k=3)
+    assert np.allclose(guides.interpolate(binding, guide_points)[0], guide_points[3])
+
+
+def test_pack_children():
+    points = np.random.RandomState(2).randn(4, 6, 3)
+    packed = guides.pack_children(points)
+    cvs, knots, degree, form = nurbs.unpack(packed, 2)
+    assert np.array_equal(cvs, points[2])
+    assert (degree, form) == (3, 1)
+    assert len(knots) == 6 + 3 - 1
+    assert guides.pack_children(points[:, :2]).degrees[0] == 1
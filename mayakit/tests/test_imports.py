@@ -0,0 +1,104 @@
+'''
+Relative imports resolve, checked without importing Maya. Most of mayakit
+imports maya at the top, so a broken import inside a function only fails
+when that function is called in Maya.
+'''
+import ast
+import os
+
+import pytest
+
+PACKAGE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def source_files():
+    for root, dirs, files in os.walk(PACKAGE):
+        dirs[:] = [d for d in dirs if not d.startswith('__')]
+        for f in files:
+            if f.endswith('.py'):
+                yield os.path.join(root, f)
+
+
+def module_file(path):
+    '''Get the file of a module or package path without its extension'''
+
+    if os.path.isdir(path):
+        return os.path.join(path, '__init__.py')
+    return path + '.py'
+
+
+def defined_names(filename):
+    '''Names bound at the top level of a module'''
+
+    with open(filename) as f:
+        tree = ast.parse(f.read(), filename)
+
+    names = set()
+    nodes = list(tree.body)
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                names.update(n.id for n in ast.walk(target) if isinstance(n, ast.Name))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add((alias.asname or alias.name).split('.')[0])
+        elif isinstance(node, (ast.If, ast.Try, ast.With)):
+            for field in ('body', 'orelse', 'finalbody', 'handlers'):
+                nodes.extend(getattr(node, field, []))
+        elif isinstance(node, ast.ExceptHandler):
+            nodes.extend(node.body)
+    return names
+
+
+def relative_imports(filename):
+    '''Get the module path and names of each relative import in a file'''
+
+    with open(filename) as f:
+        tree = ast.parse(f.read(), filename)
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.level:
+            base = os.path.dirname(filename)
+            for _ in range(node.level - 1):
+                base = os.path.dirname(base)
+            if node.module:
+                base = os.path.join(base, *node.module.split('.'))
+            yield node.lineno, base, [alias.name for alias in node.names]
+
+
+def test_relative_imports():
+    '''Every name imported relatively exists where it's imported from'''
+
+    missing = []
+    for filename in source_files():
+        for lineno, base, names in relative_imports(filename):
+            target = module_file(base)
+            if not os.path.exists(target):
+                missing.append('{}:{} {}'.format(filename, lineno, base))
+                continue
+            defined = defined_names(target)
+            for name in names:
+                submodule = os.path.join(base, name)
+                if name == '*' or name in defined or os.path.exists(module_file(submodule)):
+                    continue
+                missing.append('{}:{} {} from {}'.format(filename, lineno, name, base))
+    assert not missing, '\n'.join(missing)
+
+
+def test_plugin_helpers():
+    '''Plugin helpers live in the plugins package, which a plugins module
+    next to it would never shadow
+    '''
+
+    assert not os.path.exists(os.path.join(PACKAGE, 'plugins.py'))
+    defined = defined_names(os.path.join(PACKAGE, 'plugins', '__init__.py'))
+    assert {'safe_load', 'safe_unload', 'safe_reload', 'load_all'} <= defined
+
+
+def test_plugin_helpers_import():
+    pytest.importorskip('maya.cmds')
+    from ..plugins import safe_load, safe_unload, safe_reload
+    assert callable(safe_load)
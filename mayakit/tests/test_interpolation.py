@@ -0,0 +1,71 @@
+from __future__ import division
+from math import pi, sin
+
+import numpy as np
+
+from .. import interpolation
+
+
+class Vector(object):
+    '''Minimal stand in for vector types like MVector'''
+
+    def __init__(self, x, y, z):
+        self.values = (x, y, z)
+
+    def __iter__(self):
+        return iter(self.values)
+
+
+def scalar_hermite(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def test_scalars():
+    '''Scalars in give the same floats the scalar helpers gave'''
+
+    for t in (0.0, 0.2, 0.5, 1.0, 1.7):
+        assert isinstance(interpolation.hermite(t), float)
+        assert np.isclose(interpolation.hermite(t), scalar_hermite(t))
+        assert np.isclose(interpolation.invhermite(t), 2 * t - scalar_hermite(t))
+        assert np.isclose(interpolation.cool(t), sin(t * pi * 0.5))
+        assert np.isclose(interpolation.lerp(2, 4, t), 2 + 2 * t)
+        assert np.isclose(interpolation.smoothstep(2, 4, t), 2 + 2 * scalar_hermite(t))
+    assert interpolation.inverse_square(0) == 1.0
+    assert interpolation.inverse_square(4) == 0.25
+
+
+def test_arrays():
+    '''Arrays in give the scalar results element wise'''
+
+    t = np.linspace(-1, 2, 31)
+    for name in ('hermite', 'invhermite', 'cool', 'inverse_square'):
+        kernel = getattr(interpolation, name)
+        expected = [kernel(float(value)) for value in t]
+        assert np.allclose(kernel(t), expected)
+
+    a = np.zeros((4, 3))
+    b = np.ones((4, 3))
+    assert np.allclose(interpolation.lerp(a, b, t[:4, None]), t[:4, None] * b)
+    assert np.allclose(interpolation.linspace(0, 1, 5), [0, 0.25, 0.5, 0.75, 1])
+
+
+def test_vectors():
+    '''Vectors in give vectors of the same type back'''
+
+    result = interpolation.lerp(Vector(0, 0, 0), Vector(2, 4, 6), 0.5)
+    assert isinstance(result, Vector)
+    assert tuple(result) == (1, 2, 3)
+
+    points = interpolation.lerp(Vector(0, 0, 0), Vector(2, 4, 6), np.linspace(0, 1, 3)[:, None])
+    assert np.allclose(points, [[0, 0, 0], [1, 2, 3], [2, 4, 6]])
+
+
+def test_graph_points():
+    params = np.linspace(0, 1, 11)
+    points = interpolation.graph_points(interpolation.hermite, params, 10, (1, 2, 3))
+    assert np.allclose(points[:, 0], params * 10 + 1)
+    assert np.allclose(points[:, 1], interpolation.hermite(params) * 10 + 2)
+    assert np.allclose(points[:, 2], 3)
+
+    scalar_points = interpolation.graph_points(lambda t: sin(t), params)
+    assert np.allclose(scalar_points[:, 1], np.sin(params) * 10)
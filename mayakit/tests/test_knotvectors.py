@@ -0,0 +1,124 @@
+from __future__ import division
+
+import numpy as np
+import pytest
+
+from .. import knotvectors, nurbs
+
+
+def test_uniform_open():
+
+    assert knotvectors.uniform(4, 3).tolist() == [0, 0, 0, 1, 1, 1]
+    assert knotvectors.uniform(6, 3).tolist() == [0, 0, 0, 1, 2, 3, 3, 3]
+    assert knotvectors.uniform(3, 1).tolist() == [0, 1, 2]
+    assert knotvectors.uniform(2, 1).tolist() == [0, 1]
+    assert knotvectors.uniform(6, 3, knotvectors.CLOSED).tolist() == [
+        0, 0, 0, 1, 2, 3, 3, 3
+    ]
+
+
+def test_uniform_periodic():
+
+    knots = knotvectors.uniform(11, 3, knotvectors.PERIODIC)
+    assert knots.tolist() == list(range(-2, 11))
+    assert nurbs.domain(knots, 3) == (0, 8)
+
+    knots = knotvectors.uniform(3, 1, knotvectors.PERIODIC)
+    assert knots.tolist() == [0, 1, 2]
+
+
+def test_uniform_degenerate():
+
+    with pytest.raises(ValueError):
+        knotvectors.uniform(3, 3)
+    with pytest.raises(ValueError):
+        knotvectors.uniform(6, 3, knotvectors.PERIODIC)
+    with pytest.raises(ValueError):
+        knotvectors.uniform(5, 0)
+    with pytest.raises(ValueError):
+        knotvectors.uniform(5, 3, 4)
+    with pytest.raises(ValueError):
+        knotvectors.uniform(0, 1)
+
+
+def test_uniform_memoized():
+
+    a = knotvectors.uniform(20, 3)
+    assert knotvectors.uniform(20, 3) is a
+    assert not a.flags.writeable
+
+    b = knotvectors.uniform(20, 3, array_typ=list)
+    b.append(99)
+    assert knotvectors.uniform(20, 3, array_typ=list) == a.tolist()
+
+
+def test_memoize_bounded():
+
+    calls = []
+
+    @knotvectors.memoize(maxsize=2)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    square(1)
+    square(2)
+    square(1)
+    square(3)
+    assert list(square.cache) == [(1,), (3,)]
+    square(2)
+    assert calls == [1, 2, 3, 2]
+
+
+def test_chord_length():
+
+    # Evenly spaced points give uniform knots
+    points = np.linspace([0, 0, 0], [10, 0, 0], 8)
+    for degree in (1, 2, 3):
+        np.testing.assert_allclose(
+            knotvectors.chord_length(points, degree),
+            knotvectors.uniform(8, degree)
+        )
+        np.testing.assert_allclose(
+            knotvectors.centripetal(points, degree),
+            knotvectors.uniform(8, degree)
+        )
+
+    # Linear knots match the distance between points
+    points = np.array([[0, 0, 0], [1, 0, 0], [4, 0, 0], [6, 0, 0]])
+    np.testing.assert_allclose(
+        knotvectors.chord_length(points, 1),
+        [0, 0.5, 2, 3]
+    )
+    np.testing.assert_allclose(
+        knotvectors.centripetal(points, 1),
+        np.array([0, 1, 1 + 3 ** 0.5, 1 + 3 ** 0.5 + 2 ** 0.5]) *
+        3 / (1 + 3 ** 0.5 + 2 ** 0.5)
+    )
+
+
+def test_chord_length_periodic():
+
+    angles = np.linspace(0, 2 * np.pi, 8, endpoint=False)
+    points = np.column_stack((np.cos(angles), np.sin(angles), angles * 0))
+    points = np.concatenate((points, points[:3]))
+    knots = knotvectors.chord_length(points, 3, knotvectors.PERIODIC)
+    np.testing.assert_allclose(knots, knotvectors.uniform(11, 3, 3))
+
+    points[1] *= 2
+    knots = knotvectors.chord_length(points, 3, knotvectors.PERIODIC)
+    assert len(knots) == 13
+    assert nurbs.domain(knots, 3) == (0, 8)
+    intervals = np.diff(knots)
+    np.testing.assert_allclose(intervals[:2], intervals[8:10])
+
+
+def test_chord_length_degenerate():
+
+    points = np.zeros((5, 3))
+    np.testing.assert_allclose(
+        knotvectors.chord_length(points, 3),
+        knotvectors.uniform(5, 3)
+    )
+    with pytest.raises(ValueError):
+        knotvectors.chord_length(points[:2], 2)
@@ -0,0 +1,193 @@
+from __future__ import division
+
+import numpy as np
+
+from .. import knotvectors, nurbs
+
+
+def bernstein(cvs, t):
+    '''Reference cubic bezier curve and its first derivative'''
+
+    a, b, c, d = cvs
+    t = t[:, None]
+    s = 1 - t
+    point = s ** 3 * a + 3 * s ** 2 * t * b + 3 * s * t ** 2 * c + t ** 3 * d
+    deriv = 3 * (s ** 2 * (b - a) + 2 * s * t * (c - b) + t ** 2 * (d - c))
+    return point, deriv
+
+
+def cox_de_boor(i, degree, full, t):
+    '''Reference basis function'''
+
+    if degree == 0:
+        if full[i] <= t < full[i + 1]:
+            return 1.0
+        return float(t == full[-1] and full[i] < t <= full[i + 1])
+
+    value = 0.0
+    if full[i + degree] != full[i]:
+        value += ((t - full[i]) / (full[i + degree] - full[i]) *
+                  cox_de_boor(i, degree - 1, full, t))
+    if full[i + degree + 1] != full[i + 1]:
+        value += ((full[i + degree + 1] - t) /
+                  (full[i + degree + 1] - full[i + 1]) *
+                  cox_de_boor(i + 1, degree - 1, full, t))
+    return value
+
+
+def test_bezier():
+    '''Evaluate a cubic bezier against the bernstein form'''
+
+    cvs = np.random.RandomState(0).rand(4, 3)
+    params = np.linspace(0, 1, 33)
+    points, derivs = nurbs.evaluate(cvs, [0, 0, 0, 1, 1, 1], 3, params)
+    expected_points, expected_derivs = bernstein(cvs, params)
+
+    assert np.allclose(points, expected_points)
+    assert np.allclose(derivs, expected_derivs)
+    assert points.flags['C_CONTIGUOUS'] and derivs.flags['C_CONTIGUOUS']
+
+
+def test_non_uniform_knots():
+    '''Evaluate a non uniform cubic against the cox de boor recursion'''
+
+    knots = [0, 0, 0, 0.5, 1.7, 2, 3, 3, 3]
+    cvs = np.random.RandomState(1).rand(7, 3)
+    full = nurbs.full_knots(knots)
+    params = np.linspace(0, 3, 41)
+    expected = np.array([
+        sum(cox_de_boor(i, 3, full, t) * cvs[i] for i in range(len(cvs)))
+        for t in params
+    ])
+
+    assert np.allclose(nurbs.points_at(cvs, knots, 3, params), expected)
+
+
+def test_derivatives():
+    '''Compare derivatives with central differences'''
+
+    knots = [0, 0, 0, 1, 2, 3, 4, 4, 4]
+    cvs = np.random.RandomState(2).rand(7, 3)
+    params = np.linspace(0.1, 3.9, 20)
+    h = 1e-6
+    points, d1, d2 = nurbs.evaluate(cvs, knots, 3, params, order=2)
+    _, d1_lo = nurbs.evaluate(cvs, knots, 3, params - h)
+    _, d1_hi = nurbs.evaluate(cvs, knots, 3, params + h)
+    p_lo = nurbs.points_at(cvs, knots, 3, params - h)
+    p_hi = nurbs.points_at(cvs, knots, 3, params + h)
+
+    assert np.allclose(d1, (p_hi - p_lo) / (2 * h), atol=1e-6)
+    assert np.allclose(d2, (d1_hi - d1_lo) / (2 * h), atol=1e-5)
+
+
+def test_linear():
+    '''Degree 1 curves are polylines'''
+
+    cvs = [[0, 0, 0], [1, 0, 0], [1, 2, 0]]
+    points, derivs = nurbs.evaluate(cvs, [0, 1, 2], 1, [0.5, 1.5, 2])
+
+    assert np.allclose(points, [[0.5, 0, 0], [1, 1, 0], [1, 2, 0]])
+    assert np.allclose(derivs, [[1, 0, 0], [0, 2, 0], [0, 2, 0]])
+
+
+def test_rational():
+    '''A rational quadratic reproduces a quarter circle'''
+
+    w = np.sqrt(0.5)
+    cvs = [[1, 0, 0, 1], [1, 1, 0, w], [0, 1, 0, 1]]
+    points, derivs = nurbs.evaluate(cvs, [0, 0, 1, 1], 2, np.linspace(0, 1, 9))
+
+    assert np.allclose(np.linalg.norm(points, axis=1), 1)
+    assert np.allclose(np.einsum('ij,ij->i', points, derivs), 0)
+
+
+def test_domain():
+    '''Open curves interpolate their end cvs at the domain bounds'''
+
+    assert nurbs.domain([-2, -1, 0, 1, 2, 3, 4, 5, 6], 3) == (0, 4)
+
+    knots = [0, 0, 0, 1, 2, 3, 4, 4, 4]
+    cvs = np.random.RandomState(3).rand(7, 3)
+    umin, umax = nurbs.domain(knots, 3)
+    points = nurbs.points_at(cvs, knots, 3, [umin, umax])
+
+    assert np.allclose(points, cvs[[0, -1]])
+
+
+def test_periodic():
+    '''Wrapped cvs and periodic knots close smoothly at the seam'''
+
+    angles = np.linspace(0, 2 * np.pi, 8, endpoint=False)
+    points = np.column_stack((np.cos(angles), np.sin(angles), angles * 0))
+    cvs = nurbs.wrap_cvs(points, 3)
+    knots = knotvectors.uniform(len(cvs), 3, knotvectors.PERIODIC)
+
+    assert len(cvs) == 11
+    assert np.array_equal(cvs[-3:], cvs[:3])
+
+    umin, umax = nurbs.domain(knots, 3)
+    results = nurbs.evaluate(cvs, knots, 3, [umin, umax - 1e-9], order=2)
+    for start, end in results:
+        assert np.allclose(start, end)
+
+
+def test_curve_table():
+    '''Table lookups reproduce cubic curves, even across a C0 knot'''
+
+    knots = [0, 0, 0, 0.5, 1.7, 2, 2, 2, 3, 3, 3]
+    cvs = np.random.RandomState(4).rand(9, 3)
+    params = np.linspace(0, 3, 301)
+    table = nurbs.CurveTable(cvs, knots, 3, subdivisions=2)
+    points, derivs = table.evaluate(params)
+    expected_points, expected_derivs = nurbs.evaluate(cvs, knots, 3, params)
+
+    assert np.allclose(points, expected_points)
+    assert np.allclose(derivs, expected_derivs)
+
+
+def test_table_cache():
+    '''Tables are reused until the curve changes and dropped over the cap'''
+
+    knots = [0, 0, 0, 1, 2, 3, 3, 3]
+    cvs = np.random.RandomState(5).rand(6, 3)
+    cache = nurbs.TableCache()
+
+    table = cache.table(cvs, knots, 3)
+    assert cache.table(cvs.copy(), knots, 3) is table
+    assert cache.table(cvs + 1, knots, 3) is not table
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+
+    cache.max_bytes = table.nbytes
+    cache.trim()
+    assert len(cache) == 1 and cache.nbytes <= cache.max_bytes
+
+
+def test_evaluate_packed():
+    '''Packed evaluation matches evaluating curves one by one'''
+
+    random = np.random.RandomState(6)
+    curves = []
+    for i in range(20):
+        degree = i % 4 + 1
+        num_cvs = degree + 1 + i % 5
+        knots = np.sort(random.rand(num_cvs + degree - 1)) * (i + 1) - 3
+        knots[:degree] = knots[0]
+        knots[-degree:] = knots[-1]
+        cvs = random.rand(num_cvs, 3)
+        if i % 3 == 0:
+            cvs = np.hstack((cvs, random.rand(num_cvs, 1) + 0.5))
+        curves.append((cvs, knots, degree))
+
+    packed = nurbs.pack(curves)
+    umin, umax = nurbs.packed_domains(packed)
+    params = (umin[:, None] + (umax - umin)[:, None] * np.linspace(0, 1, 9))
+    curve_ids = np.repeat(np.arange(len(curves)), 9)
+    points, derivs = nurbs.evaluate_packed(packed, params.ravel(), curve_ids)
+
+    for i, (cvs, knots, degree) in enumerate(curves):
+        expected_points, expected_derivs = nurbs.evaluate(
+            cvs, knots, degree, params[i]
+        )
+        assert np.allclose(points[curve_ids == i], expected_points)
+        assert np.allclose(derivs[curve_ids == i], expected_derivs)
+        assert np.allclose(nurbs.unpack(packed, i)[1], knots)
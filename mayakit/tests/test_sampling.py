@@ -0,0 +1,158 @@
+from __future__ import division
+
+import numpy as np
+
+from .. import knotvectors, sampling
+
+
+def test_arc_length():
+    '''A rational quadratic quarter circle has a length of pi / 2'''
+
+    w = np.sqrt(0.5)
+    cvs = [[1, 0, 0, 1], [1, 1, 0, w], [0, 1, 0, 1]]
+    table = sampling.ArcLengthTable(cvs, [0, 0, 1, 1], 2)
+
+    assert np.isclose(table.length, np.pi * 0.5)
+
+
+def test_uniform_params():
+    '''Unevenly spaced cvs on a line resample to even spacing'''
+
+    cvs = np.zeros((6, 3))
+    cvs[:, 0] = [0, 0.1, 0.2, 4, 9, 10]
+    knots = [0, 0, 0, 1, 2, 3, 3, 3]
+    table = sampling.ArcLengthTable(cvs, knots, 3, subdivisions=64)
+    params = table.uniform_params(11)
+    points = sampling.nurbs.points_at(cvs, knots, 3, params)
+
+    assert np.allclose(np.diff(points[:, 0]), 1, atol=1e-3)
+    assert table.matches(cvs, knots, 3)
+    assert not table.matches(cvs * 2, knots, 3)
+
+
+def test_spaced_params():
+    '''Samples a fixed distance apart along a line of length 10'''
+
+    cvs = np.zeros((6, 3))
+    cvs[:, 0] = [0, 0.1, 0.2, 4, 9, 10]
+    knots = [0, 0, 0, 1, 2, 3, 3, 3]
+    table = sampling.ArcLengthTable(cvs, knots, 3, subdivisions=64)
+
+    params = table.spaced_params(2.5)
+    points = sampling.nurbs.points_at(cvs, knots, 3, params)
+    assert np.allclose(points[:, 0], [0, 2.5, 5, 7.5, 10], atol=1e-3)
+
+    params = table.spaced_params(3, tmin=0.5)
+    points = sampling.nurbs.points_at(cvs, knots, 3, params)
+    assert np.allclose(points[:, 0], [5, 8], atol=1e-3)
+
+    assert len(table.spaced_params(0.1, max_points=20)) == 20
+    assert len(table.spaced_params(100)) == 1
+
+
+def test_adaptive_params():
+    '''Adaptive parameters stay within tolerance and respect the limits'''
+
+    random = np.random.RandomState(0)
+    cvs = np.cumsum(random.randn(30, 3), axis=0)
+    knots = knotvectors.uniform(30, 3)
+
+    params = sampling.adaptive_params(cvs, knots, 3, 0.01)
+    assert sampling.chord_deviation(cvs, knots, 3, params).max() <= 0.01
+
+    params = sampling.adaptive_params(cvs, knots, 3, 0.01, max_points=50)
+    assert len(params) == 50
+
+    line = np.zeros((10, 3))
+    line[:, 1] = np.arange(10)
+    knots = knotvectors.uniform(10, 3)
+    params = sampling.adaptive_params(line, knots, 3, 0.01, min_points=4)
+    assert len(params) == 4
+
+
+def resample_single(cvs, knots, degree, form, num_points, tmin=0, tmax=1):
+    '''Resample a curve the way resampleCurve does with parameter spacing'''
+
+    closed = sampling.closes(form, tmin, tmax)
+    params = sampling.domain_params(knots, degree, num_points, tmin, tmax, endpoint=not closed)
+    points = sampling.nurbs.points_at(cvs, knots, degree, params)
+    return sampling.resampled_curve(points, degree, closed)
+
+
+def test_resample_closed():
+    '''resampleCurve and resampleCurves agree, closed inputs become periodic
+    without a duplicated seam point
+    '''
+
+    angles = np.linspace(0, 2 * np.pi, 8, endpoint=False)
+    circle = np.column_stack((np.cos(angles), np.sin(angles), angles * 0))
+    circle_cvs = sampling.nurbs.wrap_cvs(circle, 3)
+    circle_knots = knotvectors.uniform(len(circle_cvs), 3, knotvectors.PERIODIC)
+    line_cvs = np.cumsum(np.ones((5, 3)), axis=0)
+    line_knots = knotvectors.uniform(5, 3)
+    curves = [
+        (circle_cvs, circle_knots, 3, knotvectors.PERIODIC),
+        (line_cvs, line_knots, 3, knotvectors.OPEN),
+    ]
+    packed = sampling.resample_packed(sampling.nurbs.pack(curves), 12)
+
+    for i, curve in enumerate(curves):
+        cvs, knots, degree, form = resample_single(*curve, num_points=12)
+        batch_cvs, batch_knots, batch_degree, batch_form = sampling.nurbs.unpack(packed, i)
+        assert np.allclose(batch_cvs, cvs)
+        assert np.allclose(batch_knots, knots)
+        assert (batch_degree, batch_form) == (degree, form)
+        assert degree == 3
+
+    cvs, knots, degree, form = sampling.nurbs.unpack(packed, 0)
+    assert form == knotvectors.PERIODIC
+    assert len(cvs) == 12 + 3
+    assert len(np.unique(cvs[:12].round(9), axis=0)) == 12
+    assert np.allclose(sampling.nurbs.unpack(packed, 1)[0][-1], line_cvs[-1])
+
+    # Part of a closed curve stays open
+    packed = sampling.resample_packed(sampling.nurbs.pack(curves[:1]), 12, tmax=0.5)
+    assert packed.forms[0] == knotvectors.OPEN
+
+
+def test_shift_params():
+    '''Only parameters shifted out of the domain wrap around'''
+
+    params = np.linspace(0, 4, 5)
+    assert np.allclose(sampling.shift_params(params, 0, 4, 0), params)
+    assert np.allclose(sampling.shift_params(params, 0, 4, 1), [1, 2, 3, 4, 1])
+    assert np.allclose(sampling.shift_params(params, 0, 4, -0.5), [3.5, 0.5, 1.5, 2.5, 3.5])
+    assert np.allclose(np.sort(sampling.shift_params(params + 2, 2, 6, 4)), params + 2)
+
+
+def test_resample_few_points():
+    '''Fewer points than a cubic needs lower the degree, closed curves
+    without enough points to be periodic stay open
+    '''
+
+    angles = np.linspace(0, 2 * np.pi, 8, endpoint=False)
+    circle = np.column_stack((np.cos(angles), np.sin(angles), angles * 0))
+    circle_cvs = sampling.nurbs.wrap_cvs(circle, 3)
+    circle_knots = knotvectors.uniform(len(circle_cvs), 3, knotvectors.PERIODIC)
+    line_cvs = np.cumsum(np.ones((5, 3)), axis=0)
+    curves = [
+        (line_cvs, knotvectors.uniform(5, 3), 3, knotvectors.OPEN),
+        (circle_cvs, circle_knots, 3, knotvectors.PERIODIC),
+    ]
+    expected = {
+        1: [(1, 2, knotvectors.OPEN), (1, 2, knotvectors.OPEN)],
+        2: [(1, 2, knotvectors.OPEN), (2, 3, knotvectors.OPEN)],
+        3: [(2, 3, knotvectors.OPEN), (3, 4, knotvectors.OPEN)],
+        4: [(3, 4, knotvectors.OPEN), (3, 7, knotvectors.PERIODIC)],
+    }
+    for num_points, results in expected.items():
+        packed = sampling.resample_packed(sampling.nurbs.pack(curves), num_points)
+        for i, (curve, result) in enumerate(zip(curves, results)):
+            cvs, knots, degree, form = sampling.nurbs.unpack(packed, i)
+            assert (degree, len(cvs), form) == result
+            assert len(knots) == len(cvs) + degree - 1
+            knotvectors.validate(len(cvs), degree, form)
+
+            single = resample_single(*curve, num_points=num_points)
+            assert np.allclose(single[0], cvs)
+            assert single[2:] == (degree, form)
@@ -0,0 +1,45 @@
+from __future__ import division
+
+import numpy as np
+
+from .. import sharding
+
+
+def test_spatial_shards():
+    '''Shards are balanced and spatially separated'''
+
+    random = np.random.RandomState(0)
+    points = random.rand(1000, 3) * [10, 1, 1]
+    for num_shards in (1, 2, 3, 7):
+        shards = sharding.spatial_shards(points, num_shards)
+        counts = sharding.shard_counts(shards, num_shards)
+        assert counts.sum() == 1000
+        assert counts.max() - counts.min() <= 1
+
+    # Split along the long axis, shards do not overlap along it
+    shards = sharding.spatial_shards(points, 4)
+    ranges = sorted(
+        (points[shards == s, 0].min(), points[shards == s, 0].max())
+        for s in range(4)
+    )
+    for (_, high), (low, _) in zip(ranges[:-1], ranges[1:]):
+        assert high <= low
+
+    assert len(sharding.spatial_shards(np.zeros((0, 3)), 4)) == 0
+
+
+def test_key_shards():
+    keys = ['a'] * 50 + ['b'] * 30 + ['c'] * 20 + ['d'] * 10
+    shards = sharding.key_shards(keys, 2)
+    for key in set(keys):
+        assert len(set(shards[[k == key for k in keys]])) == 1
+    assert sorted(sharding.shard_counts(shards, 2)) == [50, 60]
+
+
+def test_match_shards():
+    '''Relabeling keeps as many strands as possible where they are'''
+
+    previous = np.array([0, 0, 0, 1, 1, 1, 2, 2, -1])
+    shards = np.array([2, 2, 2, 0, 0, 1, 1, 1, 1])
+    matched = sharding.match_shards(shards, previous, 3)
+    assert np.array_equal(matched, [0, 0, 0, 1, 1, 2, 2, 2, 2])
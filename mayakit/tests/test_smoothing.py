@@ -0,0 +1,113 @@
+from __future__ import division
+
+import numpy as np
+
+from .. import knotvectors, nurbs, smoothing
+
+
+def noisy_curves(random, num_curves, num_points=30):
+    t = np.linspace(0, 10, num_points)
+    curves = []
+    for i in range(num_curves):
+        line = np.stack([t, np.sin(t * 0.3) * i, np.zeros_like(t)], axis=1)
+        curves.append(line + random.randn(num_points, 3) * 0.1)
+    return np.concatenate(curves), nurbs.offsets([num_points] * num_curves)
+
+
+def reference(points, iterations, factor):
+    '''Smooth one open curve point by point'''
+
+    points = np.array(points, dtype=np.float64)
+    for _ in range(iterations):
+        previous = points.copy()
+        for i in range(1, len(points) - 1):
+            average = (previous[i - 1] + previous[i + 1]) * 0.5
+            points[i] = previous[i] + (average - previous[i]) * factor
+    return points
+
+
+def segment_lengths(points):
+    return np.linalg.norm(np.diff(points, axis=0), axis=1)
+
+
+def test_smooth():
+    '''All curves smooth together like they do one at a time'''
+
+    random = np.random.RandomState(0)
+    points, offsets = noisy_curves(random, 5)
+    smoothed = smoothing.smooth(points, offsets, iterations=10, factor=0.5)
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        assert np.allclose(smoothed[start:end], reference(points[start:end], 10, 0.5))
+        assert np.allclose(smoothed[[start, end - 1]], points[[start, end - 1]])
+
+
+def test_unpinned():
+    '''Free ends move towards their neighbor'''
+
+    points = np.array([[0, 0, 0], [1, 1, 0], [2, 0, 0]], dtype=np.float64)
+    smoothed = smoothing.smooth(points, [0, 3], pin_start=False, pin_end=False)
+    assert np.allclose(smoothed, [[0.25, 0.25, 0], [1, 0.5, 0], [1.75, 0.25, 0]])
+    smoothed = smoothing.smooth(points, [0, 3], pin_start=True, pin_end=False)
+    assert np.allclose(smoothed[0], points[0])
+    assert not np.allclose(smoothed[2], points[2])
+
+    # Ends only see points of their own curve
+    smoothed = smoothing.smooth(
+        np.concatenate([points, points + 10]),
+        [0, 3, 6],
+        pin_start=False,
+        pin_end=False
+    )
+    assert np.allclose(smoothed[3:], smoothed[:3] + 10)
+
+
+def test_taubin():
+    '''Taubin smoothing shrinks a circle far less than Laplacian smoothing'''
+
+    angles = np.linspace(0, 2 * np.pi, 40, endpoint=False)
+    circle = np.stack([np.cos(angles), np.sin(angles), np.zeros(40)], axis=1)
+    offsets = [0, 40]
+    laplacian = smoothing.smooth(circle, offsets, 50, closed=[True])
+    taubin = smoothing.smooth(circle, offsets, 50, method='taubin', closed=[True])
+
+    laplacian_radii = np.linalg.norm(laplacian, axis=1)
+    taubin_radii = np.linalg.norm(taubin, axis=1)
+    assert np.allclose(laplacian_radii, laplacian_radii[0])
+    assert np.abs(taubin_radii - 1).max() < np.abs(laplacian_radii - 1).max() * 0.1
+
+
+def test_preserve_length():
+    random = np.random.RandomState(1)
+    points, offsets = noisy_curves(random, 3)
+    smoothed = smoothing.smooth(points, offsets, 20, preserve_length=True)
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        assert np.allclose(smoothed[start], points[start])
+        assert np.allclose(
+            segment_lengths(smoothed[start:end]),
+            segment_lengths(points[start:end])
+        )
+
+    angles = np.linspace(0, 2 * np.pi, 40, endpoint=False)
+    circle = np.stack([np.cos(angles), np.sin(angles), np.zeros(40)], axis=1)
+    smoothed = smoothing.smooth(circle, [0, 40], 50, closed=[True], preserve_length=True)
+    assert np.allclose(np.linalg.norm(smoothed, axis=1), 1)
+
+
+def test_smooth_packed():
+    '''Overlapping cvs of periodic curves stay in sync'''
+
+    random = np.random.RandomState(2)
+    distinct = random.randn(8, 3)
+    periodic = nurbs.wrap_cvs(distinct, 3)
+    open_cvs = random.randn(6, 3)
+    packed = nurbs.pack([
+        (open_cvs, knotvectors.uniform(6, 3), 3, 1),
+        (periodic, knotvectors.uniform(11, 3, knotvectors.PERIODIC), 3, 3),
+    ])
+    smoothed = smoothing.smooth_packed(packed, iterations=5)
+
+    cvs = nurbs.unpack(smoothed, 1)[0]
+    assert np.allclose(cvs[-3:], cvs[:3])
+    expected = smoothing.smooth(distinct, [0, 8], 5, closed=[True])
+    assert np.allclose(cvs[:8], expected)
+    assert np.allclose(nurbs.unpack(smoothed, 0)[0], reference(open_cvs, 5, 0.5))
@@ -0,0 +1,85 @@
+from __future__ import division
+
+import numpy as np
+
+from .. import knotvectors, nurbs, stitching
+
+
+def circle(radius, height, num_cvs=12):
+    angles = np.linspace(0, 2 * np.pi, num_cvs - 3, endpoint=False)
+    cvs = np.column_stack((
+        np.cos(angles) * radius,
+        np.sin(angles) * radius,
+        np.full(len(angles), height)
+    ))
+    cvs = nurbs.wrap_cvs(cvs, 3)
+    return cvs, knotvectors.uniform(num_cvs, 3, knotvectors.PERIODIC), 3
+
+
+def reference(curve_a, curve_b, stitches, points_per_stitch, u_offset,
+              tangent_offset, normal_fn):
+    '''The original one point at a time stitch_curves loop'''
+
+    def at(curve, u):
+        points, tangents = stitching.sample(curve, [u])
+        return points[0], tangents[0]
+
+    points = []
+    a_point, a_tangent = at(curve_a, u_offset)
+    a_normal = normal_fn(a_point[None])[0]
+    for i in range(stitches * 2):
+        u = (1.0 / (stitches * 2) * (i + 1) + u_offset) % 1
+        tangent_offset *= -1
+        b_point, b_tangent = at(curve_a if i % 2 else curve_b, u)
+        b_normal = normal_fn(b_point[None])[0]
+        for j in range(points_per_stitch):
+            t = j / points_per_stitch
+            normal = a_normal * (1 - t) + b_normal * t
+            tangent = a_tangent * (1 - t) + b_tangent * t
+            point = a_point * (1 - t) + b_point * t
+            points.append(
+                point +
+                normal * (t - stitching.hermite(t)) +
+                tangent * tangent_offset * np.sin(t * np.pi)
+            )
+        a_point, a_normal, a_tangent = b_point, b_normal, b_tangent
+    return np.array(points)
+
+
+def test_stitch_points():
+    '''Vectorized stitches match the original loop'''
+
+    a, b = circle(1, 0), circle(1.2, 0.5)
+    normal_fn = stitching.sphere_normals()
+    points = stitching.stitch_points(a, b, 10, 6, 0.05, 0.2, normal_fn)
+    expected = reference(a, b, 10, 6, 0.05, 0.2, normal_fn)
+
+    assert points.shape == (120, 3)
+    assert np.allclose(points, expected)
+
+
+def test_per_point():
+    '''Scalar normal functions are wrapped to the vectorized protocol'''
+
+    def scalar_normal(point):
+        return [point[0] * 2, 0, 0]
+
+    normal_fn = stitching.per_point(scalar_normal, lambda *xyz: xyz)
+    assert stitching.is_vectorized(normal_fn)
+    assert np.allclose(normal_fn(np.ones((4, 3))), [[2, 0, 0]] * 4)
+
+
+def test_cross_stitch_points():
+    '''Cross stitches alternate between the curves and use table curves'''
+
+    a, b = circle(1, 0), circle(1, 1)
+    first, second = stitching.cross_stitch_points(a, b, 20, 4)
+    assert first.shape == second.shape == (80, 3)
+
+    # Nodes sit on the curves, alternating between a and b
+    assert np.allclose(first[::4, 2], np.arange(20) % 2)
+    assert not np.allclose(first, second)
+
+    tables = nurbs.CurveTable(*a), nurbs.CurveTable(*b)
+    table_first, _ = stitching.cross_stitch_points(tables[0], tables[1], 20, 4)
+    assert np.allclose(table_first, first, atol=1e-4)
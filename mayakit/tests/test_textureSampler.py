@@ -3,9 +3,7 @@
 def test_texture_sampler():
     '''Test the texture_sampler function'''
 
-    # Compile and reload plugin modules
     from .. import plugins
-    plugins._import_plugins()
 
     # Get texture_sampler
     from ..plugins.textureSampler import texture_sampler
@@ -0,0 +1,73 @@
+from __future__ import division
+
+import numpy as np
+
+from .. import frames, knotvectors, nurbs, tubes
+
+
+def straight_curves(num_curves):
+    '''Vertical cubic curves 10 units long, one unit apart along x'''
+
+    curves = []
+    for i in range(num_curves):
+        cvs = np.zeros((5, 3))
+        cvs[:, 0] = i
+        cvs[:, 1] = np.linspace(0, 10, 5)
+        curves.append((cvs, knotvectors.uniform(5, 3), 3))
+    return nurbs.pack(curves)
+
+
+def test_tube_mesh():
+    '''Rings sit at the radius of each curve and faces point outwards'''
+
+    packed = straight_curves(3)
+    radii = np.array([0.1, 0.2, 0.3])
+    mesh = tubes.tube_mesh(packed, segments=4, profile=tubes.circle_profile(6), radii=radii)
+
+    assert mesh.points.shape == (3 * 5 * 6, 3)
+    assert len(mesh.face_counts) == 3 * 4 * 6
+    assert len(mesh.face_connects) == len(mesh.uv_ids) == 4 * len(mesh.face_counts)
+    assert mesh.face_connects.max() == len(mesh.points) - 1
+    assert len(mesh.us) == len(mesh.vs) == 3 * 5 * 7
+    assert mesh.uv_ids.max() == len(mesh.us) - 1
+
+    points = mesh.points.reshape(3, 5, 6, 3)
+    centers = np.arange(3)[:, None, None]
+    distances = np.hypot(points[..., 0] - centers, points[..., 2])
+    assert np.allclose(distances, radii[:, None, None])
+    assert np.allclose(points[:, :, :, 1], points[:, :, :1, 1])
+
+    quads = mesh.points[mesh.face_connects.reshape(-1, 4)]
+    face_normals = np.cross(quads[:, 1] - quads[:, 0], quads[:, 3] - quads[:, 0])
+    outward = quads.mean(axis=1)
+    outward[:, 0] -= np.repeat(np.arange(3), 24)
+    outward[:, 1] = 0
+    assert (frames.dot(face_normals, outward) > 0).all()
+
+
+def test_open_profile():
+    '''Open profiles do not connect the last point to the first'''
+
+    profile = np.stack([np.linspace(-1, 1, 4), np.zeros(4)], axis=1)
+    counts, connects = tubes.grid_faces(2, 3, 4, closed=False)
+    assert len(counts) == 2 * 2 * 3
+    us, vs, uv_ids = tubes.grid_uvs(2, 3, 4, closed=False)
+    assert len(us) == 2 * 3 * 4
+    assert np.allclose(us[:4], [0, 1 / 3, 2 / 3, 1])
+
+    mesh = tubes.tube_mesh(straight_curves(2), 2, profile, closed=False)
+    assert np.array_equal(mesh.face_connects, connects)
+    assert np.array_equal(mesh.uv_ids, uv_ids)
+
+
+def test_batched_frames():
+    '''Frames of many curves at once match one curve at a time'''
+
+    random = np.random.RandomState(0)
+    positions = np.cumsum(random.randn(4, 30, 3), axis=1)
+    tangents = nurbs.normalize(np.gradient(positions, axis=1))
+    bitangents, normals = frames.rotation_minimizing_frames(positions, tangents, (0, 1, 0))
+    for i in range(4):
+        expected = frames.rotation_minimizing_frames(positions[i], tangents[i], (0, 1, 0))
+        assert np.allclose(bitangents[i], expected[0])
+        assert np.allclose(normals[i], expected[1])
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+'''
+tubes
+=====
+Sweep a profile along many curves into a single polygon mesh, used by the
+sweepCurves plugin. Like mayakit.nurbs this module does not depend on Maya.
+
+Every curve is sampled at the same number of points so the samples of all
+curves form one (curves, samples, 3) array. Rotation minimizing frames are
+computed for all curves together and the profile is placed in the normal
+and bitangent plane of every frame. Faces and uvs form a regular grid per
+curve and are generated with index arithmetic, no per face work is done in
+Python.
+'''
+from __future__ import division
+from collections import namedtuple
+
+import numpy as np
+
+from . import frames, nurbs
+
+
+TubeMesh = namedtuple(
+    'TubeMesh',
+    'points face_counts face_connects us vs uv_ids'
+)
+TubeMesh.__doc__ = '''Arrays to pass to MFnMesh.create and assignUVs.
+
+Each face is a quad, so face_counts is all 4s. Face vertices are listed in
+face_connects and their uvs in uv_ids.
+'''
+
+
+def circle_profile(sides):
+    '''Points of a unit circle in the normal, bitangent plane
+
+    :param sides: number of points
+    :returns: (sides, 2) array
+    '''
+
+    angles = np.arange(sides) * (2 * np.pi / sides)
+    return np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+
+def sample_curves(packed, samples):
+    '''Sample every packed curve uniformly in parameter space
+
+    :param packed: PackedCurves
+    :param samples: number of samples per curve
+    :returns: (curves, samples, 3) positions and unit tangents
+    '''
+
+    num_curves = len(packed.degrees)
+    umin, umax = nurbs.packed_domains(packed)
+    steps = np.linspace(0, 1, samples)
+    params = umin[:, None] + (umax - umin)[:, None] * steps
+    curve_ids = np.repeat(np.arange(num_curves), samples)
+    positions, derivs = nurbs.evaluate_packed(packed, params.ravel(), curve_ids)
+    shape = (num_curves, samples, 3)
+    return positions.reshape(shape), nurbs.normalize(derivs).reshape(shape)
+
+
+def sweep(positions, tangents, profile, radii=1.0, up=None):
+    '''Place a profile around every sample of many curves
+
+    :param positions: (curves, samples, 3) positions
+    :param tangents: (curves, samples, 3) unit tangents
+    :param profile: (sides, 2) profile points, x along the normal and y
+        along the bitangent
+    :param radii: scale of the profile, a scalar or one value per curve
+    :param up: up vector to seed the first normal of each curve with
+    :returns: (curves * samples * sides, 3) points
+    '''
+
+    positions = np.asarray(positions, dtype=np.float64)
+    profile = np.asarray(profile, dtype=np.float64)
+    radii = np.broadcast_to(
+        np.asarray(radii, dtype=np.float64),
+        positions.shape[:1]
+    )[:, None, None, None]
+    bitangents, normals = frames.rotation_minimizing_frames(
+        positions,
+        tangents,
+        up
+    )
+    points = positions[:, :, None] + radii * (
+        normals[:, :, None] * profile[:, 0, None] +
+        bitangents[:, :, None] * profile[:, 1, None]
+    )
+    return points.reshape(-1, 3)
+
+
+def grid_faces(num_curves, samples, sides, closed=True):
+    '''Quads connecting consecutive rings of every curve
+
+    :param num_curves: number of curves
+    :param samples: number of rings per curve
+    :param sides: number of points per ring
+    :param closed: connect the last point of each ring to the first
+    :returns: face counts and face connects
+    '''
+
+    columns = sides if closed else sides - 1
+    ring = np.arange(samples - 1)[:, None] * sides
+    side = np.arange(columns)[None, :]
+    next_side = (side + 1) % sides
+    quads = np.stack([
+        ring + side,
+        ring + next_side,
+        ring + sides + next_side,
+        ring + sides + side,
+    ], axis=-1).reshape(-1, 4)
+
+    starts = np.arange(num_curves)[:, None, None] * (samples * sides)
+    connects = (quads[None] + starts).ravel()
+    counts = np.full(num_curves * len(quads), 4, dtype=np.int64)
+    return counts, connects
+
+
+def grid_uvs(num_curves, samples, sides, closed=True):
+    '''Uvs running from 0 to 1 around and along every tube
+
+    Closed profiles get an extra column of uvs for the seam.
+
+    :returns: us, vs and the uv id of every face vertex
+    '''
+
+    columns = sides + 1 if closed else sides
+    us = np.tile(np.linspace(0, 1, columns), samples)
+    vs = np.repeat(np.linspace(0, 1, samples), columns)
+
+    ring = np.arange(samples - 1)[:, None] * columns
+    side = np.arange(columns - 1)[None, :]
+    quads = np.stack([
+        ring + side,
+        ring + side + 1,
+        ring + columns + side + 1,
+        ring + columns + side,
+    ], axis=-1).reshape(-1, 4)
+
+    starts = np.arange(num_curves)[:, None, None] * (samples * columns)
+    uv_ids = (quads[None] + starts).ravel()
+    return np.tile(us, num_curves), np.tile(vs, num_curves), uv_ids
+
+
+def tube_mesh(packed, segments=16, profile=None, radii=1.0, closed=True,
+              up=None):
+    '''Sweep a profile along packed curves into one mesh
+
+    :param packed: PackedCurves
+    :param segments: number of segments along each curve
+    :param profile: (sides, 2) profile points, defaults to an 8 sided circle
+    :param radii: scale of the profile, a scalar or one value per curve
+    :param closed: connect the last point of the profile to the first
+    :param up: up vector to seed the first normal of each curve with
+    :returns: TubeMesh
+    '''
+
+    if profile is None:
+        profile = circle_profile(8)
+    num_curves = len(packed.degrees)
+    samples = segments + 1
+    sides = len(profile)
+
+    positions, tangents = sample_curves(packed, samples)
+    points = sweep(positions, tangents, profile, radii, up)
+    face_counts, face_connects = grid_faces(num_curves, samples, sides, closed)
+    us, vs, uv_ids = grid_uvs(num_curves, samples, sides, closed)
+    return TubeMesh(points, face_counts, face_connects, us, vs, uv_ids)